@@ -129,13 +129,20 @@ class ModifyVpcSecurityGroupsAction(Action):
         """Resolve security names to security groups resources."""
         if not names:
             return []
-        client = utils.local_session(
-            self.manager.session_factory).client('ec2')
-        sgs = self.manager.retry(
-            client.describe_security_groups,
-            Filters=[{
-                'Name': 'group-name', 'Values': names}]).get(
-                    'SecurityGroups', [])
+        # Lazy for non circular
+        from c7n.filters.vpc import get_sg_references
+        references = get_sg_references(self.manager, shared=True)
+        if references is not None:
+            sgs = references.refresh(
+                self.manager, ('security-group',)).get_groups_by_name(names)
+        else:
+            client = utils.local_session(
+                self.manager.session_factory).client('ec2')
+            sgs = self.manager.retry(
+                client.describe_security_groups,
+                Filters=[{
+                    'Name': 'group-name', 'Values': names}]).get(
+                        'SecurityGroups', [])
 
         unresolved = set(names)
         for s in sgs:
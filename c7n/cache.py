@@ -18,6 +18,8 @@ from six.moves import cPickle as pickle
 
 import os
 import logging
+import sqlite3
+import threading
 import time
 
 log = logging.getLogger('custodian.cache')
@@ -42,6 +44,8 @@ def factory(config):
             log.debug("Using in-memory cache")
             CACHE_NOTIFY = True
         return InMemoryCache()
+    elif config.cache.startswith(SqlKvCache.url_prefix):
+        return SqlKvCache(config)
 
     return FileCacheManager(config)
 
@@ -134,3 +138,130 @@ class FileCacheManager:
 
     def size(self):
         return os.path.exists(self.cache_path) and os.path.getsize(self.cache_path) or 0
+
+
+class SqlKvCache:
+    """Sqlite backed cache, with one row per cache key.
+
+    Selected by using a cache path of the form ``sqlite://path``.
+
+    Unlike the file cache, saving an entry only writes that entry, each
+    write is atomic, and concurrent processes (ie. c7n-org workers) can
+    safely share the same cache file. Entries expire individually after
+    the cache period, and the least recently written entries are evicted
+    once the total size of cached values exceeds ``max_size`` bytes.
+    """
+
+    url_prefix = 'sqlite://'
+    max_size = 512 * 1024 * 1024
+    timeout = 60
+
+    create_table = """
+        create table if not exists c7n_cache(
+           key blob primary key,
+           value blob,
+           size integer,
+           create_date real,
+           expire_date real)"""
+
+    # every resource manager has its own cache, caches of the same path
+    # within a process share one connection and the lock serializing it.
+    connections = {}
+    refs = {}
+    locks = {}
+    registry_lock = threading.Lock()
+
+    def __init__(self, config):
+        self.config = config
+        self.cache_period = config.cache_period
+        self.cache_path = os.path.abspath(
+            os.path.expanduser(
+                os.path.expandvars(
+                    config.cache[len(self.url_prefix):])))
+        self.conn = None
+        self.key = (os.getpid(), self.cache_path)
+        with self.registry_lock:
+            self.lock = self.locks.setdefault(self.key, threading.Lock())
+
+    def init(self):
+        if self.conn is not None:
+            return self.conn
+        conn = self.connections.get(self.key)
+        if conn is None:
+            directory = os.path.dirname(self.cache_path)
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(
+                self.cache_path, timeout=self.timeout,
+                check_same_thread=False, isolation_level=None)
+            conn.execute('pragma journal_mode=wal')
+            conn.execute(self.create_table)
+            self.connections[self.key] = conn
+        self.refs[self.key] = self.refs.get(self.key, 0) + 1
+        self.conn = conn
+        return conn
+
+    def load(self):
+        try:
+            with self.lock:
+                self.init()
+        except (OSError, sqlite3.Error) as e:
+            log.warning("Could not open cache %s err: %s" % (self.cache_path, e))
+            return False
+        return True
+
+    def get(self, key):
+        with self.lock:
+            row = self.init().execute(
+                'select value from c7n_cache where key = ? and expire_date > ?',
+                (sqlite3.Binary(pickle.dumps(key, protocol=2)), time.time())).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def save(self, key, data):
+        value = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        try:
+            with self.lock:
+                conn = self.init()
+                with conn:
+                    conn.execute('begin immediate')
+                    conn.execute(
+                        'insert or replace into c7n_cache values (?, ?, ?, ?, ?)',
+                        (sqlite3.Binary(pickle.dumps(key, protocol=2)),
+                         sqlite3.Binary(value), len(value), now,
+                         now + self.cache_period * 60))
+                    self.evict(conn, now)
+        except (OSError, sqlite3.Error) as e:
+            log.warning("Could not save cache %s err: %s" % (self.cache_path, e))
+
+    def evict(self, conn, now):
+        conn.execute('delete from c7n_cache where expire_date <= ?', (now,))
+        total = conn.execute('select sum(size) from c7n_cache').fetchone()[0] or 0
+        if total <= self.max_size:
+            return
+        rows = conn.execute(
+            'select key, size from c7n_cache order by create_date desc, rowid desc').fetchall()
+        keep = 0
+        for key, size in rows:
+            keep += size
+            if keep > self.max_size:
+                conn.execute('delete from c7n_cache where key = ?', (key,))
+
+    def size(self):
+        if self.conn is None and not os.path.exists(self.cache_path):
+            return 0
+        with self.lock:
+            return self.init().execute(
+                'select sum(size) from c7n_cache').fetchone()[0] or 0
+
+    def close(self):
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn = None
+            self.refs[self.key] -= 1
+            if not self.refs[self.key]:
+                del self.refs[self.key]
+                self.connections.pop(self.key).close()
@@ -102,7 +102,8 @@ def _default_options(p, blacklist=""):
     if 'cache' not in blacklist:
         p.add_argument(
             "-f", "--cache", default="~/.cache/cloud-custodian.cache",
-            help="Cache file (default %(default)s)")
+            help=("Cache file, use sqlite://path for a concurrent safe "
+                  "sqlite cache (default %(default)s)"))
         p.add_argument(
             "--cache-period", default=15, type=int,
             help="Cache validity in minutes (default %(default)i)")
@@ -132,6 +133,10 @@ def _report_options(p):
         '--format', default='csv', choices=['csv', 'grid', 'simple', 'json'],
         help="Format to output data in (default: %(default)s). "
         "Options include simple, grid, csv, json")
+    p.add_argument(
+        '--manifest', metavar='PATH',
+        help="Local sqlite manifest of downloaded s3 record files, unchanged "
+        "files within the report's time window are read from it")
 
 
 def _metrics_options(p):
@@ -244,6 +249,26 @@ def setup_parser():
             "For more details on aws metrics options, see: "
             "https://cloudcustodian.io/docs/aws/usage.html#metrics")
 
+    run.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of policies to execute concurrently (default %(default)i)")
+    run.add_argument(
+        "--api-rate", type=float, default=20.0,
+        help=("With --jobs, the max api calls per second per service, region "
+              "and account across concurrent policies (default %(default)s)"))
+    run.add_argument(
+        "--stream-resources", action="store_true", default=False,
+        help=("Fetch, augment and filter resources a page at a time to bound "
+              "memory use on large resource types, streamed resources aren't cached"))
+    run.add_argument(
+        "--columnar-snapshot", action="store_true", default=False,
+        help=("Also write matched resources as a columnar parquet snapshot "
+              "for reporting, requires pyarrow"))
+    run.add_argument(
+        "--optimize-filters", action="store_true", default=False,
+        help=("Evaluate in-memory filters ahead of filters making api calls, "
+              "where reordering doesn't change the results, and with numpy "
+              "installed, value filters over large resource sets as columns"))
     run.add_argument(
         "-m", "--metrics-enabled",
         default=None, nargs="?", const="aws",
@@ -253,6 +278,12 @@ def setup_parser():
         dest="tracer",
         help=argparse.SUPPRESS,
         default=None, nargs="?", const="default")
+    run.add_argument(
+        "--profile-execution",
+        dest="tracer", action="store_const", const="profile",
+        help=("Profile policy filters, actions and api calls, writing a "
+              "flamegraph.folded collapsed stack file and profile.json "
+              "summary to each policy's output"))
 
     schema_desc = ("Browse the available vocabularies (resources, filters, modes, and "
                    "actions) for policy construction. The selector "
@@ -303,6 +334,13 @@ def setup_parser():
     validate.add_argument("-v", "--verbose", action="count", help="Verbose Logging")
     validate.add_argument("-q", "--quiet", action="count", help="Less logging (repeatable)")
     validate.add_argument("--debug", default=False, help=argparse.SUPPRESS)
+    validate.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of config files to validate concurrently (default %(default)i)")
+    validate.add_argument(
+        "-f", "--cache", default=None,
+        help=("Validation cache file, policies which validated with the same "
+              "custodian version are skipped (ie. ~/.cache/custodian-validate.db)"))
 
     return parser
 
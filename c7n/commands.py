@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from collections import Counter, defaultdict
+from concurrent.futures import as_completed
 from datetime import timedelta, datetime
-from functools import wraps
+from functools import partial, wraps
+import hashlib
 import inspect
+import json
 import logging
 import os
 import sys
@@ -24,8 +27,11 @@ import yaml
 from yaml.constructor import ConstructorError
 
 from c7n.exceptions import ClientError, PolicyValidationError
+from c7n.executor import (
+    MainThreadExecutor, ProcessPoolExecutor, ThreadPoolExecutor, execution_scope)
 from c7n.provider import clouds
 from c7n.policy import Policy, PolicyCollection, load as policy_load
+from c7n.planner import ResourcePlanner
 from c7n.schema import ElementSchema, StructureParser, generate
 from c7n.utils import load_file, local_session, SafeLoader, yaml_dump
 from c7n.config import Bag, Config
@@ -194,72 +200,141 @@ class DuplicateKeyCheckLoader(SafeLoader):
         return super(DuplicateKeyCheckLoader, self).construct_mapping(node, deep)
 
 
-def validate(options):
+# validation results only change with the custodian version
+VALIDATE_CACHE_PERIOD = 60 * 24 * 30
+
+_validate_schemas = {}
+
+
+def _get_validate_cache(cache_path):
+    if not cache_path:
+        return None
+    from c7n.cache import SqlKvCache
+    cache = SqlKvCache(Bag(
+        cache=SqlKvCache.url_prefix + cache_path,
+        cache_period=VALIDATE_CACHE_PERIOD))
+    if not cache.load():
+        return None
+    return cache
+
+
+def _get_validate_schema(resource_types, cache):
+    """Generate the schema for the given resource types.
+
+    Generated schemas are memoized in process and persisted in the
+    validation cache for later runs.
+    """
     from c7n import schema
+    from c7n.version import version
+    key = ('schema', version, tuple(sorted(resource_types)))
+    if key in _validate_schemas:
+        return _validate_schemas[key]
+    schm = cache and cache.get(key) or None
+    if schm is None:
+        schm = schema.generate(resource_types)
+        if cache:
+            cache.save(key, schm)
+    _validate_schemas[key] = schm
+    return schm
 
-    if len(options.configs) < 1:
-        log.error('no config files specified')
-        sys.exit(1)
 
-    used_policy_names = set()
-    structure = StructureParser()
-    errors = []
+def get_policy_digest(policy_data):
+    return hashlib.sha256(
+        json.dumps(policy_data, sort_keys=True, default=str).encode('utf8')).hexdigest()
 
-    for config_file in options.configs:
 
-        config_file = os.path.expanduser(config_file)
-        if not os.path.exists(config_file):
-            raise ValueError("Invalid path for config %r" % config_file)
+def _validate_file(config_file, cache_path=None):
+    """Validate a policy file, returning its policy names and any errors.
 
-        options.dryrun = True
-        fmt = config_file.rsplit('.', 1)[-1]
+    With a validation cache, policies which previously validated with
+    the same custodian version are skipped.
+    """
+    from c7n import schema
+    from c7n.version import version
 
-        with open(config_file) as fh:
-            if fmt in ('yml', 'yaml', 'json'):
-                data = yaml.load(fh.read(), Loader=DuplicateKeyCheckLoader)
-            else:
-                log.error("The config file must end in .json, .yml or .yaml.")
-                raise ValueError("The config file must end in .json, .yml or .yaml.")
+    with open(config_file) as fh:
+        data = yaml.load(fh.read(), Loader=DuplicateKeyCheckLoader)
 
-        try:
-            structure.validate(data)
-        except PolicyValidationError as e:
-            log.error("Configuration invalid: {}".format(config_file))
-            log.error("%s" % e)
-            errors.append(e)
-            continue
-
-        load_resources(structure.get_resource_types(data))
-        schm = schema.generate()
-        errors += schema.validate(data, schm)
-        conf_policy_names = {
-            p.get('name', 'unknown') for p in data.get('policies', ())}
-        dupes = conf_policy_names.intersection(used_policy_names)
-        if len(dupes) >= 1:
-            errors.append(ValueError(
-                "Only one policy with a given name allowed, duplicates: %s" % (
-                    ", ".join(dupes)
-                )
-            ))
-        used_policy_names = used_policy_names.union(conf_policy_names)
-        if not errors:
+    structure = StructureParser()
+    try:
+        structure.validate(data)
+    except PolicyValidationError as e:
+        return None, [str(e)]
+
+    names = [p.get('name', 'unknown') for p in data.get('policies', ())]
+    errors = schema.check_unique(data) or []
+    cache = _get_validate_cache(cache_path)
+    try:
+        pending = {}
+        for p in data.get('policies', ()):
+            key = ('policy', version, get_policy_digest(p))
+            if cache is None or not cache.get(key):
+                pending[key] = p
+        if pending and not errors:
+            pending_data = dict(data, policies=list(pending.values()))
+            resource_types = structure.get_resource_types(pending_data)
+            load_resources(resource_types)
+            errors += schema.validate(
+                pending_data, _get_validate_schema(resource_types, cache))
+        if pending and not errors:
             null_config = Config.empty(dryrun=True, account_id='na', region='na')
-            for p in data.get('policies', ()):
+            for p in pending.values():
                 try:
                     policy = Policy(p, null_config, Bag())
                     policy.validate()
                 except Exception as e:
-                    msg = "Policy: %s is invalid: %s" % (
-                        p.get('name', 'unknown'), e)
-                    errors.append(msg)
-        if not errors:
-            log.info("Configuration valid: {}".format(config_file))
-            continue
-
-        log.error("Configuration invalid: {}".format(config_file))
-        for e in errors:
-            log.error("%s" % e)
-    if errors:
+                    errors.append("Policy: %s is invalid: %s" % (
+                        p.get('name', 'unknown'), e))
+        if cache and not errors:
+            for key in pending:
+                cache.save(key, True)
+    finally:
+        if cache:
+            cache.close()
+    return set(names), [str(e) for e in errors]
+
+
+def validate(options):
+    if len(options.configs) < 1:
+        log.error('no config files specified')
+        sys.exit(1)
+
+    config_files = []
+    for config_file in options.configs:
+        config_file = os.path.expanduser(config_file)
+        if not os.path.exists(config_file):
+            raise ValueError("Invalid path for config %r" % config_file)
+        if config_file.rsplit('.', 1)[-1] not in ('yml', 'yaml', 'json'):
+            log.error("The config file must end in .json, .yml or .yaml.")
+            raise ValueError("The config file must end in .json, .yml or .yaml.")
+        config_files.append(config_file)
+
+    options.dryrun = True
+    cache_path = getattr(options, 'cache', None)
+    jobs = getattr(options, 'jobs', 1) or 1
+    executor = jobs > 1 and ProcessPoolExecutor or MainThreadExecutor
+    used_policy_names = set()
+    invalid = False
+
+    with executor(max_workers=jobs) as w:
+        results = w.map(
+            partial(_validate_file, cache_path=cache_path), config_files)
+        for config_file, (names, errors) in zip(config_files, results):
+            if names is not None:
+                dupes = names.intersection(used_policy_names)
+                if len(dupes) >= 1:
+                    errors.append(
+                        "Only one policy with a given name allowed, duplicates: %s" % (
+                            ", ".join(dupes)))
+                used_policy_names = used_policy_names.union(names)
+            if not errors:
+                log.info("Configuration valid: {}".format(config_file))
+                continue
+            invalid = True
+            log.error("Configuration invalid: {}".format(config_file))
+            for e in errors:
+                log.error("%s" % e)
+    if invalid:
         sys.exit(1)
 
 
@@ -276,20 +351,61 @@ def run(options, policies):
             log.exception("Unable to assume role %s", options.assume_role)
             sys.exit(1)
 
-    for policy in policies:
-        try:
-            policy()
-        except Exception:
-            exit_code = 2
-            if options.debug:
-                raise
-            log.exception(
-                "Error while executing policy %s, continuing" % (
-                    policy.name))
+    if getattr(options, 'columnar_snapshot', False):
+        from c7n.reports.columnar import HAVE_PYARROW
+        if not HAVE_PYARROW:
+            log.error("Columnar snapshots require pyarrow to be installed")
+            sys.exit(1)
+
+    planner = ResourcePlanner(policies)
+    log.debug("Planned resource fetches %s", planner.get_stats())
+
+    jobs = getattr(options, 'jobs', 1) or 1
+    if jobs > 1:
+        exit_code = _run_concurrent(options, policies, jobs)
+    else:
+        for policy in policies:
+            try:
+                policy()
+            except Exception:
+                exit_code = 2
+                if options.debug:
+                    raise
+                log.exception(
+                    "Error while executing policy %s, continuing" % (
+                        policy.name))
     if exit_code != 0:
         sys.exit(exit_code)
 
 
+def _run_policy(policy):
+    with execution_scope(policy):
+        return policy()
+
+
+def _run_concurrent(options, policies, jobs):
+    """Execute policies concurrently on a thread pool.
+
+    Each policy runs in its own execution scope, which keeps its log
+    output isolated from the other policies running at the same time.
+    """
+    exit_code = 0
+    log.info("Executing %d policies with %d jobs", len(policies), jobs)
+    with ThreadPoolExecutor(max_workers=jobs) as w:
+        futures = {w.submit(_run_policy, p): p for p in policies}
+        for f in as_completed(futures):
+            policy = futures[f]
+            if f.exception() is None:
+                continue
+            exit_code = 2
+            if options.debug:
+                raise f.exception()
+            log.error(
+                "Error while executing policy %s, continuing" % (policy.name),
+                exc_info=f.exception())
+    return exit_code
+
+
 @policy_command
 def report(options, policies):
     from c7n.reports import report as do_report
@@ -333,20 +449,21 @@ def schema_completer(prefix):
     filtering via startswith happens after this list is returned.
     """
     from c7n import schema
-    load_available()
+    # resource names come from the provider resource maps and indexes,
+    # only fall back to importing resources for their vocabulary.
+    load_available(resources=False)
     components = prefix.split('.')
 
     if components[0] in provider.clouds.keys():
         cloud_provider = components.pop(0)
-        provider_resources = provider.resources(cloud_provider)
     else:
         cloud_provider = 'aws'
-        provider_resources = provider.resources('aws')
         components[0] = "aws.%s" % components[0]
+    provider_resources = provider.clouds[cloud_provider].resource_map
 
     # Completions for resource
     if len(components) == 1:
-        choices = [r for r in provider.resources().keys()
+        choices = [r for p in provider.clouds.values() for r in p.resource_map
                    if r.startswith(components[0])]
         if len(choices) == 1:
             choices += ['{}{}'.format(choices[0], '.')]
@@ -365,9 +482,15 @@ def schema_completer(prefix):
 
     # Completions for item
     elif len(components) == 3:
-        resource_mapping = schema.resource_vocabulary(cloud_provider)
+        resource_index = provider.clouds[cloud_provider].resource_index or {}
+        if components[0] in resource_index:
+            names = resource_index[components[0]][components[1]]
+        else:
+            load_resources((components[0],))
+            resource_mapping = schema.resource_vocabulary(cloud_provider)
+            names = resource_mapping[components[0]][components[1]]
         return ['{}.{}.{}'.format(components[0], components[1], x)
-                for x in resource_mapping[components[0]][components[1]]]
+                for x in names]
 
     return []
 
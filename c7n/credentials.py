@@ -64,9 +64,15 @@ class SessionFactory:
     def update(self, session):
         session._session.user_agent_name = self.user_agent_name
         session._session.user_agent_version = version
+        if not isinstance(session.client, ClientPool):
+            session.client = ClientPool(session)
 
+        # clients copy the session's event handlers when created, so
+        # subscribers are registered on extant pooled clients as well.
         for s in self._subscribers:
             s(session)
+            for client in session.client.clients.values():
+                s(client.meta)
 
         return session
 
@@ -74,6 +80,36 @@ class SessionFactory:
         self._subscribers = subscribers
 
 
+class ClientPool:
+    """Reuse a session's clients by service and region.
+
+    Clients share the session's credentials, so those of assumed role
+    sessions continue to be refreshed. The pool is emptied when the
+    session's user agent changes (ie. per policy), as clients capture
+    it when created. Clients created with additional options aren't
+    pooled.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.create_client = session.client
+        self.clients = {}
+        self.user_agent = None
+
+    def __call__(self, service_name, region_name=None, *args, **kw):
+        if args or kw:
+            return self.create_client(service_name, region_name, *args, **kw)
+        user_agent = self.session._session.user_agent_name
+        if user_agent != self.user_agent:
+            self.clients = {}
+            self.user_agent = user_agent
+        key = (service_name, region_name)
+        client = self.clients.get(key)
+        if client is None:
+            client = self.clients[key] = self.create_client(service_name, region_name)
+        return client
+
+
 def assumed_session(role_arn, session_name, session=None, region=None, external_id=None):
     """STS Role assume a boto3.Session
 
@@ -44,6 +44,13 @@ class ExecutionContext:
         self.api_stats = None
         self.sys_stats = None
 
+        # Shared resource fetch planning across a policy collection,
+        # set by the run command.
+        self.planner = None
+
+        # Per filter cost and selectivity, recorded during filtering.
+        self.filter_stats = []
+
         # A few tests patch on metrics flush
         # For backward compatibility, accept both 'metrics' and 'metrics_enabled' params (PR #4361)
         metrics = self.options.metrics or self.options.metrics_enabled
@@ -74,6 +81,7 @@ class ExecutionContext:
 
         self.start_time = time.time()
         self.execution_id = str(uuid.uuid4())
+        self.filter_stats = []
 
     @property
     def log_dir(self):
@@ -105,6 +113,11 @@ class ExecutionContext:
             'metadata.json', dumps(self.get_metadata(), indent=2))
         self.api_stats.__exit__(exc_type, exc_value, exc_traceback)
 
+        # Tracers writing to the policy output (profiling) do so ahead of its upload.
+        write_tracer_output = getattr(self.tracer, 'write_output', None)
+        if write_tracer_output:
+            write_tracer_output()
+
         with self.tracer.subsegment('output'):
             self.metrics.flush()
             self.logs.__exit__(exc_type, exc_value, exc_traceback)
@@ -122,7 +135,8 @@ class ExecutionContext:
         if os.environ.get('C7N_TEST_RUN'):
             reset_session_cache()
 
-    def get_metadata(self, include=('sys-stats', 'api-stats', 'metrics')):
+    def get_metadata(self, include=(
+            'sys-stats', 'api-stats', 'api-operations', 'metrics', 'filter-stats')):
         t = time.time()
         md = {
             'policy': self.policy.data,
@@ -139,6 +153,10 @@ class ExecutionContext:
             md['sys-stats'] = self.sys_stats.get_metadata()
         if 'api-stats' in include and self.api_stats:
             md['api-stats'] = self.api_stats.get_metadata()
+        if 'api-operations' in include and self.api_stats:
+            md['api-operations'] = self.api_stats.get_operation_stats()
         if 'metrics' in include and self.metrics:
             md['metrics'] = self.metrics.get_metadata()
+        if 'filter-stats' in include and self.filter_stats:
+            md['filter-stats'] = self.filter_stats
         return md
@@ -11,11 +11,71 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor)  # noqa
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor  # noqa
 
+import contextlib
 import threading
 
 
+_scope = threading.local()
+
+
+def get_execution_scope():
+    """Return the execution scope (typically a policy) of the current thread."""
+    return getattr(_scope, 'value', None)
+
+
+@contextlib.contextmanager
+def execution_scope(value):
+    """Attribute work done in the current thread to the given scope."""
+    previous = get_execution_scope()
+    _scope.value = value
+    try:
+        yield value
+    finally:
+        _scope.value = previous
+
+
+def get_execution_path():
+    """Return the frame path (typically a profile stack) of the current thread."""
+    return getattr(_scope, 'path', ())
+
+
+@contextlib.contextmanager
+def execution_path(path):
+    """Nest work done by pool threads submitted to under the given frame path."""
+    previous = get_execution_path()
+    _scope.path = path
+    try:
+        yield path
+    finally:
+        _scope.path = previous
+
+
+def _run_in_scope(scope, path, func, *args, **kw):
+    with execution_scope(scope), execution_path(path):
+        return func(*args, **kw)
+
+
+class ThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """Thread pool which carries the submitter's execution scope to workers.
+
+    When policies execute concurrently, this lets log records and api
+    calls made on pool threads be attributed to the policy that
+    submitted the work. The submitter's execution path is carried as
+    well, so profiled work on pool threads nests under the submitting
+    frame.
+    """
+
+    def submit(self, fn, *args, **kw):
+        scope, path = get_execution_scope(), get_execution_path()
+        if scope is None and not path:
+            return super(ThreadPoolExecutor, self).submit(fn, *args, **kw)
+        return super(ThreadPoolExecutor, self).submit(
+            _run_in_scope, scope, path, fn, *args, **kw)
+
+
 class MainThreadExecutor:
     """ For running tests.
 
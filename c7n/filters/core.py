@@ -18,12 +18,14 @@ import copy
 import datetime
 from datetime import timedelta
 import fnmatch
+import functools
 import ipaddress
 import logging
 import operator
 import re
 import sys
 import os
+import time
 
 from dateutil.tz import tzutc
 from dateutil.parser import parse
@@ -68,6 +70,26 @@ def regex_case_sensitive_match(value, regex):
     return bool(re.match(regex, value))
 
 
+def membership_operator(values, contains=True):
+    """Compile an in / not-in check against a static list of values.
+
+    Returns None if the values aren't hashable.
+    """
+    try:
+        members = frozenset(values)
+    except TypeError:
+        return None
+
+    def operator_member(x, y):
+        try:
+            found = x in members
+        except TypeError:
+            found = x in values
+        return found is contains
+
+    return operator_member
+
+
 def operator_in(x, y):
     return x in y
 
@@ -113,6 +135,29 @@ VALUE_TYPES = [
     'cidr', 'cidr_size', 'swap', 'resource_count', 'expr',
     'unique_size', 'date', 'version']
 
+# Value types which only convert the resource value, and compare it
+# against the filter value as is.
+STATIC_VALUE_TYPES = (None, 'normalize', 'integer', 'size', 'unique_size', 'cidr_size')
+
+SIMPLE_KEY_EXPR = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+
+def get_tag_value(k, i):
+    """Get the value of tag `tag:key` from a resource's tags or labels."""
+    tk = k.split(':', 1)[1]
+    if 'Tags' in i:
+        for t in i.get("Tags", []):
+            if t.get('Key') == tk:
+                return t.get('Value')
+    # GCP schema: 'labels': {'key': 'value'}
+    elif 'labels' in i:
+        return i.get('labels', {}).get(tk, None)
+    # GCP has a secondary form of labels called tags
+    # as labels without values.
+    # Azure schema: 'tags': {'key': 'value'}
+    elif 'tags' in i:
+        return i.get('tags', {}).get(tk, None)
+
 
 class FilterRegistry(PluginRegistry):
 
@@ -188,6 +233,10 @@ class Filter:
     def get_permissions(self):
         return self.permissions
 
+    def is_remote(self):
+        """Whether the filter makes api calls, per its permissions."""
+        return bool(self.get_permissions())
+
     def validate(self):
         """validate filter config, return validation error or self"""
         return self
@@ -233,6 +282,89 @@ def intersect_list(a, b):
     return res
 
 
+def is_filter_optimized(manager):
+    """Whether filter blocks should be reordered by cost (opt-in)."""
+    options = getattr(getattr(manager, 'ctx', None), 'options', None)
+    return bool(options and options.get('optimize_filters'))
+
+
+def is_resource_set_filter(f):
+    """Whether a filter, or one of its nested filters, counts the resource set."""
+    if any(is_resource_set_filter(sf) for sf in getattr(f, 'filters', None) or ()):
+        return True
+    return isinstance(f.data, dict) and f.data.get('value_type') == 'resource_count'
+
+
+def is_annotation_filter(f):
+    """Whether a filter, or one of its nested filters, reads or writes annotations.
+
+    Annotations are c7n prefixed keys, referenced either as a value
+    filter key or as a filter's annotation key attributes.
+    """
+    if any(is_annotation_filter(sf) for sf in getattr(f, 'filters', None) or ()):
+        return True
+    keys = [getattr(f, n) for n in dir(f.__class__)
+            if n.endswith(('annotation', 'annotation_key'))]
+    if isinstance(f.data, dict):
+        keys.append(f.data.get('key'))
+        if 'type' not in f.data:
+            keys.extend(f.data)
+    return any(isinstance(k, six.string_types) and k.strip('"').startswith('c7n')
+               for k in keys)
+
+
+def is_annotating_filter(f):
+    """Whether a filter, or one of its nested filters, may annotate resources.
+
+    Value filters annotate their matched key unless configured not to,
+    other filters are assumed to annotate resources they evaluate.
+    """
+    if isinstance(f, BooleanGroupFilter):
+        return any(is_annotating_filter(sf) for sf in f.filters)
+    if type(f) is ValueFilter:
+        return f.annotate
+    return True
+
+
+def order_filters(filters):
+    """Order a conjunction of filters to run in-memory filters first.
+
+    Local filters are moved ahead of filters making api calls, except
+    for filters referencing annotations (c7n prefixed keys) set by
+    other filters which keep their relative position. Resource count
+    filters operate on the whole resource set, and act as barriers
+    that filters aren't moved across.
+    """
+    ordered, local, pinned = [], [], []
+    for f in filters:
+        if is_resource_set_filter(f):
+            ordered.extend(local + pinned + [f])
+            local, pinned = [], []
+        elif is_annotation_filter(f) or f.is_remote():
+            pinned.append(f)
+        else:
+            local.append(f)
+    return ordered + local + pinned
+
+
+def apply_filter(f, resources, event=None, manager=None, block=None):
+    """Filter resources, recording the filter's cost and selectivity."""
+    rcount = len(resources)
+    t = time.time()
+    resources = f.process(resources, event)
+    stats = getattr(getattr(manager, 'ctx', None), 'filter_stats', None)
+    # filter sets record the stats of their filters
+    if stats is not None and not getattr(f, 'records_stats', False):
+        stats.append({
+            'filter': getattr(f, 'type', f.__class__.__name__),
+            'block': block,
+            'remote': f.is_remote(),
+            'resources-in': rcount,
+            'resources-out': len(resources),
+            'duration': time.time() - t})
+    return resources
+
+
 class BooleanGroupFilter(Filter):
 
     def __init__(self, data, registry, manager):
@@ -246,6 +378,14 @@ class BooleanGroupFilter(Filter):
             f.validate()
         return self
 
+    def is_remote(self):
+        return any(f.is_remote() for f in self.filters)
+
+    def get_filters(self):
+        if is_filter_optimized(self.manager):
+            return order_filters(self.filters)
+        return self.filters
+
     def get_resource_type_id(self):
         resource_type = self.manager.get_model()
         return resource_type.id
@@ -269,20 +409,31 @@ class Or(BooleanGroupFilter):
         rtype_id = self.get_resource_type_id()
         resource_map = {r[rtype_id]: r for r in resources}
         results = set()
-        for f in self.filters:
+        optimized = is_filter_optimized(self.manager)
+        for f in self.get_filters():
+            candidates = resources
+            # resources already matched don't need evaluation by later
+            # filters, unless those would annotate them.
+            if (optimized and results and not is_resource_set_filter(f) and
+                    not is_annotating_filter(f)):
+                candidates = [r for r in resources if r[rtype_id] not in results]
+                if not candidates:
+                    break
             results = results.union([
-                r[rtype_id] for r in f.process(resources, event)])
+                r[rtype_id] for r in apply_filter(
+                    f, candidates, event, self.manager, 'or')])
         return [resource_map[r_id] for r_id in results]
 
 
 class And(BooleanGroupFilter):
 
     def process(self, resources, events=None):
+        from c7n.filters.vector import get_filter_plan
         if self.manager:
             sweeper = AnnotationSweeper(self.get_resource_type_id(), resources)
 
-        for f in self.filters:
-            resources = f.process(resources, events)
+        for f in get_filter_plan(self.get_filters(), resources, self.manager, 'and'):
+            resources = apply_filter(f, resources, events, self.manager, 'and')
             if not resources:
                 break
 
@@ -310,12 +461,13 @@ class Not(BooleanGroupFilter):
         return False
 
     def process_set(self, resources, event):
+        from c7n.filters.vector import get_filter_plan
         rtype_id = self.get_resource_type_id()
         resource_map = {r[rtype_id]: r for r in resources}
         sweeper = AnnotationSweeper(rtype_id, resources)
 
-        for f in self.filters:
-            resources = f.process(resources, event)
+        for f in get_filter_plan(self.get_filters(), resources, self.manager, 'not'):
+            resources = apply_filter(f, resources, event, self.manager, 'not')
             if not resources:
                 break
 
@@ -369,6 +521,7 @@ class ValueFilter(Filter):
     """
     expr = None
     op = v = vtype = None
+    _match = _value_regex = None
 
     schema = {
         'type': 'object',
@@ -500,21 +653,7 @@ class ValueFilter(Filter):
 
     def get_resource_value(self, k, i):
         if k.startswith('tag:'):
-            tk = k.split(':', 1)[1]
-            r = None
-            if 'Tags' in i:
-                for t in i.get("Tags", []):
-                    if t.get('Key') == tk:
-                        r = t.get('Value')
-                        break
-            # GCP schema: 'labels': {'key': 'value'}
-            elif 'labels' in i:
-                r = i.get('labels', {}).get(tk, None)
-            # GCP has a secondary form of labels called tags
-            # as labels without values.
-            # Azure schema: 'tags': {'key': 'value'}
-            elif 'tags' in i:
-                r = i.get('tags', {}).get(tk, None)
+            r = get_tag_value(k, i)
         elif k in i:
             r = i.get(k)
         elif k not in self.expr:
@@ -524,11 +663,15 @@ class ValueFilter(Filter):
             r = self.expr[k].search(i)
 
         if 'value_regex' in self.data:
-            regex = ValueRegex(self.data['value_regex'])
-            r = regex.get_resource_value(r)
+            r = self.get_value_regex().get_resource_value(r)
         return r
 
-    def match(self, i):
+    def get_value_regex(self):
+        if self._value_regex is None:
+            self._value_regex = ValueRegex(self.data['value_regex'])
+        return self._value_regex
+
+    def _initialize_value(self):
         if self.v is None and len(self.data) == 1:
             [(self.k, self.v)] = self.data.items()
         elif self.v is None and not hasattr(self, 'content_initialized'):
@@ -542,109 +685,253 @@ class ValueFilter(Filter):
             self.content_initialized = True
             self.vtype = self.data.get('value_type')
 
-        if i is None:
+    def reset_values(self):
+        """Clear values resolved from external sources (value_from).
+
+        Lets a filter reused across executions, ie. by a warm lambda
+        container, resolve them again.
+        """
+        if 'value_from' not in self.data:
+            return
+        self.v = self._match = None
+        self.__dict__.pop('content_initialized', None)
+
+    def compile(self):
+        """Compile the filter into a single resource matching function.
+
+        The key accessor, value conversion, operator and any static
+        comparison values (dates, cidrs, versions, regexes, membership
+        sets) are resolved once per filter instead of once per resource.
+        """
+        self._initialize_value()
+        get_value = self.get_value_accessor(self.k)
+        match_value = self.compile_value()
+
+        def match(i):
+            if i is None:
+                return False
+            return match_value(get_value(i), i)
+        return match
+
+    def compile_value(self):
+        """Compile the filter into a function matching an extracted value.
+
+        The resource is only referenced by value types comparing against
+        another of its values (expr).
+        """
+        self._initialize_value()
+        op = self.op and self.get_value_operator() or None
+        in_op = self.op in ('in', 'not-in')
+        sentinel = self.get_value_sentinel()
+        convert = self.vtype is not None and self.get_value_converter() or None
+        expected = self.v
+
+        def match_value(r, i):
+            if in_op and r is None:
+                r = ()
+
+            # value type conversion
+            if convert is not None:
+                v, r = convert(sentinel, r, i)
+            else:
+                v = sentinel
+
+            # Value match
+            if r is None and v == 'absent':
+                return True
+            elif r is not None and v == 'present':
+                return True
+            elif v == 'not-null' and r:
+                return True
+            elif v == 'empty' and not r:
+                return True
+            elif op:
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            elif r == expected:
+                return True
             return False
+        return match_value
 
-        # value extract
-        r = self.get_resource_value(self.k, i)
+    def match(self, i):
+        if self._match is None:
+            if i is None:
+                return False
+            self._match = self.compile()
+        return self._match(i)
 
-        if self.op in ('in', 'not-in') and r is None:
-            r = ()
+    def get_value_accessor(self, k):
+        """Return a function extracting the value of key `k` from a resource."""
+        if type(self).get_resource_value is not ValueFilter.get_resource_value:
+            return functools.partial(self.get_resource_value, k)
 
-        # value type conversion
-        if self.vtype is not None:
-            v, r = self.process_value_type(self.v, r, i)
+        if k.startswith('tag:'):
+            accessor = functools.partial(get_tag_value, k)
+        elif SIMPLE_KEY_EXPR.match(k):
+            # plain dotted field lookups don't need the jmespath interpreter
+            path = k.split('.')
+
+            def accessor(i):
+                if k in i:
+                    return i.get(k)
+                for p in path:
+                    if not isinstance(i, dict):
+                        return None
+                    i = i.get(p)
+                return i
         else:
-            v = self.v
-
-        # Value match
-        if r is None and v == 'absent':
-            return True
-        elif r is not None and v == 'present':
-            return True
-        elif v == 'not-null' and r:
-            return True
-        elif v == 'empty' and not r:
-            return True
-        elif self.op:
-            op = OPERATORS[self.op]
             try:
-                return op(r, v)
-            except TypeError:
-                return False
-        elif r == self.v:
-            return True
+                search = jmespath.compile(k).search
+            except jmespath.exceptions.JMESPathError:
+                # only raise for resources missing the literal key.
+                search = functools.partial(jmespath.search, k)
+
+            def accessor(i):
+                if k in i:
+                    return i.get(k)
+                return search(i)
+
+        if 'value_regex' not in self.data:
+            return accessor
+        regex = self.get_value_regex()
+        return lambda i: regex.get_resource_value(accessor(i))
+
+    def get_value_operator(self):
+        """Return the comparison operator, specialized for static values."""
+        op = OPERATORS[self.op]
+        if self.vtype not in STATIC_VALUE_TYPES:
+            return op
+        if self.op in ('in', 'ni', 'not-in') and isinstance(self.v, (list, tuple)):
+            return membership_operator(self.v, self.op == 'in') or op
+        elif not isinstance(self.v, six.string_types):
+            return op
+        elif self.op in ('regex', 'regex-case'):
+            try:
+                pattern = re.compile(
+                    self.v, self.op == 'regex' and re.IGNORECASE or 0)
+            except re.error:
+                return op
+            return lambda r, v: isinstance(
+                r, six.string_types) and pattern.match(r) is not None
+        elif self.op == 'glob':
+            pattern = re.compile(fnmatch.translate(os.path.normcase(self.v)))
+            return lambda r, v: isinstance(
+                r, six.string_types) and pattern.match(os.path.normcase(r)) is not None
+        return op
+
+    def get_value_sentinel(self):
+        """Return the filter value, pre-parsed for its value type."""
+        v = self.v
+        if self.vtype == 'date':
+            return parse_date(v)
+        elif self.vtype in ('age', 'expiration'):
+            if not isinstance(v, datetime.datetime):
+                try:
+                    return timedelta(v)
+                except TypeError:
+                    return v
+        elif self.vtype == 'cidr' and isinstance(v, six.string_types):
+            return parse_cidr(v) or v
+        elif self.vtype == 'version':
+            return ComparableVersion(v)
+        return v
 
-        return False
+    def get_value_converter(self):
+        if type(self).process_value_type is not ValueFilter.process_value_type:
+            return self.process_value_type
+        handler = getattr(self, 'process_%s_value' % self.vtype, None)
+        if handler is None:
+            return lambda sentinel, value, resource: (sentinel, value)
+        return handler
 
     def process_value_type(self, sentinel, value, resource):
-        if self.vtype == 'normalize' and isinstance(value, six.string_types):
+        handler = getattr(self, 'process_%s_value' % self.vtype, None)
+        if handler is None:
+            return sentinel, value
+        return handler(sentinel, value, resource)
+
+    def process_normalize_value(self, sentinel, value, resource):
+        if isinstance(value, six.string_types):
             return sentinel, value.strip().lower()
+        return sentinel, value
 
-        elif self.vtype == 'expr':
-            sentinel = self.get_resource_value(sentinel, resource)
-            return sentinel, value
+    def process_expr_value(self, sentinel, value, resource):
+        return self.get_resource_value(sentinel, resource), value
 
-        elif self.vtype == 'integer':
-            try:
-                value = int(str(value).strip())
-            except ValueError:
-                value = 0
-        elif self.vtype == 'size':
-            try:
-                return sentinel, len(value)
-            except TypeError:
-                return sentinel, 0
-        elif self.vtype == 'unique_size':
-            try:
-                return sentinel, len(set(value))
-            except TypeError:
-                return sentinel, 0
-        elif self.vtype == 'swap':
-            return value, sentinel
-        elif self.vtype == 'date':
-            return parse_date(sentinel), parse_date(value)
-        elif self.vtype == 'age':
-            if not isinstance(sentinel, datetime.datetime):
-                sentinel = datetime.datetime.now(tz=tzutc()) - timedelta(sentinel)
-            value = parse_date(value)
-            if value is None:
-                # compatiblity
-                value = 0
-            # Reverse the age comparison, we want to compare the value being
-            # greater than the sentinel typically. Else the syntax for age
-            # comparisons is intuitively wrong.
-            return value, sentinel
-        elif self.vtype == 'cidr':
-            s = parse_cidr(sentinel)
-            v = parse_cidr(value)
-            if (isinstance(s, ipaddress._BaseAddress) and isinstance(v, ipaddress._BaseNetwork)):
-                return v, s
-            return s, v
-        elif self.vtype == 'cidr_size':
-            cidr = parse_cidr(value)
-            if cidr:
-                return sentinel, cidr.prefixlen
-            return sentinel, 0
+    def process_integer_value(self, sentinel, value, resource):
+        try:
+            value = int(str(value).strip())
+        except ValueError:
+            value = 0
+        return sentinel, value
 
-        # Allows for expiration filtering, for events in the future as opposed
-        # to events in the past which age filtering allows for.
-        elif self.vtype == 'expiration':
-            if not isinstance(sentinel, datetime.datetime):
-                sentinel = datetime.datetime.now(tz=tzutc()) + timedelta(sentinel)
-            value = parse_date(value)
-            if value is None:
-                value = 0
-            return sentinel, value
+    def process_size_value(self, sentinel, value, resource):
+        try:
+            return sentinel, len(value)
+        except TypeError:
+            return sentinel, 0
 
-        # Allows for comparing version numbers, for things that you expect a minimum version number.
-        elif self.vtype == 'version':
-            s = ComparableVersion(sentinel)
-            v = ComparableVersion(value)
-            return s, v
+    def process_unique_size_value(self, sentinel, value, resource):
+        try:
+            return sentinel, len(set(value))
+        except TypeError:
+            return sentinel, 0
 
+    def process_swap_value(self, sentinel, value, resource):
+        return value, sentinel
+
+    def process_date_value(self, sentinel, value, resource):
+        return parse_date(sentinel), parse_date(value)
+
+    def process_age_value(self, sentinel, value, resource):
+        if not isinstance(sentinel, datetime.datetime):
+            if not isinstance(sentinel, timedelta):
+                sentinel = timedelta(sentinel)
+            sentinel = datetime.datetime.now(tz=tzutc()) - sentinel
+        value = parse_date(value)
+        if value is None:
+            # compatiblity
+            value = 0
+        # Reverse the age comparison, we want to compare the value being
+        # greater than the sentinel typically. Else the syntax for age
+        # comparisons is intuitively wrong.
+        return value, sentinel
+
+    def process_cidr_value(self, sentinel, value, resource):
+        s = sentinel
+        if not isinstance(s, (ipaddress._BaseAddress, ipaddress._BaseNetwork)):
+            s = parse_cidr(sentinel)
+        v = parse_cidr(value)
+        if (isinstance(s, ipaddress._BaseAddress) and isinstance(v, ipaddress._BaseNetwork)):
+            return v, s
+        return s, v
+
+    def process_cidr_size_value(self, sentinel, value, resource):
+        cidr = parse_cidr(value)
+        if cidr:
+            return sentinel, cidr.prefixlen
+        return sentinel, 0
+
+    # Allows for expiration filtering, for events in the future as opposed
+    # to events in the past which age filtering allows for.
+    def process_expiration_value(self, sentinel, value, resource):
+        if not isinstance(sentinel, datetime.datetime):
+            if not isinstance(sentinel, timedelta):
+                sentinel = timedelta(sentinel)
+            sentinel = datetime.datetime.now(tz=tzutc()) + sentinel
+        value = parse_date(value)
+        if value is None:
+            value = 0
         return sentinel, value
 
+    # Allows for comparing version numbers, for things that you expect a minimum version number.
+    def process_version_value(self, sentinel, value, resource):
+        if not isinstance(sentinel, ComparableVersion):
+            sentinel = ComparableVersion(sentinel)
+        return sentinel, ComparableVersion(value)
+
 
 class AgeFilter(Filter):
     """Automatically filter resources older than a given date.
@@ -721,6 +1008,10 @@ def cast_tz(d, tz):
     return d.astimezone(tz)
 
 
+# fromisoformat is available from python 3.7
+FROM_ISO_FORMAT = getattr(datetime.datetime, 'fromisoformat', None)
+
+
 def parse_date(v, tz=None):
     if v is None:
         return v
@@ -733,6 +1024,12 @@ def parse_date(v, tz=None):
         return v
 
     if isinstance(v, six.string_types):
+        # fast path for iso 8601 timestamps
+        if FROM_ISO_FORMAT and len(v) > 9 and v[4] == '-' and v[7] == '-':
+            try:
+                return cast_tz(FROM_ISO_FORMAT(v), tz)
+            except ValueError:
+                pass
         try:
             return cast_tz(parse(v), tz)
         except (AttributeError, TypeError, ValueError, OverflowError):
@@ -256,6 +256,41 @@ def parens_removed(u):
     return u.translate({ord('('): None, ord(')'): None})
 
 
+class TimeZoneAliases(dict):
+    """Timezone aliases, including lower cased non title case zone names.
+
+    Reading the zone names out of the dateutil zonefile is slow, so
+    they're only loaded on a lookup of an alias we don't have.
+    """
+
+    zones_loaded = False
+
+    def load_zones(self):
+        if self.zones_loaded:
+            return
+        self.zones_loaded = True
+        zones = {z.lower(): z for z in zoneinfo.get_zonefile_instance().zones
+                 if z.title() != z and not dict.__contains__(self, z.lower())}
+        self.update(zones)
+
+    def __missing__(self, key):
+        self.load_zones()
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if not dict.__contains__(self, key):
+            self.load_zones()
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
 class Time(Filter):
     """
     Schedule offhours for resources see :ref:`offhours <offhours>`
@@ -281,7 +316,7 @@ class Time(Filter):
     DEFAULT_TAG = "maid_offhours"
     DEFAULT_TZ = 'et'
 
-    TZ_ALIASES = {
+    TZ_ALIASES = TimeZoneAliases({
         'pdt': 'America/Los_Angeles',
         'pt': 'America/Los_Angeles',
         'pst': 'America/Los_Angeles',
@@ -310,14 +345,7 @@ class Time(Filter):
         'brt': 'America/Sao_Paulo',
         'nzst': 'Pacific/Auckland',
         'utc': 'Etc/UTC',
-    }
-
-    z_names = list(zoneinfo.get_zonefile_instance().zones)
-    non_title_case_zones = (
-        lambda aliases=TZ_ALIASES.keys(), z_names=z_names:
-        {z.lower(): z for z in z_names
-            if z.title() != z and z.lower() not in aliases})()
-    TZ_ALIASES.update(non_title_case_zones)
+    })
 
     def __init__(self, data, manager=None):
         super(Time, self).__init__(data, manager)
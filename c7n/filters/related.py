@@ -51,6 +51,10 @@ class RelatedResourceFilter(ValueFilter):
     def get_related(self, resources):
         resource_manager = self.get_resource_manager()
         related_ids = self.get_related_ids(resources)
+        planner = getattr(self.manager.ctx, 'planner', None)
+        if planner is not None:
+            return planner.related.get_resources(
+                resource_manager, related_ids, self.FetchThreshold)
         model = resource_manager.get_model()
         if len(related_ids) < self.FetchThreshold:
             related = resource_manager.get_resources(list(related_ids))
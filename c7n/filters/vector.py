@@ -0,0 +1,264 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Vectorised value filters
+------------------------
+
+With numpy installed and ``custodian run --optimize-filters``, runs of
+value filters within a conjunction over large resource sets are
+evaluated as boolean masks over resource columns, instead of one
+resource at a time.
+
+Each key referenced is projected into a column once per resource
+batch, shared by the filters referencing it. Columns are dictionary
+encoded, so a filter's value match is evaluated once per distinct
+value, and ordering comparisons of numbers and of dates (age and
+expiration value types) are evaluated over numeric arrays. Masks are
+combined before materializing the matched resources.
+
+Filters not supported (other filter types, value filters customizing
+how they match, or matching against other resource values) are
+evaluated per resource as usual, results are identical either way.
+"""
+import datetime
+import operator
+import time
+
+from dateutil.tz import tzutc
+
+from c7n.filters.core import (
+    ANNOTATION_KEY, Filter, ValueFilter, is_filter_optimized, parse_date)
+from c7n.utils import set_annotation
+
+try:
+    import numpy
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+
+# minimum resources for evaluating filters as columns
+MIN_RESOURCES = 1000
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=tzutc())
+MICROSECOND = datetime.timedelta(microseconds=1)
+MAX_EXACT_FLOAT = 2 ** 53
+# types which raise TypeError when compared to numbers
+NON_NUMBER_TYPES = (type(None), str, list, dict, tuple, datetime.datetime)
+
+ORDER_OPERATORS = {
+    'gt': operator.gt,
+    'greater-than': operator.gt,
+    'ge': operator.ge,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'less-than': operator.lt,
+    'le': operator.le,
+    'lte': operator.le}
+
+# value filter methods which, when customized by a subclass, can change
+# how a resource matches beyond its extracted value.
+MATCH_METHODS = (
+    'process', '__call__', 'match', 'compile', 'compile_value',
+    'get_value_accessor', 'get_value_converter', 'process_value_type')
+
+
+def is_vectorizable(f):
+    if not isinstance(f, ValueFilter):
+        return False
+    for m in MATCH_METHODS:
+        if getattr(type(f), m) is not getattr(ValueFilter, m):
+            return False
+    return f.data.get('value_type') not in ('expr', 'resource_count')
+
+
+def get_filter_plan(filters, resources, manager, block=None):
+    """Group runs of vectorizable filters in a conjunction into vector filter sets."""
+    if not HAVE_NUMPY or len(resources) < MIN_RESOURCES or not is_filter_optimized(manager):
+        return filters
+    plan, run = [], []
+    for f in filters:
+        if is_vectorizable(f):
+            run.append(f)
+            continue
+        if run:
+            plan.append(VectorFilterSet(run, manager, block))
+            run = []
+        plan.append(f)
+    if run:
+        plan.append(VectorFilterSet(run, manager, block))
+    return plan
+
+
+class Column:
+    """A dictionary encoded column of resource values."""
+
+    def __init__(self, values):
+        index = {}
+        self.uniques = uniques = []
+        codes = []
+        for v in values:
+            try:
+                # keyed by type, as equal values of different types (1, 1.0,
+                # True) can match differently.
+                code = index.setdefault((type(v), v), len(uniques))
+            except TypeError:
+                code = len(uniques)
+            if code == len(uniques):
+                uniques.append(v)
+            codes.append(code)
+        self.codes = numpy.array(codes, dtype=numpy.int64)
+        self._numbers = self._dates = None
+
+    def broadcast(self, unique_mask):
+        return unique_mask[self.codes]
+
+    def get_numbers(self):
+        """Distinct values as floats, nan for values that aren't numbers.
+
+        None if the column has numbers which aren't exactly representable,
+        or values which may be comparable to numbers.
+        """
+        if self._numbers is None:
+            numbers = numpy.full(len(self.uniques), numpy.nan, dtype=numpy.float64)
+            for idx, v in enumerate(self.uniques):
+                if isinstance(v, (int, float)):
+                    if isinstance(v, int) and abs(v) > MAX_EXACT_FLOAT:
+                        numbers = False
+                        break
+                    numbers[idx] = v
+                elif not isinstance(v, NON_NUMBER_TYPES):
+                    numbers = False
+                    break
+            self._numbers = numbers
+        if self._numbers is False:
+            return None
+        return self._numbers
+
+    def get_dates(self):
+        """Distinct values parsed as dates, as epoch microseconds and a valid mask."""
+        if self._dates is None:
+            micros = numpy.zeros(len(self.uniques), dtype=numpy.int64)
+            valid = numpy.zeros(len(self.uniques), dtype=bool)
+            for idx, v in enumerate(self.uniques):
+                d = parse_date(v)
+                if d is not None:
+                    micros[idx] = (d - EPOCH) // MICROSECOND
+                    valid[idx] = True
+            self._dates = (micros, valid)
+        return self._dates
+
+
+class ResourceBatch:
+    """Resource values projected into columns, once per key."""
+
+    def __init__(self, resources):
+        self.resources = resources
+        self.columns = {}
+
+    def get_column(self, f):
+        key = (f.k, f.data.get('value_regex'), type(f).get_resource_value)
+        if key not in self.columns:
+            accessor = f.get_value_accessor(f.k)
+            self.columns[key] = Column([accessor(r) for r in self.resources])
+        return self.columns[key]
+
+    def get_mask(self, f):
+        f._initialize_value()
+        column = self.get_column(f)
+        unique_mask = (
+            get_date_mask(f, column) if f.vtype in ('age', 'expiration') else
+            get_number_mask(f, column) if f.vtype is None else None)
+        if unique_mask is None:
+            match_value = f.compile_value()
+            unique_mask = numpy.fromiter(
+                (bool(match_value(v, None)) for v in column.uniques),
+                dtype=bool, count=len(column.uniques))
+        return column.broadcast(unique_mask)
+
+
+def get_number_mask(f, column):
+    """Ordering comparison against a number, over the column's numbers."""
+    op = ORDER_OPERATORS.get(f.op)
+    v = f.v
+    if op is None or isinstance(v, bool) or not isinstance(v, (int, float)):
+        return None
+    if isinstance(v, int) and abs(v) > MAX_EXACT_FLOAT:
+        return None
+    numbers = column.get_numbers()
+    if numbers is None:
+        return None
+    # non numbers raise TypeError and don't match, as do nan comparisons.
+    with numpy.errstate(invalid='ignore'):
+        return op(numbers, float(v))
+
+
+def get_date_mask(f, column):
+    """Ordering comparison of age or expiration, over the column's dates."""
+    op = ORDER_OPERATORS.get(f.op)
+    if op is None:
+        return None
+    sentinel = f.get_value_sentinel()
+    if isinstance(sentinel, datetime.timedelta):
+        now = datetime.datetime.now(tz=tzutc())
+        sentinel = f.vtype == 'age' and now - sentinel or now + sentinel
+    elif not isinstance(sentinel, datetime.datetime) or sentinel.tzinfo is None:
+        return None
+    threshold = (sentinel - EPOCH) // MICROSECOND
+    micros, valid = column.get_dates()
+    # age compares the threshold against the resource date, expiration the
+    # resource date against the threshold, unparseable dates don't match.
+    if f.vtype == 'age':
+        return valid & op(threshold, micros)
+    return valid & op(micros, threshold)
+
+
+class VectorFilterSet(Filter):
+    """A conjunction of value filters evaluated as column masks."""
+
+    type = 'vector'
+    records_stats = True
+
+    def __init__(self, filters, manager=None, block=None):
+        super(VectorFilterSet, self).__init__({'and': [f.data for f in filters]}, manager)
+        self.filters = filters
+        self.block = block
+
+    def is_remote(self):
+        return False
+
+    def process(self, resources, event=None):
+        batch = ResourceBatch(resources)
+        stats = getattr(getattr(self.manager, 'ctx', None), 'filter_stats', None)
+        alive = numpy.ones(len(resources), dtype=bool)
+        count = len(resources)
+        for f in self.filters:
+            t = time.time()
+            matched = alive & batch.get_mask(f)
+            if f.annotate:
+                for idx in numpy.flatnonzero(matched).tolist():
+                    set_annotation(resources[idx], ANNOTATION_KEY, f.k)
+            rcount, count = count, int(matched.sum())
+            alive = matched
+            if stats is not None:
+                stats.append({
+                    'filter': f.type,
+                    'block': self.block,
+                    'remote': False,
+                    'resources-in': rcount,
+                    'resources-out': count,
+                    'duration': time.time() - t})
+            if not count:
+                break
+        return [resources[idx] for idx in numpy.flatnonzero(alive).tolist()]
@@ -11,12 +11,18 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import logging
+import threading
+
 from c7n.exceptions import PolicyValidationError
-from c7n.utils import local_session, type_schema
+from c7n.planner import get_run_index
+from c7n.utils import chunks, local_session, type_schema
 
 from .core import Filter, ValueFilter
 from .related import RelatedResourceFilter
 
+log = logging.getLogger('custodian.filters.vpc')
+
 
 class MatchResourceValidator:
 
@@ -62,6 +68,145 @@ class VpcFilter(MatchResourceValidator, RelatedResourceFilter):
     AnnotationKey = "matched-vpcs"
 
 
+def get_permission_groups(sg):
+    """Return the ids of groups referenced by a security group's permissions."""
+    group_ids = []
+    for perm_type in ('IpPermissions', 'IpPermissionsEgress'):
+        for p in sg.get(perm_type, []):
+            for g in p.get('UserIdGroupPairs', ()):
+                group_ids.append(g['GroupId'])
+    return group_ids
+
+
+class SecurityGroupReferences:
+    """Reverse index of security group ids to the resources referencing them.
+
+    Built from network interfaces, lambda functions, launch
+    configurations and the permissions of other security groups. With a
+    resource planner the index is shared by the policies of a run.
+
+    Each source is scanned once, and rescanned only when a policy's
+    actions modify resources of its type. Actions on other network
+    attached resources also rescan network interfaces. The
+    modify-security-groups action on interfaces updates their entries in
+    place instead.
+    """
+
+    # name, resource type, id key, referenced group ids
+    sources = (
+        ('nics', 'eni', 'NetworkInterfaceId',
+         lambda r: [g['GroupId'] for g in r['Groups']]),
+        ('sg-perm-refs', 'security-group', 'GroupId', get_permission_groups),
+        ('lambdas', 'lambda', 'FunctionName',
+         lambda r: 'VpcConfig' in r and r['VpcConfig']['SecurityGroupIds'] or []),
+        ('launch-configs', 'launch-config', 'LaunchConfigurationName',
+         lambda r: r['SecurityGroups'] + r['ClassicLinkVPCSecurityGroups']),
+    )
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # group id -> (resource type, resource id) referencing it
+        self.references = {}
+        # (resource type, resource id) -> referenced group ids
+        self.resource_groups = {}
+        self.group_names = {}
+        self.current = set()
+        self.peered = {}
+        self.stale = {}
+
+    def refresh(self, manager, resource_types=None):
+        """Scan sources not yet scanned, or modified since."""
+        with self.lock:
+            for name, rtype, id_key, get_groups in self.sources:
+                if rtype in self.current or (
+                        resource_types is not None and rtype not in resource_types):
+                    continue
+                resources = manager.get_resource_manager(rtype).resources()
+                for key in [k for k in self.resource_groups if k[0] == rtype]:
+                    self.set_groups(key, ())
+                for r in resources:
+                    self.set_groups((rtype, r[id_key]), get_groups(r))
+                if rtype == 'security-group':
+                    self.group_names = {}
+                    for r in resources:
+                        self.group_names.setdefault(r['GroupName'], []).append(r)
+                self.current.add(rtype)
+                log.debug(
+                    "%s using %d sgs, total %d",
+                    name, len({g for r in resources for g in get_groups(r)}),
+                    len(self.references))
+        return self
+
+    def set_groups(self, key, group_ids):
+        for g in self.resource_groups.pop(key, ()):
+            refs = self.references[g]
+            refs.discard(key)
+            if not refs:
+                self.references.pop(g)
+        if group_ids:
+            self.resource_groups[key] = set(group_ids)
+            for g in group_ids:
+                self.references.setdefault(g, set()).add(key)
+
+    def update(self, resource_type, resource_id, group_ids):
+        """Update the groups referenced by a resource in place."""
+        with self.lock:
+            self.set_groups((resource_type, resource_id), group_ids)
+
+    def invalidate(self, resource_type, actions=()):
+        with self.lock:
+            if resource_type == 'eni' and actions and set(actions) == {
+                    'modify-security-groups'}:
+                return
+            self.current.discard(resource_type)
+            # actions on network attached resources can create, delete,
+            # or modify their interfaces.
+            self.current.discard('eni')
+            if resource_type == 'security-group':
+                self.peered.clear()
+                self.stale.clear()
+
+    def is_used(self, group_id):
+        return group_id in self.references
+
+    def get_references(self, group_id):
+        """Return the (resource type, resource id) referencing a group."""
+        return frozenset(self.references.get(group_id, ()))
+
+    def get_groups_by_name(self, names):
+        names = set(names)
+        return [g for n in names for g in self.group_names.get(n, ())]
+
+    def get_peered(self, manager, group_ids):
+        """Return the ids of groups referenced across peered vpcs."""
+        with self.lock:
+            missing = [g for g in group_ids if g not in self.peered]
+            if missing:
+                client = local_session(manager.session_factory).client('ec2')
+            for group_set in chunks(missing, 200):
+                peered = dict.fromkeys(group_set, False)
+                for sg_ref in client.describe_security_group_references(
+                        GroupId=group_set)['SecurityGroupReferenceSet']:
+                    peered[sg_ref['GroupId']] = True
+                self.peered.update(peered)
+            return {g for g in group_ids if self.peered[g]}
+
+    def get_stale(self, manager, vpc_id):
+        """Return the stale security groups of a vpc."""
+        with self.lock:
+            if vpc_id not in self.stale:
+                client = local_session(manager.session_factory).client('ec2')
+                self.stale[vpc_id] = client.describe_stale_security_groups(
+                    VpcId=vpc_id).get('StaleSecurityGroupSet', ())
+            return self.stale[vpc_id]
+
+
+def get_sg_references(manager, shared=False):
+    """Return the security group reference index for a policy."""
+    return get_run_index(
+        manager, 'security-group-references', SecurityGroupReferences, shared)
+
+
 class DefaultVpcBase(Filter):
     """Filter to resources in a default vpc."""
     vpcs = None
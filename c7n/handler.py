@@ -19,10 +19,12 @@ import logging
 import json
 
 from c7n.config import Config
+from c7n.filters import ValueFilter
 from c7n.structure import StructureParser
 from c7n.resources import load_resources
 from c7n.policy import PolicyCollection
-from c7n.utils import format_event, get_account_id_from_sts, local_session
+from c7n.utils import (
+    format_event, get_account_id_from_sts, local_session, reset_session_cache)
 
 import boto3
 
@@ -63,6 +65,16 @@ policy_data = None
 # execution options for the policy
 policy_config = None
 
+# policies and their resource managers, built once per container and
+# reused across warm invocations.
+policies = None
+
+# names of policies that have been validated
+policies_validated = set()
+
+# per invocation state of policies, restored ahead of each invocation
+policy_state = None
+
 
 def init_env_globals():
     """Set module level values from environment variables.
@@ -146,12 +158,64 @@ def init_config(policy_config):
 init_env_globals()
 
 
+def init_policies(policy_data, policy_config):
+    """Build the container's policies, and capture their initial state."""
+    global policies, policy_state
+    policies = PolicyCollection.from_data(policy_data, policy_config)
+    policy_state = (dict(policy_config), [
+        (p.session_factory, getattr(p.session_factory, 'region', None),
+         getattr(p.session_factory, 'assume_role', None)) for p in policies])
+    policies_validated.clear()
+    return policies
+
+
+def reset_policies():
+    """Reset per invocation state carried over from a prior warm invocation.
+
+    Lambda policies with a member-role modify their execution options and
+    session factory for each event's account and region. Filter values
+    from external sources are resolved again for each invocation.
+    """
+    for p in policies:
+        for f in p.resource_manager.iter_filters():
+            if isinstance(f, ValueFilter):
+                f.reset_values()
+    options, factories = policy_state
+    policy_config.update(options)
+    reset = False
+    for factory, region, assume_role in factories:
+        if (getattr(factory, 'region', None) != region or
+                getattr(factory, 'assume_role', None) != assume_role):
+            factory.region = region
+            factory.assume_role = assume_role
+            reset = True
+    if reset:
+        reset_session_cache()
+
+
+def get_record_error(record):
+    try:
+        return json.loads(record['body']).get('detail', {}).get('errorCode')
+    except (KeyError, ValueError, AttributeError):
+        return None
+
+
 def dispatch_event(event, context):
     error = event.get('detail', {}).get('errorCode')
     if error and C7N_SKIP_EVTERR:
         log.debug("Skipping failed operation: %s" % error)
         return
 
+    # batches of events delivered via an sqs queue
+    if 'Records' in event and C7N_SKIP_EVTERR:
+        records = [r for r in event['Records'] if not get_record_error(r)]
+        if len(records) != len(event['Records']):
+            log.debug("Skipping %d failed operations" % (
+                len(event['Records']) - len(records)))
+        if not records:
+            return
+        event['Records'] = records
+
     # one time initialization for cold starts.
     global policy_config, policy_data
     if policy_config is None:
@@ -167,12 +231,18 @@ def dispatch_event(event, context):
     if not policy_data or not policy_data.get('policies'):
         return False
 
-    policies = PolicyCollection.from_data(policy_data, policy_config)
+    if policies is None:
+        init_policies(policy_data, policy_config)
+    else:
+        reset_policies()
+
     for p in policies:
         try:
             # validation provides for an initialization point for
-            # some filters/actions.
-            p.validate()
+            # some filters/actions, done once per container.
+            if p.name not in policies_validated:
+                p.validate()
+                policies_validated.add(p.name)
             p.push(event, context)
         except Exception:
             log.exception("error during policy execution")
@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from collections import deque
+import contextlib
 import logging
 
 from c7n import cache
 from c7n.executor import ThreadPoolExecutor
+from c7n.planner import NullSnapshot
 from c7n.provider import clouds
 from c7n.registry import PluginRegistry
 from c7n.resources import load_resources
@@ -72,6 +74,19 @@ class ResourceManager:
     def resources(self):
         raise NotImplementedError("")
 
+    @contextlib.contextmanager
+    def get_resource_snapshot(self):
+        """Shared resource snapshot for the policy's primary resource query.
+
+        Yields an object supporting get(cache_key) and save(cache_key, resources).
+        """
+        planner = getattr(self.ctx, 'planner', None)
+        if planner is None or self.data != self.ctx.policy.data:
+            yield NullSnapshot()
+            return
+        with planner.snapshot(self.ctx.policy) as snapshot:
+            yield snapshot
+
     def get_resource_manager(self, resource_type, data=None):
         """get a resource manager or a given resource type.
 
@@ -95,18 +110,24 @@ class ResourceManager:
             return klass(self.ctx, {'source': self.source_type})
         return klass(self.ctx, data or {})
 
-    def filter_resources(self, resources, event=None):
+    def filter_resources(self, resources, event=None, filters=None):
+        from c7n.filters.core import apply_filter, is_filter_optimized, order_filters
+        from c7n.filters.vector import get_filter_plan
         original = len(resources)
+        if filters is None:
+            filters = self.filters
         if event and event.get('debug', False):
             self.log.info(
-                "Filtering resources with %s", self.filters)
-        for f in self.filters:
+                "Filtering resources with %s", filters)
+        if is_filter_optimized(self):
+            filters = get_filter_plan(order_filters(filters), resources, self)
+        for f in filters:
             if not resources:
                 break
             rcount = len(resources)
 
             with self.ctx.tracer.subsegment("filter:%s" % f.type):
-                resources = f.process(resources, event)
+                resources = apply_filter(f, resources, event, self)
 
             if event and event.get('debug', False):
                 self.log.debug(
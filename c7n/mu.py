@@ -891,6 +891,10 @@ class PolicyLambda(AbstractLambdaFunction):
         elif self.policy.data['mode']['type'] == 'hub-action':
             events.append(
                 SecurityHubAction(self.policy, session_factory))
+        elif self.policy.data['mode'].get('batch'):
+            events.append(
+                CloudWatchEventQueueSource(
+                    self.policy.data['mode'], session_factory))
         else:
             events.append(
                 CloudWatchEventSource(
@@ -1077,7 +1081,7 @@ class CloudWatchEventSource:
             payload = merge_dict(payload, self.data['pattern'])
         return json.dumps(payload)
 
-    def add(self, func):
+    def put_rule(self, func):
         params = dict(
             Name=func.name, Description=func.description, State='ENABLED')
 
@@ -1098,13 +1102,16 @@ class CloudWatchEventSource:
             response = self.client.put_rule(**params)
         else:
             response = {'RuleArn': rule['Arn']}
+        return response['RuleArn']
 
+    def add(self, func):
+        rule_arn = self.put_rule(func)
         client = self.session.client('lambda')
         try:
             client.add_permission(
                 FunctionName=func.name,
                 StatementId=func.name,
-                SourceArn=response['RuleArn'],
+                SourceArn=rule_arn,
                 Action='lambda:InvokeFunction',
                 Principal='events.amazonaws.com')
             log.debug('Added lambda invoke cwe rule permission')
@@ -1165,6 +1172,39 @@ class CloudWatchEventSource:
             self.client.delete_rule(Name=func.name)
 
 
+class CloudWatchEventQueueSource(CloudWatchEventSource):
+    """Subscribe a lambda to cloud watch events delivered via an sqs queue.
+
+    The rule targets the queue, and the lambda consumes the queue in
+    batches of up to `size` events, waiting up to `window` seconds to
+    fill a batch. The queue's policy must allow events.amazonaws.com to
+    send messages.
+    """
+
+    def __init__(self, data, session_factory):
+        super(CloudWatchEventQueueSource, self).__init__(data, session_factory)
+        self.queue_arn = data['batch']['queue']
+        self.subscription = SQSSubscription(
+            session_factory, [self.queue_arn],
+            batch_size=data['batch'].get('size', 10),
+            batch_window=data['batch'].get('window', 0))
+
+    def add(self, func):
+        self.put_rule(func)
+        response = self.client.list_targets_by_rule(Rule=func.name)
+        if not [t for t in response['Targets'] if t['Arn'] == self.queue_arn]:
+            log.debug('Creating cwe rule target for %s on queue:%s' % (
+                self, self.queue_arn))
+            self.client.put_targets(
+                Rule=func.name, Targets=[{"Id": func.name, "Arn": self.queue_arn}])
+        self.subscription.add(func)
+        return True
+
+    def remove(self, func):
+        super(CloudWatchEventQueueSource, self).remove(func)
+        self.subscription.remove(func)
+
+
 class SecurityHubAction:
 
     def __init__(self, policy, session_factory):
@@ -1389,10 +1429,11 @@ class SQSSubscription:
     """ Subscribe a lambda to one or more SQS queues.
     """
 
-    def __init__(self, session_factory, queue_arns, batch_size=10):
+    def __init__(self, session_factory, queue_arns, batch_size=10, batch_window=0):
         self.queue_arns = queue_arns
         self.session_factory = session_factory
         self.batch_size = batch_size
+        self.batch_window = batch_window
 
     def add(self, func):
         client = local_session(self.session_factory).client('lambda')
@@ -1405,8 +1446,9 @@ class SQSSubscription:
             mapping = None
             if queue_arn in event_mappings:
                 mapping = event_mappings[queue_arn]
-                if (mapping['State'] == 'Enabled' or
-                        mapping['BatchSize'] != self.batch_size):
+                if (mapping['State'] == 'Enabled' and
+                        mapping['BatchSize'] == self.batch_size and
+                        mapping.get('MaximumBatchingWindowInSeconds', 0) == self.batch_window):
                     continue
                 modified = True
             else:
@@ -1421,13 +1463,15 @@ class SQSSubscription:
                 client.update_event_source_mapping(
                     UUID=mapping['UUID'],
                     Enabled=True,
-                    BatchSize=self.batch_size)
+                    BatchSize=self.batch_size,
+                    MaximumBatchingWindowInSeconds=self.batch_window)
             else:
                 log.info("Subscribing %s to %s", func.name, queue_arn)
                 client.create_event_source_mapping(
                     FunctionName=func.name,
                     EventSourceArn=queue_arn,
-                    BatchSize=self.batch_size)
+                    BatchSize=self.batch_size,
+                    MaximumBatchingWindowInSeconds=self.batch_window)
             return modified
 
     def remove(self, func):
@@ -25,11 +25,13 @@ import gzip
 import logging
 import os
 import shutil
+import threading
 import time
 import uuid
 
 
 from c7n.exceptions import InvalidOutputConfig
+from c7n.executor import execution_path, get_execution_path, get_execution_scope
 from c7n.registry import PluginRegistry
 from c7n.utils import parse_url_config
 
@@ -41,6 +43,9 @@ except ImportError:
 
 log = logging.getLogger('custodian.output')
 
+# per thread cpu time, where available (py3.7+)
+thread_time = getattr(time, 'thread_time', time.process_time)
+
 
 # TODO remove
 DEFAULT_NAMESPACE = "CloudMaid"
@@ -116,6 +121,205 @@ class NullTracer:
         """
 
 
+# api latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class LatencyHistogram:
+    """Count, total, max and a bucketed distribution of durations."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration, error=False):
+        idx = 0
+        while idx < len(self.buckets) and duration > self.buckets[idx]:
+            idx += 1
+        self.counts[idx] += 1
+        self.count += 1
+        self.errors += error and 1 or 0
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def merge(self, other):
+        for idx, count in enumerate(other.counts):
+            self.counts[idx] += count
+        self.count += other.count
+        self.errors += other.errors
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Estimate a percentile, interpolating within its bucket."""
+        if not self.count:
+            return 0
+        rank = q / 100.0 * self.count
+        cumulative = 0
+        lower = 0
+        for idx, count in enumerate(self.counts):
+            upper = idx < len(self.buckets) and min(self.buckets[idx], self.max) or self.max
+            if count and cumulative + count >= rank:
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = upper
+        return self.max
+
+    def get_summary(self):
+        histogram = {}
+        for bound, count in zip(self.buckets + ('inf',), self.counts):
+            if count:
+                histogram['le-%s' % bound] = count
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total': round(self.total, 6),
+            'mean': self.count and round(self.total / self.count, 6) or 0,
+            'max': round(self.max, 6),
+            'p50': round(self.percentile(50), 6),
+            'p90': round(self.percentile(90), 6),
+            'p99': round(self.percentile(99), 6),
+            'histogram': histogram}
+
+
+class ProfileFrame:
+
+    __slots__ = ('name', 'wall', 'cpu', 'child_wall', 'child_cpu')
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = time.time()
+        self.cpu = thread_time()
+        self.child_wall = self.child_cpu = 0.0
+
+
+@tracer_outputs.register('profile')
+class ProfileTracer(NullTracer):
+    """Profile a policy execution's filters, actions, augments and api calls.
+
+    Records wall and cpu time of each subsegment by stack, and a latency
+    histogram per api operation. On exit, writes to the policy output
+    directory a collapsed stack file (flamegraph.folded) of self wall
+    time in microseconds, suitable for flamegraph.pl or speedscope, and
+    a json summary (profile.json).
+
+    Subsegments and api calls on worker threads are recorded under the
+    frame which submitted their work, so stack totals are summed across
+    threads.
+    """
+
+    stack_file = 'flamegraph.folded'
+    summary_file = 'profile.json'
+
+    def __init__(self, ctx, config=None):
+        super(ProfileTracer, self).__init__(ctx, config)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self):
+        self.stacks = {}
+        self.api_calls = {}
+        self.local.frames = None
+        self.start = None
+
+    def get_frames(self):
+        # a thread's root frames are the path its work was submitted
+        # from, pool threads are rooted again for each submitted task.
+        root = get_execution_path() or (self.ctx.policy.name,)
+        frames = getattr(self.local, 'frames', None)
+        if frames is None or (
+                len(frames) == self.local.depth and
+                tuple(f.name for f in frames) != root):
+            frames = self.local.frames = [ProfileFrame(n) for n in root]
+            self.local.depth = len(root)
+        return frames
+
+    def record(self, path, wall, cpu, child_wall, child_cpu):
+        with self.lock:
+            stats = self.stacks.get(path)
+            if stats is None:
+                stats = self.stacks[path] = {
+                    'count': 0, 'wall': 0.0, 'cpu': 0.0, 'self-wall': 0.0, 'self-cpu': 0.0}
+            stats['count'] += 1
+            stats['wall'] += wall
+            stats['cpu'] += cpu
+            stats['self-wall'] += max(wall - child_wall, 0)
+            stats['self-cpu'] += max(cpu - child_cpu, 0)
+
+    def pop_frame(self, frames):
+        frame = frames.pop()
+        wall, cpu = time.time() - frame.wall, thread_time() - frame.cpu
+        path = tuple(f.name for f in frames) + (frame.name,)
+        self.record(path, wall, cpu, frame.child_wall, frame.child_cpu)
+        if frames:
+            frames[-1].child_wall += wall
+            frames[-1].child_cpu += cpu
+
+    @contextlib.contextmanager
+    def subsegment(self, name):
+        frames = self.get_frames()
+        frames.append(ProfileFrame(name))
+        try:
+            with execution_path(tuple(f.name for f in frames)):
+                yield self
+        finally:
+            self.pop_frame(frames)
+
+    def record_api_call(self, operation, duration, error=False):
+        """Record an api call made in the current subsegment."""
+        frames = self.get_frames()
+        name = 'api:%s' % operation
+        self.record(tuple(f.name for f in frames) + (name,), duration, 0.0, 0.0, 0.0)
+        frames[-1].child_wall += duration
+        with self.lock:
+            if operation not in self.api_calls:
+                self.api_calls[operation] = LatencyHistogram()
+            self.api_calls[operation].add(duration, error)
+
+    def __enter__(self):
+        self.reset()
+        self.start = time.time()
+        self.get_frames()
+
+    def get_summary(self):
+        segments = {}
+        for path, stats in sorted(self.stacks.items(), key=lambda i: -i[1]['wall']):
+            segments[';'.join(path)] = {
+                k: isinstance(v, float) and round(v, 6) or v for k, v in stats.items()}
+        return {
+            'policy': self.ctx.policy.name,
+            'resource': self.ctx.policy.resource_type,
+            'segments': segments,
+            'api-calls': {
+                k: v.get_summary() for k, v in sorted(self.api_calls.items())},
+            'filter-stats': list(getattr(self.ctx, 'filter_stats', None) or ())}
+
+    def get_stacks(self):
+        lines = []
+        for path, stats in sorted(self.stacks.items()):
+            value = int(stats['self-wall'] * 1e6)
+            if value:
+                lines.append('%s %d' % (';'.join(
+                    n.replace(';', ':').replace(' ', '_') for n in path), value))
+        return '\n'.join(lines) + '\n'
+
+    def write_output(self):
+        """Write the profile to the policy output, ahead of its upload."""
+        frames = self.get_frames()
+        while frames:
+            self.pop_frame(frames)
+        self.ctx.policy._write_file(self.stack_file, self.get_stacks())
+        self.ctx.policy._write_file(self.summary_file, json.dumps(self.get_summary(), indent=2))
+
+    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
+        self.reset()
+
+
 class DeltaStats:
     """Capture stats (dictionary of string->integer) as a stack.
 
@@ -175,6 +379,11 @@ class NullStats:
         """
         return {}
 
+    def get_operation_stats(self):
+        """Return per api operation latency, retry, throttle and payload stats.
+        """
+        return {}
+
     def __enter__(self):
         """Push a snapshot
         """
@@ -321,6 +530,21 @@ class LogMetrics(Metrics):
         return res
 
 
+class ExecutionScopeFilter(logging.Filter):
+    """Only pass records emitted within the given execution scope.
+
+    Used to keep policy log outputs isolated when policies are
+    executed concurrently.
+    """
+
+    def __init__(self, scope):
+        super(ExecutionScopeFilter, self).__init__()
+        self.scope = scope
+
+    def filter(self, record):
+        return get_execution_scope() is self.scope
+
+
 class LogOutput:
 
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -349,6 +573,9 @@ class LogOutput:
             return
         self.handler.setLevel(logging.DEBUG)
         self.handler.setFormatter(logging.Formatter(self.log_format))
+        scope = get_execution_scope()
+        if scope is not None:
+            self.handler.addFilter(ExecutionScopeFilter(scope))
         mlog = logging.getLogger('custodian')
         mlog.addHandler(self.handler)
 
@@ -361,6 +588,20 @@ class LogOutput:
         self.handler.close()
 
 
+class GzipFileHandler(logging.FileHandler):
+    """Log file handler compressing records as they're written.
+
+    The compressed stream is only flushed on close, as flushing per
+    record would defeat the compression.
+    """
+
+    def _open(self):
+        return gzip.open(self.baseFilename, self.mode + 't', encoding=self.encoding)
+
+    def flush(self):
+        return
+
+
 @log_outputs.register('default')
 class LogFile(LogOutput):
 
@@ -373,6 +614,8 @@ class LogFile(LogOutput):
             self.ctx.log_dir, 'custodian-run.log')
 
     def get_handler(self):
+        if getattr(getattr(self.ctx, 'output', None), 'compress_stream', False):
+            return GzipFileHandler(self.log_path + '.gz')
         return logging.FileHandler(self.log_path)
 
 
@@ -415,6 +658,8 @@ class NullBlobOutput:
 class DirectoryOutput:
 
     permissions = ()
+    # whether files are compressed as they're written
+    compress_stream = False
 
     def __init__(self, ctx, config):
         self.ctx = ctx
@@ -437,11 +682,20 @@ class DirectoryOutput:
     def __repr__(self):
         return "<%s to dir:%s>" % (self.__class__.__name__, self.root_dir)
 
+    def write_file(self, rel_path, value):
+        with open(os.path.join(self.root_dir, rel_path), 'w') as fh:
+            fh.write(value)
+
     def compress(self):
         # Compress files individually so thats easy to walk them, without
         # downloading tar and extracting.
         for root, dirs, files in os.walk(self.root_dir):
             for f in files:
+                if self.compress_stream and f.endswith('.gz'):
+                    continue
+                # columnar snapshots are already compressed
+                if f.endswith('.parquet'):
+                    continue
                 fp = os.path.join(root, f)
                 with gzip.open(fp + ".gz", "wb", compresslevel=7) as zfh:
                     with open(fp, "rb") as sfh:
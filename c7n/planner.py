@@ -0,0 +1,239 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Resource fetch planning across a policy collection.
+
+Large policy collections frequently contain many policies targeting
+the same resource type in the same account and region. Rather than
+have each policy enumerate and augment the resource population, the
+planner groups policies by their resource query and shares a single
+fetched snapshot across the group. Each policy gets a private copy of
+the snapshot, so annotations added by filters and actions don't leak
+across policies.
+"""
+import contextlib
+import logging
+import pickle
+import threading
+
+from c7n.utils import dumps
+
+log = logging.getLogger('custodian.planner')
+
+
+class ResourceSnapshot:
+    """A shared resource population for a group of policies."""
+
+    def __init__(self, key):
+        self.key = key
+        self.policies = []
+        self.consumed = set()
+        self.lock = threading.Lock()
+        self.cache_key = None
+        self.data = None
+
+    def get(self, cache_key):
+        if self.data is None or self.cache_key != cache_key:
+            return None
+        return pickle.loads(self.data)
+
+    def save(self, cache_key, resources):
+        if self.data is not None or len(self.consumed) + 1 >= len(self.policies):
+            return
+        self.cache_key = cache_key
+        self.data = pickle.dumps(resources, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def release(self, policy):
+        self.consumed.add(id(policy))
+        if len(self.consumed) >= len(self.policies):
+            self.data = None
+
+
+class NullSnapshot:
+
+    def get(self, cache_key):
+        return None
+
+    def save(self, cache_key, resources):
+        pass
+
+
+class RelatedResources:
+    """Resources of one type, account and region, indexed by id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.resources = {}
+        self.absent = set()
+        self.complete = False
+
+    def add(self, id_key, resources, ids=()):
+        for r in resources:
+            self.resources[r[id_key]] = r
+        self.absent.update(set(ids).difference(self.resources))
+
+
+class RelatedResourceIndex:
+    """Run scoped index of related resources, shared across policies.
+
+    Related resource filters (security groups, subnets, kms keys, etc)
+    resolve ids through the index, so a population is fetched once per
+    run rather than once per policy. The index is keyed by account,
+    region, resource type and source, and entries for a resource type
+    are invalidated when a policy in the run executes actions on it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    @staticmethod
+    def get_key(manager):
+        return (
+            manager.config.account_id,
+            manager.config.region,
+            manager.type,
+            getattr(manager, 'source_type', None))
+
+    def get_resources(self, manager, ids, fetch_threshold=10):
+        """Return a map of id to resource for the given related ids.
+
+        Ids not yet indexed are fetched individually, or if there are
+        at least `fetch_threshold` of them, the whole population of the
+        resource type is fetched and indexed.
+        """
+        with self.lock:
+            entry = self.entries.setdefault(
+                self.get_key(manager), RelatedResources())
+        id_key = manager.get_model().id
+        with entry.lock:
+            if not entry.complete:
+                missing = [i for i in ids if i not in entry.resources and
+                           i not in entry.absent]
+                if len(missing) >= fetch_threshold:
+                    entry.add(id_key, manager.resources())
+                    entry.complete = True
+                elif missing:
+                    entry.add(id_key, manager.get_resources(missing), missing)
+            return {i: entry.resources[i] for i in ids if i in entry.resources}
+
+    def invalidate(self, account_id, region, resource_type):
+        with self.lock:
+            for k in list(self.entries):
+                if k[:3] == (account_id, region, resource_type):
+                    self.entries.pop(k)
+
+
+def get_run_index(manager, name, factory, shared=False):
+    """Return a run scoped index for a policy's resource manager.
+
+    With a resource planner the index is shared by the policies of the
+    run, else a new index is returned, or with `shared` None.
+    """
+    planner = getattr(getattr(manager, 'ctx', None), 'planner', None)
+    if planner is None:
+        return not shared and factory() or None
+    return planner.get_index(name, manager, factory)
+
+
+class ResourcePlanner:
+    """Plan resource fetches for a collection of policies.
+
+    Policies are grouped by provider, account, region, resource type,
+    source and query. The first policy of a group to execute fetches
+    and augments the resources, and the other policies in the group
+    are served from that snapshot. The snapshot is released once every
+    policy of the group has consumed it.
+    """
+
+    def __init__(self, policies):
+        self.groups = {}
+        self.policy_groups = {}
+        self.related = RelatedResourceIndex()
+        self.lock = threading.Lock()
+        self.indexes = {}
+        for p in policies:
+            self.add(p)
+
+    @staticmethod
+    def get_group_key(policy):
+        m = policy.resource_manager
+        if getattr(m, 'source_type', None) is None or not hasattr(m, 'get_cache_key'):
+            return None
+        if policy.execution_mode != 'pull' and not policy.options.dryrun:
+            return None
+        return (
+            policy.provider_name,
+            policy.options.account_id,
+            policy.options.region,
+            policy.resource_type,
+            m.source_type,
+            dumps(policy.data.get('query')))
+
+    def add(self, policy):
+        policy.ctx.planner = self
+        key = self.get_group_key(policy)
+        if key is None:
+            return
+        group = self.groups.setdefault(key, ResourceSnapshot(key))
+        group.policies.append(policy)
+        self.policy_groups[id(policy)] = group
+
+    def invalidate(self, policy):
+        """Drop related resources of a type that policy actions modified."""
+        m = policy.resource_manager
+        self.related.invalidate(m.config.account_id, m.config.region, m.type)
+        with self.lock:
+            indexes = [index for k, index in self.indexes.items()
+                       if k[1:] == (m.config.account_id, m.config.region)]
+        for index in indexes:
+            index.invalidate(m.type, [a.type for a in m.actions])
+
+    def get_index(self, name, manager, factory):
+        """Return a run scoped index shared across policies.
+
+        Indexes are keyed by name, account and region, created on
+        first use, and told of resource types modified by policy
+        actions (and the types of those actions) via their invalidate
+        method.
+        """
+        key = (name, manager.config.account_id, manager.config.region)
+        with self.lock:
+            if key not in self.indexes:
+                self.indexes[key] = factory()
+            return self.indexes[key]
+
+    def get_stats(self):
+        shared = [g for g in self.groups.values() if len(g.policies) > 1]
+        return {
+            'groups': len(self.groups),
+            'shared-groups': len(shared),
+            'shared-policies': sum([len(g.policies) for g in shared])}
+
+    @contextlib.contextmanager
+    def snapshot(self, policy):
+        """Serialize fetches within a group and yield its snapshot.
+
+        Other policies of the same group wait on the first fetch, and
+        then receive their own copy of the resources.
+        """
+        group = self.policy_groups.get(id(policy))
+        if group is None or len(group.policies) < 2:
+            yield NullSnapshot()
+            return
+        with group.lock:
+            try:
+                yield group
+            finally:
+                group.release(policy)
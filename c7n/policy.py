@@ -308,6 +308,7 @@ class PullMode(PolicyExecutionMode):
                 "ResourceTime", rt, "Seconds", Scope="Policy")
             self.policy._write_file(
                 'resources.json', utils.dumps(resources, indent=2))
+            self.policy._write_snapshot(resources)
 
             if not resources:
                 return []
@@ -332,6 +333,8 @@ class PullMode(PolicyExecutionMode):
                         "action-%s" % a.name, utils.dumps(results))
             self.policy.ctx.metrics.put_metric(
                 "ActionTime", time.time() - at, "Seconds", Scope="Policy")
+            if self.policy.ctx.planner and self.policy.resource_manager.actions:
+                self.policy.ctx.planner.invalidate(self.policy)
             return resources
 
 
@@ -599,8 +602,20 @@ class CloudTrailMode(LambdaMode):
                      'ids': {'type': 'string'},
                      'event': {'type': 'string'}}}]
         }},
+        # deliver events through an sqs queue, to process them in batches
+        batch={
+            'type': 'object',
+            'additionalProperties': False,
+            'required': ['queue'],
+            'properties': {
+                'queue': {'type': 'string'},
+                'size': {'type': 'integer', 'minimum': 1, 'maximum': 10000},
+                'window': {'type': 'integer', 'minimum': 0, 'maximum': 300}}},
         rinherit=LambdaMode.schema)
 
+    # max resource ids looked up at once for a batch of events
+    batch_lookup_size = 20
+
     def validate(self):
         super(CloudTrailMode, self).validate()
         from c7n import query
@@ -611,6 +626,13 @@ class CloudTrailMode(LambdaMode):
                 assert e in CloudWatchEvents.trail_events, "event shortcut not defined: %s" % e
             if isinstance(e, dict):
                 jmespath.compile(e['ids'])
+        batch = self.policy.data['mode'].get('batch', {})
+        # sqs event sources only accept batches of more than 10 messages
+        # with a batching window.
+        if batch.get('size', 10) > 10 and batch.get('window', 0) < 1:
+            raise PolicyValidationError(
+                "policy:%s cloudtrail mode batch size above 10 requires a window" % (
+                    self.policy.name))
         if isinstance(self.policy.resource_manager, query.ChildResourceManager):
             if not getattr(self.policy.resource_manager.resource_type,
                            'supports_trailevents', False):
@@ -618,6 +640,147 @@ class CloudTrailMode(LambdaMode):
                     "resource:%s does not support cloudtrail mode policies" % (
                         self.policy.resource_type))
 
+    def run(self, event, lambda_context):
+        events = self.get_batch_events(event)
+        if events is None:
+            return super(CloudTrailMode, self).run(event, lambda_context)
+        return self.run_batch(event, events)
+
+    def get_batch_events(self, event):
+        """Unpack the cloudwatch events of an sqs batch invocation."""
+        if 'Records' not in event:
+            return None
+        return [json.loads(r['body']) for r in event['Records']
+                if r.get('eventSource') == 'aws:sqs']
+
+    def resolve_batch_resources(self, events):
+        """Resolve the resources of a batch of events with a single lookup.
+
+        Returns the resources, and a mapping of resource id to the events
+        which referenced it.
+        """
+        mode = self.policy.data['mode']
+        id_events = {}
+        for e in events:
+            resource_ids = CloudWatchEvents.get_ids(e, mode) or []
+            for rid in self.policy.resource_manager.match_ids(resource_ids):
+                id_events.setdefault(rid, []).append(e)
+        if not id_events:
+            self.policy.log.warning("Could not find resource ids")
+            return [], id_events
+        self.policy.log.info(
+            'Found %d resource ids in %d events', len(id_events), len(events))
+        resources = []
+        for id_set in utils.chunks(list(id_events), self.batch_lookup_size):
+            resources.extend(self.policy.resource_manager.get_resources(id_set))
+        return resources, id_events
+
+    def get_resource_events(self, resources, events, id_events):
+        """Attribute each resource to the events which referenced it."""
+        m = self.policy.resource_manager.get_model()
+        resource_events = []
+        for r in resources:
+            # resources we can't correlate by id (ie. events referencing
+            # arns) are attributed to the whole batch.
+            revents = id_events.get(r.get(m.id), events)
+            r['c7n:Events'] = [e.get('id') for e in revents]
+            resource_events.append((r, revents))
+        return resource_events
+
+    def filter_batch(self, batch_event, resource_events):
+        manager = self.policy.resource_manager
+        if not any(f.type == 'event' for f in manager.iter_filters() if f):
+            return manager.filter_resources(
+                [r for r, revents in resource_events], batch_event)
+        # event filters need evaluating against each event's resources
+        matched = {}
+        for e, resources in self.group_by_event(resource_events):
+            if e.get('debug') is None and 'debug' in batch_event:
+                e['debug'] = True
+            for r in manager.filter_resources(resources, e):
+                matched[id(r)] = r
+        return [r for r, revents in resource_events if id(r) in matched]
+
+    @staticmethod
+    def group_by_event(resource_events):
+        groups = {}
+        for r, revents in resource_events:
+            for e in revents:
+                groups.setdefault(id(e), (e, []))[1].append(r)
+        return list(groups.values())
+
+    def run_batch(self, batch_event, events):
+        """Run policy against a batch of events delivered via sqs.
+
+        Resource ids across the batch are resolved with a single lookup,
+        and filters and actions run once over the combined set. Event
+        actions (ie. auto-tag-user) are invoked per event with the
+        resources it referenced.
+        """
+        self.setup_exec_environment(batch_event)
+        events = [e for e in events if self.policy.is_runnable(e)]
+        groups = {}
+        for e in events:
+            key = None
+            if self.policy.data['mode'].get('member-role'):
+                key = (self.get_member_account_id(e), self.get_member_region(e))
+            groups.setdefault(key, []).append(e)
+
+        results = []
+        for group in groups.values():
+            self.assume_member(group[0])
+            resources, id_events = self.resolve_batch_resources(group)
+            if not resources:
+                continue
+            resource_events = self.get_resource_events(resources, group, id_events)
+            resources = self.filter_batch(batch_event, resource_events)
+            self.policy.log.info(
+                "Filtered resources %d of %d from %d events",
+                len(resources), len(resource_events), len(group))
+            if not resources:
+                continue
+            matched = {id(r) for r in resources}
+            results.extend(self.run_batch_resource_set(
+                batch_event, group,
+                [(r, revents) for r, revents in resource_events if id(r) in matched]))
+        if not results:
+            self.policy.log.info(
+                "policy:%s resources:%s no resources matched" % (
+                    self.policy.name, self.policy.resource_type))
+            return
+        return results
+
+    def run_batch_resource_set(self, batch_event, events, resource_events):
+        from c7n.actions import EventAction
+        resources = [r for r, revents in resource_events]
+        with self.policy.ctx:
+            self.policy.ctx.metrics.put_metric(
+                'ResourceCount', len(resources), 'Count', Scope="Policy",
+                buffer=False)
+            self.policy._write_file(
+                'resources.json', utils.dumps(resources, indent=2))
+            self.policy._write_file('events.json', utils.dumps([{
+                'id': e.get('id'),
+                'time': e.get('time'),
+                'account': e.get('account'),
+                'region': e.get('region'),
+                'eventName': e.get('detail', {}).get('eventName')} for e in events],
+                indent=2))
+
+            for action in self.policy.resource_manager.actions:
+                self.policy.log.info(
+                    "policy:%s invoking action:%s resources:%d",
+                    self.policy.name, action.name, len(resources))
+                if isinstance(action, EventAction):
+                    results = [
+                        action.process(eresources, e) for e, eresources
+                        in self.group_by_event(resource_events)]
+                else:
+                    results = action.process(resources)
+                self.policy._write_file(
+                    "action-%s" % action.name, utils.dumps(results))
+        return resources
+
 
 @execution.register('ec2-instance-state')
 class EC2InstanceState(LambdaMode):
@@ -1044,9 +1207,20 @@ class Policy:
     def _write_file(self, rel_path, value):
         if isinstance(self.ctx.output, NullBlobOutput):
             return
+        write_file = getattr(self.ctx.output, 'write_file', None)
+        if write_file is not None:
+            return write_file(rel_path, value)
         with open(os.path.join(self.ctx.log_dir, rel_path), 'w') as fh:
             fh.write(value)
 
+    def _write_snapshot(self, resources):
+        if not self.options.get('columnar_snapshot') or isinstance(self.ctx.output, NullBlobOutput):
+            return
+        from c7n.reports.columnar import SNAPSHOT_FILE, write_snapshot
+        write_snapshot(
+            os.path.join(self.ctx.log_dir, SNAPSHOT_FILE),
+            self.resource_manager.resource_type, resources)
+
     def load_resource_manager(self):
         factory = get_resource_class(self.data.get('resource'))
         return factory(self.ctx, self.data)
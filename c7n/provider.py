@@ -42,6 +42,10 @@ class Provider:
     def resource_map(self):
         """resource qualified name to python dotted path mapping."""
 
+    # optional mapping of resource qualified name to service, filter
+    # and action names, allows lookups without importing resources.
+    resource_index = None
+
     @abc.abstractmethod
     def initialize(self, options):
         """Perform any provider specific initialization
@@ -27,11 +27,14 @@ import os
 from c7n.actions import ActionRegistry
 from c7n.exceptions import ClientError, ResourceLimitExceeded, PolicyExecutionError
 from c7n.filters import FilterRegistry, MetricsFilter
+from c7n.filters.core import is_resource_set_filter
 from c7n.manager import ResourceManager
+from c7n.planner import NullSnapshot
 from c7n.registry import PluginRegistry
 from c7n.tags import register_ec2_tags, register_universal_tags
 from c7n.utils import (
-    local_session, generate_arn, get_retry, chunks, camelResource)
+    local_session, generate_arn, get_retry, chunks, camelResource,
+    AdaptiveConcurrency, THROTTLE_CODES)
 
 
 try:
@@ -58,16 +61,21 @@ class ResourceQuery:
             m = resource_type
         return m
 
+    def _paginate_client_enum(self, client, enum_op, params, retry=None):
+        """Return a page iterator for enum_op, or None if it doesn't paginate."""
+        if not client.can_paginate(enum_op):
+            return None
+        p = client.get_paginator(enum_op)
+        if retry:
+            p.PAGE_ITERATOR_CLS = RetryPageIterator
+        return p.paginate(**params)
+
     def _invoke_client_enum(self, client, enum_op, params, path, retry=None):
-        if client.can_paginate(enum_op):
-            p = client.get_paginator(enum_op)
-            if retry:
-                p.PAGE_ITERATOR_CLS = RetryPageIterator
-            results = p.paginate(**params)
-            data = results.build_full_result()
+        pages = self._paginate_client_enum(client, enum_op, params, retry)
+        if pages is not None:
+            data = pages.build_full_result()
         else:
-            op = getattr(client, enum_op)
-            data = op(**params)
+            data = getattr(client, enum_op)(**params)
 
         if path:
             path = jmespath.compile(path)
@@ -75,6 +83,18 @@ class ResourceQuery:
 
         return data
 
+    def _iter_client_enum(self, client, enum_op, params, path, retry=None):
+        pages = self._paginate_client_enum(client, enum_op, params, retry)
+        if pages is None:
+            pages = [getattr(client, enum_op)(**params)]
+
+        if path:
+            path = jmespath.compile(path)
+        for page in pages:
+            if path:
+                page = path.search(page)
+            yield page or []
+
     def filter(self, resource_manager, **params):
         """Query a set of resources."""
         m = self.resolve(resource_manager.resource_type)
@@ -87,31 +107,53 @@ class ResourceQuery:
             client, enum_op, params, path,
             getattr(resource_manager, 'retry', None)) or []
 
+    def filter_pages(self, resource_manager, **params):
+        """Query a set of resources, yielding a page of resources at a time."""
+        if type(self).filter is not ResourceQuery.filter:
+            yield self.filter(resource_manager, **params)
+            return
+        m = self.resolve(resource_manager.resource_type)
+        client = local_session(self.session_factory).client(
+            m.service, resource_manager.config.region)
+        enum_op, path, extra_args = m.enum_spec
+        if extra_args:
+            params.update(extra_args)
+        for page in self._iter_client_enum(
+                client, enum_op, params, path,
+                getattr(resource_manager, 'retry', None)):
+            yield page
+
     def get(self, resource_manager, identities):
         """Get resources by identities
         """
         m = self.resolve(resource_manager.resource_type)
-        params = {}
-        client_filter = False
-
-        # Try to formulate server side query
-        if m.filter_name:
-            if m.filter_type == 'list':
-                params[m.filter_name] = identities
-            elif m.filter_type == 'scalar':
-                assert len(identities) == 1, "Scalar server side filter"
-                params[m.filter_name] = identities[0]
+
+        # Try to formulate server side query, batched for larger id sets
+        # where the api caps them.
+        if m.filter_name and m.filter_type == 'list':
+            if not m.filter_batch_size:
+                return self.filter(resource_manager, **{m.filter_name: identities})
+            resources = []
+            for id_set in chunks(identities, m.filter_batch_size):
+                resources.extend(
+                    self.filter(resource_manager, **{m.filter_name: id_set}))
+            return resources
+        elif m.filter_name and m.filter_type == 'scalar':
+            resources = []
+            for i in identities:
+                resources.extend(self.filter(resource_manager, **{m.filter_name: i}))
+            return resources
+        elif m.filter_name:
+            return self.filter(resource_manager)
+
+        resources = self.filter(resource_manager)
+        identities = set(identities)
+        # This logic was added to prevent the issue from:
+        # https://github.com/cloud-custodian/cloud-custodian/issues/1398
+        if all(map(lambda r: isinstance(r, six.string_types), resources)):
+            resources = [r for r in resources if r in identities]
         else:
-            client_filter = True
-
-        resources = self.filter(resource_manager, **params)
-        if client_filter:
-            # This logic was added to prevent the issue from:
-            # https://github.com/cloud-custodian/cloud-custodian/issues/1398
-            if all(map(lambda r: isinstance(r, six.string_types), resources)):
-                resources = [r for r in resources if r in identities]
-            else:
-                resources = [r for r in resources if r[m.id] in identities]
+            resources = [r for r in resources if r[m.id] in identities]
 
         return resources
 
@@ -227,6 +269,13 @@ class DescribeSource:
     def resources(self, query):
         return self.query.filter(self.manager, **query)
 
+    def resource_pages(self, query):
+        if type(self).resources is not DescribeSource.resources:
+            yield self.resources(query)
+            return
+        for page in self.query.filter_pages(self.manager, **query):
+            yield page
+
     def get_query(self):
         return self.resource_query_factory(self.manager.session_factory)
 
@@ -259,13 +308,27 @@ class DescribeSource:
             _augment = _batch_augment
         else:
             return resources
+        controller = AdaptiveConcurrency(
+            self.manager.max_workers, maximum=self.manager.max_augment_workers)
         _augment = functools.partial(
-            _augment, self.manager, model, detail_spec)
+            _augment, self.manager, model, detail_spec, controller=controller)
+
+        def augment_set(resource_set):
+            with controller:
+                return _augment(resource_set)
+
         with self.manager.executor_factory(
-                max_workers=self.manager.max_workers) as w:
+                max_workers=controller.maximum) as w:
             results = list(w.map(
-                _augment, chunks(resources, self.manager.chunk_size)))
-            return list(itertools.chain(*results))
+                augment_set, chunks(resources, self.manager.chunk_size)))
+
+        self.manager.ctx.metrics.put_metric(
+            'AugmentConcurrency', controller.peak, 'Count', Scope='Policy')
+        self.manager.ctx.metrics.put_metric(
+            'AugmentThrottles', controller.throttles, 'Count', Scope='Policy')
+        self.manager.ctx.metrics.put_metric(
+            'AugmentBackoffs', controller.decreases, 'Count', Scope='Policy')
+        return list(itertools.chain(*results))
 
 
 @sources.register('describe-child')
@@ -349,7 +412,7 @@ class ConfigSource:
             item_config = item['configuration']
         return camelResource(item_config)
 
-    def resources(self, query=None):
+    def resource_pages(self, query=None):
         client = local_session(self.manager.session_factory).client('config')
         query = self.get_query_params(query)
         pager = Paginator(
@@ -359,11 +422,11 @@ class ConfigSource:
             client.meta.service_model.operation_model('SelectResourceConfig'))
         pager.PAGE_ITERATOR_CLS = RetryPageIterator
 
-        results = []
         for page in pager.paginate(Expression=query['expr']):
-            results.extend([
-                self.load_resource(json.loads(r)) for r in page['Results']])
-        return results
+            yield [self.load_resource(json.loads(r)) for r in page['Results']]
+
+    def resources(self, query=None):
+        return list(itertools.chain(*self.resource_pages(query)))
 
     def augment(self, resources):
         return resources
@@ -377,18 +440,15 @@ class QueryResourceManager(ResourceManager):
     # TODO Check if we can move to describe source
     max_workers = 3
     chunk_size = 20
+    # Augment concurrency starts at max_workers, and adapts up to this
+    # limit while detail calls aren't throttled.
+    max_augment_workers = 16
 
     permissions = ()
 
     _generate_arn = None
 
-    retry = staticmethod(
-        get_retry((
-            'ThrottlingException',
-            'RequestLimitExceeded',
-            'Throttled',
-            'Throttling',
-            'Client.RequestLimitExceeded')))
+    retry = staticmethod(get_retry(THROTTLE_CODES))
 
     def __init__(self, data, options):
         super(QueryResourceManager, self).__init__(data, options)
@@ -441,24 +501,36 @@ class QueryResourceManager(ResourceManager):
     def resources(self, query=None):
         query = self.source.get_query_params(query)
         cache_key = self.get_cache_key(query)
-        resources = None
 
-        if self._cache.load():
-            resources = self._cache.get(cache_key)
+        with self.get_resource_snapshot() as snapshot:
+            resources = snapshot.get(cache_key)
             if resources is not None:
-                self.log.debug("Using cached %s: %d" % (
+                self.log.debug("Using planned snapshot %s: %d" % (
                     "%s.%s" % (self.__class__.__module__,
                                self.__class__.__name__),
                     len(resources)))
 
-        if resources is None:
-            if query is None:
-                query = {}
-            with self.ctx.tracer.subsegment('resource-fetch'):
-                resources = self.source.resources(query)
-            with self.ctx.tracer.subsegment('resource-augment'):
-                resources = self.augment(resources)
-            self._cache.save(cache_key, resources)
+            if resources is None and self._cache.load():
+                resources = self._cache.get(cache_key)
+                if resources is not None:
+                    self.log.debug("Using cached %s: %d" % (
+                        "%s.%s" % (self.__class__.__module__,
+                                   self.__class__.__name__),
+                        len(resources)))
+                    snapshot.save(cache_key, resources)
+
+            if resources is None and self.is_streaming(snapshot):
+                return self.stream_resources(query or {})
+
+            if resources is None:
+                if query is None:
+                    query = {}
+                with self.ctx.tracer.subsegment('resource-fetch'):
+                    resources = self.source.resources(query)
+                with self.ctx.tracer.subsegment('resource-augment'):
+                    resources = self.augment(resources)
+                self._cache.save(cache_key, resources)
+                snapshot.save(cache_key, resources)
 
         resource_count = len(resources)
         with self.ctx.tracer.subsegment('filter'):
@@ -469,6 +541,53 @@ class QueryResourceManager(ResourceManager):
             self.check_resource_limit(len(resources), resource_count)
         return resources
 
+    def is_streaming(self, snapshot):
+        """Whether resources should be fetched, augmented and filtered per page.
+
+        Streaming is opt-in, and only applies to a policy's own resources
+        when they aren't shared with other policies.
+        """
+        return bool(
+            self.ctx.options.get('stream_resources') and
+            self.data == self.ctx.policy.data and
+            isinstance(snapshot, NullSnapshot) and
+            hasattr(self.source, 'resource_pages'))
+
+    def stream_resources(self, query):
+        """Fetch, augment and filter resources a page at a time.
+
+        Per resource filters are applied to each page as it's fetched, so
+        only matched resources are retained. Filters operating on the
+        whole resource set (resource counts) and any filters after them
+        are applied once all pages have been processed. Streamed resources
+        are not saved to the cache.
+        """
+        filters = list(self.filters)
+        set_filters = []
+        for idx, f in enumerate(filters):
+            if is_resource_set_filter(f):
+                filters, set_filters = filters[:idx], filters[idx:]
+                break
+
+        resource_count = 0
+        resources = []
+        with self.ctx.tracer.subsegment('resource-stream'):
+            for page in self.source.resource_pages(query):
+                if not page:
+                    continue
+                resource_count += len(page)
+                page = self.augment(page)
+                resources.extend(self.filter_resources(page, filters=filters))
+
+        self.log.debug("Streamed %d of %d %s" % (
+            len(resources), resource_count, self.__class__.__name__.lower()))
+        if set_filters:
+            with self.ctx.tracer.subsegment('filter'):
+                resources = self.filter_resources(resources, filters=set_filters)
+
+        self.check_resource_limit(len(resources), resource_count)
+        return resources
+
     def check_resource_limit(self, selection_count, population_count):
         """Check if policy's execution affects more resources then its limit.
 
@@ -634,11 +753,31 @@ class ChildResourceManager(QueryResourceManager):
         return self.get_resource_manager(self.resource_type.parent_spec[0])
 
 
-def _batch_augment(manager, model, detail_spec, resource_set):
+def _observe_throttles(op, controller, codes):
+    """Report the outcome of api calls to an adaptive concurrency controller."""
+    if controller is None:
+        return op
+
+    @functools.wraps(op)
+    def observed_op(*args, **kw):
+        try:
+            result = op(*args, **kw)
+        except ClientError as e:
+            if e.response['Error']['Code'] in codes:
+                controller.throttled()
+            raise
+        controller.success()
+        return result
+    return observed_op
+
+
+def _batch_augment(manager, model, detail_spec, resource_set, controller=None):
     detail_op, param_name, param_key, detail_path, detail_args = detail_spec
     client = local_session(manager.session_factory).client(
         model.service, region_name=manager.config.region)
-    op = getattr(client, detail_op)
+    op = _observe_throttles(
+        getattr(client, detail_op), controller,
+        getattr(manager.retry, 'codes', THROTTLE_CODES))
     if manager.retry:
         args = (op,)
         op = manager.retry
@@ -651,11 +790,13 @@ def _batch_augment(manager, model, detail_spec, resource_set):
     return response[detail_path]
 
 
-def _scalar_augment(manager, model, detail_spec, resource_set):
+def _scalar_augment(manager, model, detail_spec, resource_set, controller=None):
     detail_op, param_name, param_key, detail_path = detail_spec
     client = local_session(manager.session_factory).client(
         model.service, region_name=manager.config.region)
-    op = getattr(client, detail_op)
+    op = _observe_throttles(
+        getattr(client, detail_op), controller,
+        getattr(manager.retry, 'codes', THROTTLE_CODES))
     if manager.retry:
         args = (op,)
         op = manager.retry
@@ -762,6 +903,10 @@ class TypeInfo:
     # filter_type, scalar or list
     filter_type = None
 
+    # max ids per list filter query where the api caps them, larger id
+    # sets are fetched in batches
+    filter_batch_size = None
+
     # used to enrich the resource descriptions returned by enum_spec
     detail_spec = None
 
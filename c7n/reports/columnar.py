@@ -0,0 +1,137 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Columnar resource snapshots
+---------------------------
+
+Optionally alongside resources.json, a policy run can write its
+resources as a parquet file (``resources.parquet``), enabled with
+``custodian run --columnar-snapshot``.
+
+The resource type's id, name, date and default report fields are
+flattened into typed columns, tags into a map column, and the raw
+resource document is kept as a compressed json blob column. Reports
+read the snapshot a row group at a time.
+
+Requires pyarrow.
+"""
+import json
+import zlib
+
+import jmespath
+
+from c7n.utils import dumps
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+
+SNAPSHOT_FILE = 'resources.parquet'
+RAW_COLUMN = 'c7n:raw'
+TAGS_COLUMN = 'c7n:tags'
+ROW_GROUP_SIZE = 10000
+
+
+class SnapshotSchema:
+    """Column layout of a resource type's snapshot."""
+
+    def __init__(self, resource_type):
+        fields = [resource_type.id]
+        for f in (getattr(resource_type, 'name', None),
+                  getattr(resource_type, 'date', None)):
+            if f:
+                fields.append(f)
+        fields.extend(getattr(resource_type, 'default_report_fields', ()) or ())
+        self.fields = []
+        for f in fields:
+            if f not in self.fields and not f.startswith('tag:'):
+                self.fields.append(f)
+        self.expressions = [jmespath.compile(f) for f in self.fields]
+
+    def flatten(self, resources):
+        """Return a mapping of column name to column values."""
+        columns = {f: [] for f in self.fields}
+        columns[TAGS_COLUMN] = []
+        columns[RAW_COLUMN] = []
+        for r in resources:
+            for f, expr in zip(self.fields, self.expressions):
+                columns[f].append(expr.search(r))
+            columns[TAGS_COLUMN].append(
+                [(t['Key'], t['Value']) for t in r.get('Tags', ()) or ()])
+            columns[RAW_COLUMN].append(zlib.compress(dumps(r).encode('utf8')))
+        return columns
+
+
+def get_column_array(values, type=None):
+    try:
+        return pyarrow.array(values, type=type)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        # mixed types, fall back to their json/string representation
+        return pyarrow.array([
+            v if v is None or isinstance(v, str) else dumps(v) for v in values],
+            type=pyarrow.string())
+
+
+def get_arrow_schema(schema, resources):
+    fields = []
+    for f, expr in zip(schema.fields, schema.expressions):
+        ftype = get_column_array([expr.search(r) for r in resources]).type
+        if ftype == pyarrow.null():
+            ftype = pyarrow.string()
+        fields.append((f, ftype))
+    fields.append((TAGS_COLUMN, pyarrow.map_(pyarrow.string(), pyarrow.string())))
+    fields.append((RAW_COLUMN, pyarrow.binary()))
+    return pyarrow.schema(fields)
+
+
+def write_snapshot(path, resource_type, resources, row_group_size=ROW_GROUP_SIZE):
+    if not HAVE_PYARROW:
+        raise RuntimeError("columnar snapshots require pyarrow")
+    schema = SnapshotSchema(resource_type)
+    # column types are inferred over all resources, so they're consistent
+    # across row groups.
+    arrow_schema = get_arrow_schema(schema, resources)
+    with parquet.ParquetWriter(path, arrow_schema, compression='zstd') as writer:
+        for idx in range(0, len(resources), row_group_size):
+            columns = schema.flatten(resources[idx:idx + row_group_size])
+            arrays = []
+            for field in arrow_schema:
+                array = get_column_array(columns[field.name], field.type)
+                if array.type != field.type:
+                    array = array.cast(field.type)
+                arrays.append(array)
+            writer.write_table(
+                pyarrow.Table.from_arrays(arrays, schema=arrow_schema),
+                row_group_size=row_group_size)
+
+
+def iter_snapshot(source, columns=None):
+    """Iterate over the resources in a snapshot a row group at a time.
+
+    With columns, yields mappings of just those columns without decoding
+    the raw resource documents, else yields the resources.
+    """
+    if not HAVE_PYARROW:
+        raise RuntimeError("columnar snapshots require pyarrow")
+    snapshot = parquet.ParquetFile(source)
+    for idx in range(snapshot.num_row_groups):
+        if columns:
+            yield from snapshot.read_row_group(idx, columns=list(columns)).to_pylist()
+            continue
+        for raw in snapshot.read_row_group(idx, columns=[RAW_COLUMN]).column(0):
+            yield json.loads(zlib.decompress(raw.as_py()))
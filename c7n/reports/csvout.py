@@ -39,30 +39,50 @@ CLI Usage
 
 
 """
-from concurrent.futures import as_completed
-
+from collections import deque
 from datetime import datetime
 import gzip
+import hashlib
 import io
 import json
 import jmespath
 import logging
 import os
+import shutil
+import sqlite3
+import tempfile
+import time
 from tabulate import tabulate
 
 import six
 from botocore.compat import OrderedDict
 from dateutil.parser import parse as date_parse
 
+from c7n.cache import SqlKvCache
+from c7n.config import Bag
 from c7n.executor import ThreadPoolExecutor
+from c7n.reports import columnar
 from c7n.utils import local_session, dumps
 from c7n.utils import UnicodeWriter
 
 log = logging.getLogger('custodian.reports')
 
+# number of record files downloaded ahead of the report
+DOWNLOAD_WINDOW = 8
+# record files larger than this are spooled to disk
+SPOOL_SIZE = 8 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# resource ids held in memory before the index spills to disk
+INDEX_SIZE = 100000
+
 
 def report(policies, start_date, options, output_fh, raw_output_fh=None):
-    """Format a policy's extant records into a report."""
+    """Format a policy's extant records into a report.
+
+    Records are streamed newest first from the policies' outputs, and
+    the report written as they're read, only the latest record for a
+    resource is included in tabular formats.
+    """
     regions = set([p.options.region for p in policies])
     policy_names = set([p.name for p in policies])
     formatter = Formatter(
@@ -72,42 +92,289 @@ def report(policies, start_date, options, output_fh, raw_output_fh=None):
         include_region=len(regions) > 1,
         include_policy=len(policy_names) > 1
     )
-
-    records = []
+    manifest = get_manifest(getattr(options, 'manifest', None), options.days)
+    writer = ReportWriter(formatter, options.format, output_fh, raw_output_fh)
+    index = RecordIndex()
+    count = 0
+    try:
+        for record in iter_report_records(policies, start_date, manifest):
+            count += 1
+            writer.write(record, index.add(record[formatter._id_field]))
+    finally:
+        index.close()
+        if manifest is not None:
+            manifest.close()
+    writer.close()
+    log.debug("Reported %d unique of %d records", len(index), count)
+
+
+def get_manifest(path, days):
+    """Local cache of downloaded record files, keyed by s3 key and etag.
+
+    Record files are immutable once written. The manifest maps their
+    keys to local copies kept in a directory beside it, entries and
+    copies are kept for the report's time window.
+    """
+    if not path:
+        return None
+    manifest = SqlKvCache(Bag(
+        cache=SqlKvCache.url_prefix + path,
+        cache_period=int((days + 1) * 24 * 60)))
+    if not manifest.load():
+        return None
+    prune_manifest_files(get_manifest_dir(manifest), (days + 1) * 24 * 60 * 60)
+    return manifest
+
+
+def get_manifest_dir(manifest):
+    return manifest.cache_path + '.files'
+
+
+def prune_manifest_files(directory, max_age):
+    """Remove record file copies older than max_age seconds."""
+    if not os.path.isdir(directory):
+        return
+    expired = time.time() - max_age
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.stat(path).st_mtime < expired:
+                os.unlink(path)
+        except OSError:
+            continue
+
+
+def save_manifest_file(manifest, manifest_key, fh):
+    """Copy a record file beside the manifest, and record its path."""
+    directory = get_manifest_dir(manifest)
+    path = os.path.join(
+        directory, hashlib.sha256(repr(manifest_key).encode('utf8')).hexdigest())
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fh.seek(0)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as copy:
+            shutil.copyfileobj(fh, copy, CHUNK_SIZE)
+        os.replace(copy.name, path)
+    except OSError as e:
+        log.warning("Could not save record file %s err: %s" % (manifest_key[2], e))
+        return
+    manifest.save(manifest_key, path)
+
+
+def iter_report_records(policies, start_date, manifest=None, window=DOWNLOAD_WINDOW):
+    """Iterate over the records of the policies' outputs, newest first."""
+    sources = []
     for policy in policies:
         # initialize policy execution context for output access
         policy.ctx.initialize()
         if policy.ctx.output.type == 's3':
-            policy_records = record_set(
-                policy.session_factory,
-                policy.ctx.output.config['netloc'],
-                policy.ctx.output.config['path'].strip('/'),
-                start_date)
+            for key in list_record_keys(
+                    policy.session_factory,
+                    policy.ctx.output.config['netloc'],
+                    policy.ctx.output.config['path'].strip('/'),
+                    start_date):
+                sources.append((key['CustodianDate'], policy, key))
+            continue
+        record_path = get_fs_record_path(policy.ctx.log_dir)
+        if record_path:
+            sources.append((
+                datetime.fromtimestamp(os.stat(record_path).st_ctime),
+                policy, {'Key': record_path}))
+
+    # only the first record seen for a resource is reported, so order
+    # the record files by date before reading any of them.
+    sources.sort(key=lambda s: s[0], reverse=True)
+
+    def open_source(source):
+        custodian_date, policy, key = source
+        if policy.ctx.output.type == 's3':
+            return get_record_blob(
+                policy.session_factory, policy.ctx.output.config['netloc'], key, manifest)
+        return open(key['Key'], 'rb')
+
+    for (custodian_date, policy, key), fh in zip(
+            sources, iter_prefetch(open_source, sources, window)):
+        with fh:
+            for r in iter_blob_records(key['Key'], fh):
+                r['CustodianDate'] = custodian_date
+                r['policy'] = policy.name
+                r['region'] = policy.options.region
+                yield r
+
+
+def iter_prefetch(func, items, window):
+    """Map func over items in order, with up to window calls in flight."""
+    with ThreadPoolExecutor(max_workers=window) as w:
+        pending = deque()
+        for item in items:
+            pending.append(w.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_blob_records(key, fh):
+    """Iterate over the records of a record file, a row group or chunk at a time."""
+    if key.endswith(columnar.SNAPSHOT_FILE):
+        return columnar.iter_snapshot(fh)
+    if key.endswith('.gz'):
+        fh = gzip.GzipFile(fileobj=fh)
+    return iter_json_array(io.TextIOWrapper(fh, encoding='utf8'))
+
+
+def iter_json_array(fh, chunk_size=CHUNK_SIZE):
+    """Incrementally decode the elements of a json array from a text stream."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    expect = '['
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Truncated json array")
+            chunk = fh.read(chunk_size)
+            buf, pos, eof = chunk, 0, not chunk
+            continue
+        if expect == '[':
+            if buf[pos] != '[':
+                raise ValueError("Expected json array")
+            pos += 1
+            expect = 'first'
+        elif buf[pos] == ']' and expect in ('first', ','):
+            return
+        elif expect == ',':
+            if buf[pos] != ',':
+                raise ValueError("Expected ',' at %d" % pos)
+            pos += 1
+            expect = 'value'
         else:
-            policy_records = fs_record_set(policy.ctx.log_dir, policy.name)
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+                end = None
+            # an incomplete value, or a scalar which may continue in the next chunk
+            if end is None or (end == len(buf) and not eof):
+                chunk = fh.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+            pos = end
+            expect = ','
+            yield value
 
-        log.debug("Found %d records for region %s", len(policy_records), policy.options.region)
 
-        for record in policy_records:
-            record['policy'] = policy.name
-            record['region'] = policy.options.region
+class RecordIndex:
+    """Set of seen record ids, bounded in memory.
 
-        records += policy_records
+    Beyond max_size ids, the index spills to a temporary sqlite file.
+    """
 
-    rows = formatter.to_csv(records)
+    def __init__(self, max_size=INDEX_SIZE):
+        self.max_size = max_size
+        self.ids = set()
+        self.count = 0
+        self.conn = None
+        self.path = None
+
+    def add(self, rid):
+        """Add an id to the index, returns False if it was already present."""
+        if rid in self.ids:
+            return False
+        if self.conn is not None and self.conn.execute(
+                'select 1 from record_ids where id = ?', (rid,)).fetchone():
+            return False
+        self.ids.add(rid)
+        self.count += 1
+        if len(self.ids) >= self.max_size:
+            self.spill()
+        return True
+
+    def spill(self):
+        if self.conn is None:
+            fd, self.path = tempfile.mkstemp(prefix='c7n-report-', suffix='.db')
+            os.close(fd)
+            self.conn = sqlite3.connect(self.path)
+            self.conn.execute('create table record_ids (id primary key)')
+        with self.conn:
+            self.conn.executemany(
+                'insert or ignore into record_ids values (?)', [(i,) for i in self.ids])
+        self.ids = set()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            os.unlink(self.path)
+            self.conn = None
+
+    def __len__(self):
+        return self.count
+
+
+class JsonArrayWriter:
+    """Write a json array an element at a time."""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.count = 0
+
+    def write(self, record):
+        self.fh.write(self.count and ',\n  ' or '[\n  ')
+        self.fh.write(dumps(record, indent=2).replace('\n', '\n  '))
+        self.count += 1
+
+    def close(self):
+        self.fh.write(self.count and '\n]' or '[]')
+
+
+class ReportWriter:
+    """Write a report progressively as records are read.
+
+    The json and raw outputs include every record, csv and tabulated
+    outputs only the first (latest) record for a resource. Tabulated
+    formats need the full set of rows to align columns, so only those
+    are held until the report is closed.
+    """
 
-    if options.format == 'csv':
-        writer = UnicodeWriter(output_fh, formatter.headers())
-        writer.writerow(formatter.headers())
-        writer.writerows(rows)
-    elif options.format == 'json':
-        print(dumps(records, indent=2))
-    else:
-        # We special case CSV, and for other formats we pass to tabulate
-        print(tabulate(rows, formatter.headers(), tablefmt=options.format))
+    def __init__(self, formatter, format, output_fh, raw_output_fh=None):
+        self.formatter = formatter
+        self.format = format
+        self.output_fh = output_fh
+        self.rows = []
+        self.csv_writer = self.json_writer = self.raw_writer = None
+        if format == 'csv':
+            self.csv_writer = UnicodeWriter(output_fh, formatter.headers())
+            self.csv_writer.writerow(formatter.headers())
+        elif format == 'json':
+            self.json_writer = JsonArrayWriter(output_fh)
+        if raw_output_fh is not None:
+            self.raw_writer = JsonArrayWriter(raw_output_fh)
+
+    def write(self, record, unique=True):
+        if self.raw_writer:
+            self.raw_writer.write(record)
+        if self.json_writer:
+            self.json_writer.write(record)
+        elif not unique:
+            return
+        elif self.csv_writer:
+            self.csv_writer.writerow(self.formatter.extract_csv(record))
+        else:
+            self.rows.append(self.formatter.extract_csv(record))
 
-    if raw_output_fh is not None:
-        dumps(records, raw_output_fh, indent=2)
+    def close(self):
+        if self.json_writer:
+            self.json_writer.close()
+            self.output_fh.write('\n')
+        elif not self.csv_writer:
+            # We special case CSV, and for other formats we pass to tabulate
+            self.output_fh.write(tabulate(
+                self.rows, self.formatter.headers(), tablefmt=self.format) + '\n')
+        if self.raw_writer:
+            self.raw_writer.close()
 
 
 def _get_values(record, field_list, tag_map):
@@ -218,32 +485,36 @@ class Formatter:
         return rows
 
 
-def fs_record_set(output_path, policy_name):
+def get_fs_record_path(output_path):
+    snapshot_path = os.path.join(output_path, columnar.SNAPSHOT_FILE)
+    if columnar.HAVE_PYARROW and os.path.exists(snapshot_path):
+        return snapshot_path
     record_path = os.path.join(output_path, 'resources.json')
+    if os.path.exists(record_path):
+        return record_path
+
 
-    if not os.path.exists(record_path):
+def fs_record_set(output_path, policy_name):
+    record_path = get_fs_record_path(output_path)
+    if not record_path:
         return []
 
     mdate = datetime.fromtimestamp(
         os.stat(record_path).st_ctime)
 
-    with open(record_path) as fh:
-        records = json.load(fh)
+    with open(record_path, 'rb') as fh:
+        records = list(iter_blob_records(record_path, fh))
         [r.__setitem__('CustodianDate', mdate) for r in records]
         return records
 
 
-def record_set(session_factory, bucket, key_prefix, start_date, specify_hour=False):
-    """Retrieve all s3 records for the given policy output url
+def list_record_keys(session_factory, bucket, key_prefix, start_date, specify_hour=False):
+    """List the record keys for the given policy output url
 
-    From the given start date.
+    From the given start date, with their custodian date.
     """
-
     s3 = local_session(session_factory).client('s3')
 
-    records = []
-    key_count = 0
-
     date = start_date.strftime('%Y/%m/%d')
     if specify_hour:
         date += "/{}".format(start_date.hour)
@@ -258,38 +529,77 @@ def record_set(session_factory, bucket, key_prefix, start_date, specify_hour=Fal
         StartAfter=marker,
     )
 
-    with ThreadPoolExecutor(max_workers=20) as w:
-        for key_set in p:
-            if 'Contents' not in key_set:
-                continue
-            keys = [k for k in key_set['Contents']
-                    if k['Key'].endswith('resources.json.gz')]
-            key_count += len(keys)
-            futures = map(lambda k: w.submit(
-                get_records, bucket, k, session_factory), keys)
+    keys = []
+    for key_set in p:
+        if 'Contents' not in key_set:
+            continue
+        keys.extend(get_record_keys(key_set['Contents']))
+    for k in keys:
+        # key ends with 'YYYY/mm/dd/HH/resources.json.gz'
+        # so take the date parts only
+        k['CustodianDate'] = date_parse('-'.join(k['Key'].rsplit('/', 5)[-5:-1]))
+    return keys
+
+
+def record_set(session_factory, bucket, key_prefix, start_date, specify_hour=False):
+    """Retrieve all s3 records for the given policy output url
 
-            for f in as_completed(futures):
-                records.extend(f.result())
+    From the given start date.
+    """
+    keys = list_record_keys(session_factory, bucket, key_prefix, start_date, specify_hour)
+    records = []
+    for key_records in iter_prefetch(
+            lambda k: get_records(bucket, k, session_factory), keys, DOWNLOAD_WINDOW):
+        records.extend(key_records)
 
     log.info("Fetched %d records across %d files" % (
-        len(records), key_count))
+        len(records), len(keys)))
     return records
 
 
-def get_records(bucket, key, session_factory):
-    # we're doing a lot of this in memory, worst case
-    # though we're talking about a 10k objects, else
-    # we should spool to temp files
-
-    # key ends with 'YYYY/mm/dd/HH/resources.json.gz'
-    # so take the date parts only
-    date_str = '-'.join(key['Key'].rsplit('/', 5)[-5:-1])
-    custodian_date = date_parse(date_str)
+def get_record_keys(contents):
+    """Select the record keys from an s3 listing.
+
+    Prefers columnar snapshots where available, over resources.json
+    from the same policy execution.
+    """
+    keys = OrderedDict()
+    for k in contents:
+        if k['Key'].endswith('resources.json.gz'):
+            keys.setdefault(k['Key'].rsplit('/', 1)[0], k)
+        elif columnar.HAVE_PYARROW and k['Key'].endswith(columnar.SNAPSHOT_FILE):
+            keys[k['Key'].rsplit('/', 1)[0]] = k
+    return list(keys.values())
+
+
+def get_record_blob(session_factory, bucket, key, manifest=None):
+    """Fetch a record file, spooling it to disk if large.
+
+    With a manifest, unchanged keys are read from their local copy
+    rather than s3.
+    """
+    manifest_key = ('report', bucket, key['Key'], key.get('ETag'))
+    path = manifest is not None and manifest.get(manifest_key) or None
+    if path is not None and os.path.exists(path):
+        return open(path, 'rb')
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
     s3 = local_session(session_factory).client('s3')
-    result = s3.get_object(Bucket=bucket, Key=key['Key'])
-    blob = io.BytesIO(result['Body'].read())
+    body = s3.get_object(Bucket=bucket, Key=key['Key'])['Body']
+    for chunk in iter(lambda: body.read(CHUNK_SIZE), b''):
+        spool.write(chunk)
+    if manifest is not None and key.get('ETag'):
+        save_manifest_file(manifest, manifest_key, spool)
+    spool.seek(0)
+    return spool
+
 
-    records = json.load(gzip.GzipFile(fileobj=blob))
+def get_records(bucket, key, session_factory):
+    if 'CustodianDate' in key:
+        custodian_date = key['CustodianDate']
+    else:
+        custodian_date = date_parse('-'.join(key['Key'].rsplit('/', 5)[-5:-1]))
+    with get_record_blob(session_factory, bucket, key) as fh:
+        records = list(iter_blob_records(key['Key'], fh))
     log.debug("bucket: %s key: %s records: %d",
               bucket, key['Key'], len(records))
     for r in records:
@@ -71,12 +71,10 @@ def load_available(resources=True):
 def load_providers(provider_types):
     global LOADED
 
-    # Even though we're lazy loading resources we still need to import
-    # those that are making available generic filters/actions
+    # resources providing generic filters/actions are imported by the aws
+    # provider on first resource load, see AWS.get_resource_types
     if should_load_provider('aws', provider_types):
-        import c7n.resources.securityhub
-        import c7n.resources.sfn
-        import c7n.resources.ssm # NOQA
+        import c7n.resources.aws # NOQA
 
     if should_load_provider('azure', provider_types):
         from c7n_azure.entry import initialize_azure
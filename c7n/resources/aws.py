@@ -15,9 +15,13 @@
 from c7n.provider import clouds, Provider
 
 from collections import Counter, namedtuple
+from concurrent.futures import wait
+import atexit
 import contextlib
 import copy
 import datetime
+import functools
+import gzip
 import itertools
 import logging
 import os
@@ -25,6 +29,7 @@ import operator
 import shutil
 import sys
 import tempfile
+import threading
 import time
 import traceback
 
@@ -35,8 +40,10 @@ from botocore.validate import ParamValidator
 from c7n.credentials import SessionFactory
 from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
+from c7n.executor import ThreadPoolExecutor, get_execution_scope
 from c7n.log import CloudWatchLogHandler
 
+from .resource_index import ResourceIndex
 from .resource_map import ResourceMap
 
 # Import output registries aws provider extends.
@@ -53,6 +60,7 @@ from c7n.output import (
     Metrics,
     DeltaStats,
     DirectoryOutput,
+    LatencyHistogram,
     LogOutput,
 )
 
@@ -70,6 +78,7 @@ except ImportError:
     class Context: pass  # NOQA
 
 _profile_session = None
+_metadata_session = None
 
 
 DEFAULT_NAMESPACE = "CloudMaid"
@@ -125,7 +134,7 @@ def _default_account_id(options):
 
 
 def shape_validate(params, shape_name, service):
-    session = fake_session()._session
+    session = get_metadata_session()._session
     model = session.get_service_model(service)
     shape = model.shape_for(shape_name)
     validator = ParamValidator()
@@ -396,10 +405,21 @@ class XrayTracer:
 
 @api_stats_outputs.register('aws')
 class ApiStats(DeltaStats):
+    """Api call counts, with per operation latency, retries, throttles,
+    backoff and response sizes.
+
+    Retries and backoff sleeps are accounted from both botocore's retry
+    handler and c7n's get_retry.
+    """
 
     def __init__(self, ctx, config=None):
         super(ApiStats, self).__init__(ctx, config)
         self.api_calls = Counter()
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.operation_stats = Counter()
+        self.retry_snapshot = {}
+        self.scope = None
 
     def get_snapshot(self):
         return dict(self.api_calls)
@@ -407,31 +427,229 @@ class ApiStats(DeltaStats):
     def get_metadata(self):
         return self.get_snapshot()
 
+    def get_retry_stats(self):
+        """Delta of get_retry accounting over this execution."""
+        stats = {}
+        for k, v in utils.retry_stats.get_snapshot(self.scope).items():
+            v -= self.retry_snapshot.get(k, 0)
+            if v:
+                stats[k] = v
+        return stats
+
+    def get_operation_stats(self):
+        stats = Counter(self.operation_stats)
+        stats.update(self.get_retry_stats())
+        operations = {}
+        for operation, histogram in self.latency.items():
+            summary = histogram.get_summary()
+            summary.pop('histogram')
+            operations[operation] = summary
+        for (operation, stat), value in stats.items():
+            operations.setdefault(operation, {})[stat] = (
+                isinstance(value, float) and round(value, 6) or value)
+        return operations
+
     def __enter__(self):
         if isinstance(self.ctx.session_factory, credentials.SessionFactory):
-            self.ctx.session_factory.set_subscribers((self,))
+            self.ctx.session_factory.set_subscribers(
+                tuple(self.ctx.session_factory._subscribers) + (self,))
+        self.scope = get_execution_scope()
+        self.retry_snapshot = utils.retry_stats.get_snapshot(self.scope)
         self.push_snapshot()
 
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
         if isinstance(self.ctx.session_factory, credentials.SessionFactory):
-            self.ctx.session_factory.set_subscribers(())
+            self.ctx.session_factory.set_subscribers(tuple(
+                s for s in self.ctx.session_factory._subscribers if s is not self))
 
         # With cached sessions, we need to unregister any events subscribers
-        # on extant sessions to allow for the next registration.
-        utils.local_session(self.ctx.session_factory).events.unregister(
-            'after-call.*.*', self._record, unique_id='c7n-api-stats')
+        # on extant sessions and their pooled clients to allow for the next
+        # registration.
+        session = utils.local_session(self.ctx.session_factory)
+        pool = getattr(session, 'client', None)
+        emitters = [session.events] + [
+            c.meta.events for c in getattr(pool, 'clients', {}).values()]
+        for events in emitters:
+            for event, handler, unique_id in self.get_handlers():
+                events.unregister(event, handler, unique_id=unique_id)
 
         self.ctx.metrics.put_metric(
             "ApiCalls", sum(self.api_calls.values()), "Count")
+        self.put_operation_metrics()
         self.pop_snapshot()
 
+    def put_operation_metrics(self):
+        stats = Counter()
+        for (operation, stat), value in self.operation_stats.items():
+            stats[stat] += value
+        for (operation, stat), value in self.get_retry_stats().items():
+            stats[stat] += value
+        for stat, name, unit in (
+                ('retries', 'ApiRetries', 'Count'),
+                ('throttles', 'ApiThrottles', 'Count'),
+                ('backoff', 'ApiBackoffTime', 'Seconds'),
+                ('bytes', 'ApiResponseSize', 'Bytes')):
+            if stats[stat]:
+                self.ctx.metrics.put_metric(name, stats[stat], unit)
+        latency = LatencyHistogram()
+        for histogram in self.latency.values():
+            latency.merge(histogram)
+        if latency.count:
+            self.ctx.metrics.put_metric(
+                "ApiLatencyP50", latency.percentile(50), "Seconds")
+            self.ctx.metrics.put_metric(
+                "ApiLatencyP99", latency.percentile(99), "Seconds")
+
+    def get_handlers(self):
+        return (
+            ('after-call.*.*', self._record, 'c7n-api-stats'),
+            ('before-parameter-build.*.*', self._start, 'c7n-api-stats-start'),
+            ('after-call-error.*.*', self._record_error, 'c7n-api-stats-error'),
+            ('needs-retry.*.*', self._record_retry, 'c7n-api-stats-retry'),
+            ('request-created.*.*', self._record_backoff, 'c7n-api-stats-backoff'))
+
+    def __call__(self, s):
+        for event, handler, unique_id in self.get_handlers():
+            s.events.register(event, handler, unique_id=unique_id)
+
+    def _start(self, model, context=None, **kwargs):
+        if context is not None:
+            context['c7n-api-start'] = time.time()
+            context['c7n-api-operation'] = "%s.%s" % (
+                model.service_model.endpoint_prefix, model.name)
+
+    def _record(self, http_response, parsed, model, context=None, **kwargs):
+        operation = "%s.%s" % (model.service_model.endpoint_prefix, model.name)
+        self.api_calls[operation] += 1
+        headers = getattr(http_response, 'headers', None) or {}
+        if headers.get('content-length'):
+            with self.lock:
+                self.operation_stats[(operation, 'bytes')] += int(headers['content-length'])
+        self._record_latency(
+            operation, context, getattr(http_response, 'status_code', 200) >= 300)
+
+    def _record_error(self, exception=None, context=None, **kwargs):
+        if context and 'c7n-api-operation' in context:
+            self._record_latency(context['c7n-api-operation'], context, True)
+
+    def _record_retry(self, response=None, operation=None, request_dict=None, **kwargs):
+        parsed = response and response[1] or {}
+        if parsed.get('Error', {}).get('Code') in utils.THROTTLE_CODES:
+            with self.lock:
+                self.operation_stats[("%s.%s" % (
+                    operation.service_model.endpoint_prefix, operation.name),
+                    'throttles')] += 1
+        # if the request is retried, botocore sleeps before creating the next request.
+        if request_dict is not None and 'context' in request_dict:
+            request_dict['context']['c7n-api-retry'] = time.time()
+
+    def _record_backoff(self, request=None, **kwargs):
+        context = getattr(request, 'context', None)
+        if not context or 'c7n-api-retry' not in context:
+            return
+        operation = context.get('c7n-api-operation')
+        with self.lock:
+            self.operation_stats[(operation, 'retries')] += 1
+            self.operation_stats[(operation, 'backoff')] += (
+                time.time() - context.pop('c7n-api-retry'))
+
+    def _record_latency(self, operation, context, error=False):
+        if not context or 'c7n-api-start' not in context:
+            return
+        duration = time.time() - context['c7n-api-start']
+        with self.lock:
+            if operation not in self.latency:
+                self.latency[operation] = LatencyHistogram()
+            self.latency[operation].add(duration, error)
+        record_api_call = getattr(self.ctx.tracer, 'record_api_call', None)
+        if record_api_call is not None:
+            record_api_call(operation, duration, error)
+
+
+class ApiRateLimit:
+    """Client side api call budget shared by concurrently executing policies.
+
+    Api calls acquire a token from a bucket keyed by service, region and
+    account before being sent, so that policies executing in parallel
+    don't collectively exceed service rate limits and spend their time
+    in retry backoff.
+    """
+
+    def __init__(self, limiter, account_id):
+        self.limiter = limiter
+        self.account_id = account_id
+
     def __call__(self, s):
         s.events.register(
-            'after-call.*.*', self._record, unique_id='c7n-api-stats')
+            'before-call.*.*', self._acquire, unique_id='c7n-api-rate-limit')
+
+    def _acquire(self, model, request_signer=None, **kwargs):
+        region = request_signer and request_signer.region_name or None
+        self.limiter.acquire(
+            (model.service_model.endpoint_prefix, region, self.account_id))
+
+
+class S3Uploader:
+    """Upload files to s3 on a process wide bounded thread pool.
 
-    def _record(self, http_response, parsed, model, **kwargs):
-        self.api_calls["%s.%s" % (
-            model.service_model.endpoint_prefix, model.name)] += 1
+    Uploads are queued as policy output files are written, overlapping
+    transfers with policy execution. Submitting blocks once max_pending
+    uploads are outstanding.
+    """
+
+    def __init__(self, workers=4, max_pending=32):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.stats = Counter()
+
+    def submit(self, transfer, path, bucket, key, extra_args):
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(
+                self.upload, transfer, path, bucket, key, extra_args)
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.complete)
+        return future
+
+    def upload(self, transfer, path, bucket, key, extra_args):
+        t = time.time()
+        transfer.upload_file(path, bucket, key, extra_args=extra_args)
+        return os.path.getsize(path), time.time() - t
+
+    def complete(self, future):
+        self.slots.release()
+        with self.lock:
+            self.pending.discard(future)
+            if future.exception() is None:
+                size, duration = future.result()
+                self.stats['files'] += 1
+                self.stats['bytes'] += size
+                self.stats['duration'] += duration
+            else:
+                self.stats['errors'] += 1
+                log.error("Error uploading policy output: %s", future.exception())
+
+    def flush(self):
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+
+
+_uploader = None
+
+
+def get_uploader():
+    global _uploader
+    if _uploader is None:
+        _uploader = S3Uploader()
+        atexit.register(_uploader.flush)
+    return _uploader
 
 
 @blob_outputs.register('s3')
@@ -444,18 +662,30 @@ class S3Output(DirectoryOutput):
        with S3Output(session_factory, 's3://bucket/prefix'):
            log.info('xyz')  # -> log messages sent to custodian-run.log.gz
 
+    With ``s3://bucket/prefix?stream=true`` files are compressed as
+    they're written, and uploaded on a shared pool as they're closed,
+    the run log is uploaded as policy execution finishes. Outside of
+    lambda the tail uploads overlap with the next policy's execution.
     """
 
     permissions = ('S3:PutObject',)
+    extra_args = {
+        'ACL': 'bucket-owner-full-control',
+        'ServerSideEncryption': 'AES256'}
+    in_lambda = 'LAMBDA_TASK_ROOT' in os.environ
 
     def __init__(self, ctx, config):
         self.ctx = ctx
         self.config = config
-        self.output_path = self.get_output_path(self.config['url'])
+        # strip output options from the url
+        self.output_path = self.get_output_path(self.config['url'].split('?', 1)[0])
         self.s3_path, self.bucket, self.key_prefix = utils.parse_s3(
             self.output_path)
         self.root_dir = tempfile.mkdtemp()
         self.transfer = None
+        self.compress_stream = self.config.get('stream', '').lower() in ('true', 'yes', '1')
+        self.uploads = []
+        self.uploaded = set()
 
     def __repr__(self):
         return "<%s to bucket:%s prefix:%s>" % (
@@ -474,18 +704,92 @@ class S3Output(DirectoryOutput):
     def join(*parts):
         return "/".join([s.strip('/') for s in parts])
 
-    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
+    def get_transfer(self):
         from boto3.s3.transfer import S3Transfer
+        if self.transfer is None:
+            self.transfer = S3Transfer(
+                self.ctx.session_factory(assume=False).client('s3'))
+        return self.transfer
+
+    def get_key(self, path):
+        key = "%s%s" % (self.key_prefix, path[len(self.root_dir):].replace(os.sep, '/'))
+        return key.strip('/')
+
+    def write_file(self, rel_path, value):
+        if not self.compress_stream:
+            return super(S3Output, self).write_file(rel_path, value)
+        path = os.path.join(self.root_dir, rel_path + '.gz')
+        with gzip.open(path, 'wt', compresslevel=7) as fh:
+            fh.write(value)
+        self.uploaded.add(path)
+        self.uploads.append(get_uploader().submit(
+            self.get_transfer(), path, self.bucket, self.get_key(path), self.extra_args))
+
+    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
         if exc_type is not None:
             log.exception("Error while executing policy")
+        if self.compress_stream:
+            return self.upload_stream()
         log.debug("Uploading policy logs")
         self.compress()
-        self.transfer = S3Transfer(
-            self.ctx.session_factory(assume=False).client('s3'))
+        self.get_transfer()
         self.upload()
         shutil.rmtree(self.root_dir)
         log.debug("Policy Logs uploaded")
 
+    def upload_stream(self):
+        # uploads queued during execution have generally completed by now.
+        wait(self.uploads)
+        self.put_upload_metrics(self.uploads)
+        errors = [f.exception() for f in self.uploads if f.exception() is not None]
+
+        # upload the run log and any files written outside of write_file
+        self.compress()
+        uploader = get_uploader()
+        remaining = []
+        for root, dirs, files in os.walk(self.root_dir):
+            for f in files:
+                path = os.path.join(root, f)
+                if path in self.uploaded:
+                    continue
+                remaining.append(uploader.submit(
+                    self.get_transfer(), path, self.bucket, self.get_key(path),
+                    self.extra_args))
+
+        def cleanup(future):
+            if all(f.done() for f in remaining):
+                shutil.rmtree(self.root_dir, ignore_errors=True)
+
+        if not remaining:
+            shutil.rmtree(self.root_dir, ignore_errors=True)
+        for f in remaining:
+            f.add_done_callback(cleanup)
+        if self.in_lambda:
+            wait(remaining)
+            errors.extend(f.exception() for f in remaining if f.exception() is not None)
+        # the run log is uploaded before surfacing earlier upload errors
+        if errors:
+            raise errors[0]
+
+    def put_upload_metrics(self, uploads):
+        sizes, durations, errors = [], [], 0
+        for f in uploads:
+            if f.exception() is not None:
+                errors += 1
+                continue
+            size, duration = f.result()
+            sizes.append(size)
+            durations.append(duration)
+        if errors:
+            self.ctx.metrics.put_metric(
+                'OutputUploadErrors', errors, 'Count', Scope='Policy', buffer=False)
+        if not sizes:
+            return
+        self.ctx.metrics.put_metric(
+            'OutputUploadBytes', sum(sizes), 'Bytes', Scope='Policy', buffer=False)
+        self.ctx.metrics.put_metric(
+            'OutputUploadTime', max(durations), 'Seconds', Scope='Policy', buffer=False)
+
     def upload(self):
         for root, dirs, files in os.walk(self.root_dir):
             for f in files:
@@ -496,9 +800,7 @@ class S3Output(DirectoryOutput):
                 key = key.strip('/')
                 self.transfer.upload_file(
                     os.path.join(root, f), self.bucket, key,
-                    extra_args={
-                        'ACL': 'bucket-owner-full-control',
-                        'ServerSideEncryption': 'AES256'})
+                    extra_args=self.extra_args)
 
 
 @clouds.register('aws')
@@ -510,6 +812,8 @@ class AWS(Provider):
     resources = PluginRegistry('resources')
     # import paths for resources
     resource_map = ResourceMap
+    # precomputed service and vocabulary of resources
+    resource_index = ResourceIndex
 
     def initialize(self, options):
         """
@@ -521,6 +825,15 @@ class AWS(Provider):
 
         return options
 
+    @classmethod
+    def get_resource_types(cls, resource_types):
+        # These register generic filters/actions on resource types when
+        # they're loaded, defer importing them till resources are requested.
+        import c7n.resources.securityhub
+        import c7n.resources.sfn
+        import c7n.resources.ssm # NOQA
+        return super(AWS, cls).get_resource_types(resource_types)
+
     def get_session_factory(self, options):
         return SessionFactory(
             options.region,
@@ -542,6 +855,10 @@ class AWS(Provider):
         """
         from c7n.policy import Policy, PolicyCollection
         policies = []
+        rate_limit = None
+        if getattr(options, 'jobs', 1) > 1 and getattr(options, 'api_rate', None):
+            rate_limit = ApiRateLimit(
+                utils.RateLimiter(options.api_rate), options.account_id)
         service_region_map, resource_service_map = get_service_region_map(
             options.regions, policy_collection.resource_types)
         if 'all' in options.regions:
@@ -585,9 +902,12 @@ class AWS(Provider):
                 if len(options.regions) > 1 or 'all' in options.regions and getattr(
                         options, 'output_dir', None):
                     options_copy.output_dir = join_output(options.output_dir, region)
-                policies.append(
-                    Policy(p.data, options_copy,
-                           session_factory=policy_collection.session_factory()))
+                policy = Policy(p.data, options_copy,
+                                session_factory=policy_collection.session_factory())
+                if rate_limit and isinstance(
+                        policy.session_factory, credentials.SessionFactory):
+                    policy.session_factory.set_subscribers((rate_limit,))
+                policies.append(policy)
 
         return PolicyCollection(
             # order policies by region to minimize local session invalidation.
@@ -611,10 +931,34 @@ def fake_session():
     return session
 
 
+def get_metadata_session():
+    """Return a process wide session for sdk meta information.
+
+    Endpoint and service model data is loaded once per session, so we
+    reuse a single session rather than constructing one per lookup.
+    """
+    global _metadata_session
+    if _metadata_session is None:
+        _metadata_session = fake_session()
+    return _metadata_session
+
+
+@functools.lru_cache(maxsize=None)
+def get_available_regions(service, partition='aws'):
+    return tuple(get_metadata_session().get_available_regions(
+        service, partition_name=partition))
+
+
+def get_resource_service(resource_type):
+    entry = ResourceIndex.get('aws.%s' % resource_type)
+    if entry is not None:
+        return entry['service']
+    # resources from plugins aren't in the index
+    return clouds['aws'].resources.get(resource_type).resource_type.service
+
+
 def get_service_region_map(regions, resource_types):
     # we're not interacting with the apis just using the sdk meta information.
-
-    session = fake_session()
     normalized_types = []
     for r in resource_types:
         if r.startswith('aws.'):
@@ -623,13 +967,12 @@ def get_service_region_map(regions, resource_types):
             normalized_types.append(r)
 
     resource_service_map = {
-        r: clouds['aws'].resources.get(r).resource_type.service
-        for r in normalized_types if r != 'account'}
+        r: get_resource_service(r) for r in normalized_types if r != 'account'}
     # support for govcloud and china, we only utilize these regions if they
     # are explicitly passed in on the cli.
     partition_regions = {}
     for p in ('aws-cn', 'aws-us-gov'):
-        for r in session.get_available_regions('s3', partition_name=p):
+        for r in get_available_regions('s3', p):
             partition_regions[r] = p
 
     partitions = ['aws']
@@ -641,5 +984,5 @@ def get_service_region_map(regions, resource_types):
     for s in set(itertools.chain(resource_service_map.values())):
         for partition in partitions:
             service_region_map.setdefault(s, []).extend(
-                session.get_available_regions(s, partition_name=partition))
+                get_available_regions(s, partition))
     return service_region_map, resource_service_map
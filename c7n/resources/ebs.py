@@ -15,6 +15,7 @@ from collections import Counter
 import logging
 import itertools
 import json
+import threading
 import time
 
 from botocore.exceptions import ClientError
@@ -30,6 +31,7 @@ from c7n.filters import (
 from c7n.filters.health import HealthEventFilter
 
 from c7n.manager import resources
+from c7n.planner import get_run_index
 from c7n.resources.kms import ResourceKmsKeyAlias
 from c7n.query import QueryResourceManager, TypeInfo
 from c7n.tags import Tag
@@ -186,22 +188,92 @@ class SnapshotAge(AgeFilter):
     date_attribute = 'StartTime'
 
 
+def get_block_device_snapshots(resource, key='BlockDeviceMappings'):
+    for b in resource.get(key) or ():
+        if 'Ebs' in b and 'SnapshotId' in b['Ebs']:
+            yield b['Ebs']['SnapshotId']
+
+
+class SnapshotReferences:
+    """Index of snapshot ids to the resources referencing them.
+
+    Maps snapshots to the images, and the launch configurations and
+    launch template versions of auto scaling groups, whose block device
+    mappings reference them. With a resource planner the index is shared
+    by the policies of a run, per account and region.
+
+    Sources are scanned once, and rescanned only when a policy's actions
+    modify resources of their types.
+    """
+
+    # source name -> resource types whose modification invalidates it
+    sources = {
+        'ami': ('ami',),
+        'asg': ('asg', 'launch-config', 'launch-template-version')}
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.references = {}
+
+    def refresh(self, manager, sources=tuple(sources)):
+        with self.lock:
+            for source in sources:
+                if source not in self.references:
+                    self.references[source] = getattr(self, 'scan_%s' % source)(manager)
+        return self
+
+    def scan_ami(self, manager):
+        refs = {}
+        for i in manager.get_resource_manager('ami').resources():
+            for snap_id in get_block_device_snapshots(i):
+                refs.setdefault(snap_id, []).append(('ami', i['ImageId']))
+        return refs
+
+    def scan_asg(self, manager):
+        refs = {}
+        asgs = manager.get_resource_manager('asg').resources()
+        if any('LaunchConfigurationName' in a for a in asgs):
+            for lc in manager.get_resource_manager('launch-config').resources():
+                for snap_id in get_block_device_snapshots(lc):
+                    refs.setdefault(snap_id, []).append(
+                        ('launch-config', lc['LaunchConfigurationName']))
+
+        tmpl_mgr = manager.get_resource_manager('launch-template-version')
+        for tversion in tmpl_mgr.get_resources(
+                list(tmpl_mgr.get_asg_templates(asgs).keys())):
+            for snap_id in get_block_device_snapshots(tversion['LaunchTemplateData']):
+                refs.setdefault(snap_id, []).append((
+                    'launch-template-version', '%s:%s' % (
+                        tversion['LaunchTemplateId'], tversion['VersionNumber'])))
+        return refs
+
+    def invalidate(self, resource_type, actions=()):
+        with self.lock:
+            for source, resource_types in self.sources.items():
+                if resource_type in resource_types:
+                    self.references.pop(source, None)
+
+    def get_references(self, snapshot_id, sources=tuple(sources)):
+        """Return the (resource type, resource id) referencing a snapshot."""
+        refs = []
+        for source in sources:
+            refs.extend(self.references[source].get(snapshot_id, ()))
+        return refs
+
+
+def get_snapshot_references(manager, sources=tuple(SnapshotReferences.sources)):
+    """Return the snapshot reference index for a policy, scanning sources as needed."""
+    return get_run_index(
+        manager, 'snapshot-references', SnapshotReferences).refresh(manager, sources)
+
+
 def _filter_ami_snapshots(self, snapshots):
     if not self.data.get('value', True):
         return snapshots
     # try using cache first to get a listing of all AMI snapshots and compares resources to the list
     # This will populate the cache.
-    amis = self.manager.get_resource_manager('ami').resources()
-    ami_snaps = []
-    for i in amis:
-        for dev in i.get('BlockDeviceMappings'):
-            if 'Ebs' in dev and 'SnapshotId' in dev['Ebs']:
-                ami_snaps.append(dev['Ebs']['SnapshotId'])
-    matches = []
-    for snap in snapshots:
-        if snap['SnapshotId'] not in ami_snaps:
-            matches.append(snap)
-    return matches
+    references = get_snapshot_references(self.manager, ('ami',))
+    return [s for s in snapshots if not references.get_references(s['SnapshotId'], ('ami',))]
 
 
 @Snapshot.filter_registry.register('cross-account')
@@ -249,7 +321,8 @@ class SnapshotUnusedFilter(Filter):
 
     true: snapshot is not used by launch-template, launch-config, or ami.
 
-    false: snapshot is being used by launch-template, launch-config, or ami.
+    false: snapshot is being used by launch-template, launch-config, or ami,
+    the referencing resources are annotated as `c7n:SnapshotReferences`.
 
     :example:
 
@@ -264,46 +337,25 @@ class SnapshotUnusedFilter(Filter):
     """
 
     schema = type_schema('unused', value={'type': 'boolean'})
+    annotation_key = 'c7n:SnapshotReferences'
 
     def get_permissions(self):
         return list(itertools.chain(*[
             self.manager.get_resource_manager(m).get_permissions()
             for m in ('asg', 'launch-config', 'ami')]))
 
-    def _pull_asg_snapshots(self):
-        asgs = self.manager.get_resource_manager('asg').resources()
-        snap_ids = set()
-        lcfgs = set(a['LaunchConfigurationName'] for a in asgs if 'LaunchConfigurationName' in a)
-        lcfg_mgr = self.manager.get_resource_manager('launch-config')
-
-        if lcfgs:
-            for lc in lcfg_mgr.resources():
-                for b in lc.get('BlockDeviceMappings'):
-                    if 'Ebs' in b and 'SnapshotId' in b['Ebs']:
-                        snap_ids.add(b['Ebs']['SnapshotId'])
-
-        tmpl_mgr = self.manager.get_resource_manager('launch-template-version')
-        for tversion in tmpl_mgr.get_resources(
-                list(tmpl_mgr.get_asg_templates(asgs).keys())):
-            for bd in tversion['LaunchTemplateData'].get('BlockDeviceMappings', ()):
-                if 'Ebs' in bd and 'SnapshotId' in bd['Ebs']:
-                    snap_ids.add(bd['Ebs']['SnapshotId'])
-        return snap_ids
-
-    def _pull_ami_snapshots(self):
-        amis = self.manager.get_resource_manager('ami').resources()
-        ami_snaps = set()
-        for i in amis:
-            for dev in i.get('BlockDeviceMappings'):
-                if 'Ebs' in dev and 'SnapshotId' in dev['Ebs']:
-                    ami_snaps.add(dev['Ebs']['SnapshotId'])
-        return ami_snaps
-
     def process(self, resources, event=None):
-        snaps = self._pull_asg_snapshots().union(self._pull_ami_snapshots())
+        references = get_snapshot_references(self.manager)
         if self.data.get('value', True):
-            return [r for r in resources if r['SnapshotId'] not in snaps]
-        return [r for r in resources if r['SnapshotId'] in snaps]
+            return [r for r in resources if not references.get_references(r['SnapshotId'])]
+        results = []
+        for r in resources:
+            refs = references.get_references(r['SnapshotId'])
+            if refs:
+                r[self.annotation_key] = [
+                    {'ResourceType': rtype, 'ResourceId': rid} for rtype, rid in refs]
+                results.append(r)
+        return results
 
 
 @Snapshot.filter_registry.register('skip-ami-snapshots')
@@ -41,6 +41,7 @@ from c7n.tags import TagActionFilter, TagDelayedAction, Tag, RemoveTag
 from c7n.utils import local_session, type_schema, chunks, filter_empty, QueryParser
 
 from c7n.resources.aws import Arn
+from c7n.resources.iamgraph import get_authorization_graph
 from c7n.resources.securityhub import OtherResourcePostFinding
 
 
@@ -497,6 +498,25 @@ class CheckPermissions(Filter):
                  - iam:CreateUser
 
     By default permission boundaries are checked.
+
+    By default permissions are checked with the iam policy simulator,
+    one api call per principal or policy. With `evaluation: local`,
+    they're evaluated from a snapshot of the account's authorization
+    details instead, using the simulator only for principals whose
+    matching policy statements have conditions or are scoped to
+    specific resources.
+
+    .. code-block:: yaml
+
+        policies:
+          - name: super-roles
+            resource: iam-role
+            filters:
+              - type: check-permissions
+                evaluation: local
+                match: allowed
+                actions:
+                 - iam:CreateUser
     """
 
     schema = type_schema(
@@ -507,19 +527,25 @@ class CheckPermissions(Filter):
                 {'$ref': '#/definitions/filters/value'}]},
             'boundaries': {'type': 'boolean'},
             'match-operator': {'enum': ['and', 'or']},
+            'evaluation': {'enum': ['simulate', 'local']},
             'actions': {'type': 'array', 'items': {'type': 'string'}},
             'required': ('actions', 'match')})
     schema_alias = True
     policy_annotation = 'c7n:policy'
     eval_annotation = 'c7n:perm-matches'
+    boundaries = None
+    graph = None
 
     def get_permissions(self):
         if self.manager.type == 'iam-policy':
-            return ('iam:SimulateCustomPolicy', 'iam:GetPolicyVersion')
-        perms = ('iam:SimulatePrincipalPolicy', 'iam:GetPolicy', 'iam:GetPolicyVersion')
-        if self.manager.type not in ('iam-user', 'iam-role',):
+            perms = ('iam:SimulateCustomPolicy', 'iam:GetPolicyVersion')
+        else:
+            perms = ('iam:SimulatePrincipalPolicy', 'iam:GetPolicy', 'iam:GetPolicyVersion')
+        if self.manager.type not in ('iam-user', 'iam-role', 'iam-policy'):
             # for simulating w/ permission boundaries
             perms += ('iam:GetRole',)
+        if self.data.get('evaluation') == 'local':
+            perms += ('iam:GetAccountAuthorizationDetails',)
         return perms
 
     def process(self, resources, event=None):
@@ -529,9 +555,22 @@ class CheckPermissions(Filter):
         operator = self.data.get('match-operator', 'and') == 'and' and all or any
 
         arn_resources = list(zip(self.get_iam_arns(resources), resources))
-        self.initialize_boundaries(client, arn_resources)
-        results = []
         eval_cache = {}
+        if self.data.get('evaluation') == 'local':
+            self.graph = get_authorization_graph(self.manager)
+            for arn, r in arn_resources:
+                if arn is None or arn in eval_cache:
+                    continue
+                evaluations = self.get_local_evaluations(arn, r, actions)
+                if evaluations is not None:
+                    eval_cache[arn] = evaluations
+            self.log.debug(
+                "check-permissions evaluated %d of %d principals locally",
+                len(eval_cache), len({arn for arn, r in arn_resources if arn}))
+        simulated = [(arn, r) for arn, r in arn_resources if arn not in eval_cache]
+        if simulated:
+            self.initialize_boundaries(client, simulated)
+        results = []
         for arn, r in arn_resources:
             if arn is None:
                 continue
@@ -598,6 +637,17 @@ class CheckPermissions(Filter):
     def get_iam_arns(self, resources):
         return self.manager.get_arns(resources)
 
+    def get_local_evaluations(self, arn, r, actions):
+        """Evaluate from the authorization details, None if undetermined."""
+        if self.manager.type != 'iam-policy':
+            return self.graph.evaluate(
+                arn, actions, boundaries=self.data.get('boundary', True) is not False)
+        policy = r.get(self.policy_annotation) or self.graph.get_policy_version(r['Arn'])
+        if policy is None:
+            return None
+        r[self.policy_annotation] = policy
+        return self.graph.evaluate_policy(policy['Document'], actions)
+
     def get_evaluations(self, client, arn, r, actions):
         if self.manager.type == 'iam-policy':
             policy = r.get(self.policy_annotation)
@@ -829,8 +879,30 @@ class IamRoleInlinePolicy(Filter):
         return res
 
 
+class AuthorizationDetailsMixin:
+    """Answer from the account's authorization details for many resources.
+
+    Past a number of resources, one paginated snapshot of the account's
+    authorization details is cheaper than api calls per resource.
+    """
+
+    authorization_details_threshold = 100
+
+    def get_authorization_graph(self, resources):
+        if len(resources) < self.authorization_details_threshold:
+            return None
+        return get_authorization_graph(self.manager)
+
+    def get_role_managed_policies(self, client, resource, graph=None):
+        policies = graph and graph.get_managed_policies(resource['Arn'])
+        if policies is None:
+            policies = [r['PolicyName'] for r in client.list_attached_role_policies(
+                RoleName=resource['RoleName'])['AttachedPolicies']]
+        return policies
+
+
 @Role.filter_registry.register('has-specific-managed-policy')
-class SpecificIamRoleManagedPolicy(Filter):
+class SpecificIamRoleManagedPolicy(AuthorizationDetailsMixin, Filter):
     """Filter IAM roles that has a specific policy attached
 
     For example, if the user wants to check all roles with 'admin-policy':
@@ -848,21 +920,19 @@ class SpecificIamRoleManagedPolicy(Filter):
     """
 
     schema = type_schema('has-specific-managed-policy', value={'type': 'string'})
-    permissions = ('iam:ListAttachedRolePolicies',)
-
-    def _managed_policies(self, client, resource):
-        return [r['PolicyName'] for r in client.list_attached_role_policies(
-            RoleName=resource['RoleName'])['AttachedPolicies']]
+    permissions = ('iam:ListAttachedRolePolicies', 'iam:GetAccountAuthorizationDetails')
 
     def process(self, resources, event=None):
         c = local_session(self.manager.session_factory).client('iam')
+        graph = self.get_authorization_graph(resources)
         if self.data.get('value'):
-            return [r for r in resources if self.data.get('value') in self._managed_policies(c, r)]
+            return [r for r in resources if self.data.get('value') in
+            self.get_role_managed_policies(c, r, graph)]
         return []
 
 
 @Role.filter_registry.register('no-specific-managed-policy')
-class NoSpecificIamRoleManagedPolicy(Filter):
+class NoSpecificIamRoleManagedPolicy(AuthorizationDetailsMixin, Filter):
     """Filter IAM roles that do not have a specific policy attached
 
     For example, if the user wants to check all roles without 'ip-restriction':
@@ -880,17 +950,14 @@ class NoSpecificIamRoleManagedPolicy(Filter):
     """
 
     schema = type_schema('no-specific-managed-policy', value={'type': 'string'})
-    permissions = ('iam:ListAttachedRolePolicies',)
-
-    def _managed_policies(self, client, resource):
-        return [r['PolicyName'] for r in client.list_attached_role_policies(
-            RoleName=resource['RoleName'])['AttachedPolicies']]
+    permissions = ('iam:ListAttachedRolePolicies', 'iam:GetAccountAuthorizationDetails')
 
     def process(self, resources, event=None):
         c = local_session(self.manager.session_factory).client('iam')
+        graph = self.get_authorization_graph(resources)
         if self.data.get('value'):
             return [r for r in resources if not self.data.get('value') in
-            self._managed_policies(c, r)]
+            self.get_role_managed_policies(c, r, graph)]
         return []
 
 
@@ -1065,7 +1132,7 @@ class UnusedIamPolicies(Filter):
 
 
 @Policy.filter_registry.register('has-allow-all')
-class AllowAllIamPolicies(Filter):
+class AllowAllIamPolicies(AuthorizationDetailsMixin, Filter):
     """Check if IAM policy resource(s) have allow-all IAM policy statement block.
 
     This allows users to implement CIS AWS check 1.24 which states that no
@@ -1107,13 +1174,16 @@ class AllowAllIamPolicies(Filter):
 
     """
     schema = type_schema('has-allow-all')
-    permissions = ('iam:ListPolicies', 'iam:ListPolicyVersions')
-
-    def has_allow_all_policy(self, client, resource):
-        statements = client.get_policy_version(
-            PolicyArn=resource['Arn'],
-            VersionId=resource['DefaultVersionId']
-        )['PolicyVersion']['Document']['Statement']
+    permissions = (
+        'iam:ListPolicies', 'iam:ListPolicyVersions', 'iam:GetAccountAuthorizationDetails')
+
+    def has_allow_all_policy(self, client, resource, graph=None):
+        version = graph and graph.get_policy_version(resource['Arn'])
+        if version is None:
+            version = client.get_policy_version(
+                PolicyArn=resource['Arn'],
+                VersionId=resource['DefaultVersionId'])['PolicyVersion']
+        statements = version['Document']['Statement']
         if isinstance(statements, dict):
             statements = [statements]
 
@@ -1131,7 +1201,8 @@ class AllowAllIamPolicies(Filter):
 
     def process(self, resources, event=None):
         c = local_session(self.manager.session_factory).client('iam')
-        results = [r for r in resources if self.has_allow_all_policy(c, r)]
+        graph = self.get_authorization_graph(resources)
+        results = [r for r in resources if self.has_allow_all_policy(c, r, graph)]
         self.log.info(
             "%d of %d iam policies have allow all.",
             len(results), len(resources))
@@ -0,0 +1,314 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+IAM authorization graph
+-----------------------
+
+Answers questions about an account's identity based permissions from
+a single snapshot of its authorization details
+(iam:GetAccountAuthorizationDetails), which has the users, groups,
+roles, their inline and attached managed policies, and permission
+boundaries, instead of api calls per principal or policy.
+
+Policy statements are compiled once per policy and indexed by action
+service prefix, so evaluating an action only considers statements that
+can match it.
+
+Evaluation mirrors the policy simulator with the default resource
+(``*``) and no context values. Explicit denies override allows, and an
+allow also has to be allowed by the principal's permission boundary.
+Where a decision depends on statements that can't be evaluated without
+request context (conditions, or resource scoped statements), the
+evaluation is undetermined, and callers should use the policy
+simulator instead.
+
+The snapshot is cached with the policy's resource cache.
+"""
+import json
+import logging
+import re
+
+import six
+from six.moves.urllib.parse import unquote
+
+from c7n.utils import local_session
+
+log = logging.getLogger('custodian.iam.graph')
+
+
+DETAIL_KEYS = ('UserDetailList', 'GroupDetailList', 'RoleDetailList', 'Policies')
+
+
+def get_authorization_details(manager):
+    """Fetch the account's authorization details, via the resource cache."""
+    cache_key = {
+        'account': manager.config.account_id,
+        'region': 'global',
+        'resource': 'AuthorizationDetails'}
+    details = None
+    if manager._cache.load():
+        details = manager._cache.get(cache_key)
+    if details is not None:
+        return details
+
+    # Lazy for non circular
+    from c7n.query import RetryPageIterator
+    client = local_session(manager.session_factory).client('iam')
+    paginator = client.get_paginator('get_account_authorization_details')
+    paginator.PAGE_ITERATOR_CLS = RetryPageIterator
+    details = {k: [] for k in DETAIL_KEYS}
+    for page in paginator.paginate():
+        for k in DETAIL_KEYS:
+            details[k].extend(page.get(k, ()))
+    log.debug("Fetched authorization details users:%d groups:%d roles:%d policies:%d",
+              *[len(details[k]) for k in DETAIL_KEYS])
+    manager._cache.save(cache_key, details)
+    return details
+
+
+def get_authorization_graph(manager):
+    return AuthorizationGraph(get_authorization_details(manager))
+
+
+def load_document(document):
+    # documents are url encoded json on the wire, botocore decodes them
+    if isinstance(document, six.string_types):
+        return json.loads(unquote(document))
+    return document
+
+
+def compile_patterns(patterns, flags=0):
+    return re.compile('^(?:%s)$' % '|'.join(
+        '.*'.join('.'.join(re.escape(q) for q in p.split('?')) for p in pattern.split('*'))
+        for pattern in patterns), flags)
+
+
+def get_action_service(pattern):
+    """Service prefix of an action pattern, None if it can match any service."""
+    service, sep, _ = pattern.partition(':')
+    if not sep or '*' in service or '?' in service:
+        return None
+    return service.lower()
+
+
+def get_principal_key(arn):
+    """Account, type and name of a principal arn, ignoring its path."""
+    parts = arn.split(':', 5)
+    if len(parts) != 6:
+        return None
+    return parts[4], parts[5].split('/', 1)[0], parts[5].rsplit('/', 1)[-1]
+
+
+class Statement:
+    """A compiled policy statement."""
+
+    def __init__(self, data, source_id, source_type):
+        self.data = data
+        self.source_id = source_id
+        self.source_type = source_type
+        self.effect = data.get('Effect')
+        self.not_action = 'NotAction' in data
+        actions = data.get('NotAction', data.get('Action', ()))
+        if isinstance(actions, six.string_types):
+            actions = [actions]
+        self.actions = actions
+        self.action_matcher = compile_patterns(actions, re.IGNORECASE)
+        resources = data.get('Resource', ())
+        if isinstance(resources, six.string_types):
+            resources = [resources]
+        # statements which only apply to some requests can't be decided
+        # without request context.
+        self.determinate = (
+            'Condition' not in data and 'NotResource' not in data and '*' in resources)
+
+    def get_services(self):
+        services = {get_action_service(a) for a in self.actions}
+        if self.not_action or None in services:
+            return [None]
+        return list(services)
+
+    def match(self, action):
+        matched = self.action_matcher.match(action) is not None
+        return matched != self.not_action
+
+    def get_match(self):
+        return {'SourcePolicyId': self.source_id, 'SourcePolicyType': self.source_type}
+
+
+class PolicySet:
+    """Statements of a set of policies, indexed by action service prefix."""
+
+    def __init__(self):
+        self.index = {}
+
+    def add(self, document, source_id, source_type):
+        statements = load_document(document).get('Statement', ())
+        if isinstance(statements, dict):
+            statements = [statements]
+        for s in statements:
+            s = Statement(s, source_id, source_type)
+            for service in s.get_services():
+                self.index.setdefault(service, []).append(s)
+        return self
+
+    def match(self, action):
+        service = get_action_service(action)
+        return [s for s in self.index.get(service, []) + self.index.get(None, [])
+                if s.match(action)]
+
+    def decide(self, action):
+        """Return the decision and matched statements, None if undetermined."""
+        matched = self.match(action)
+        for effect, decision in (('Deny', 'explicitDeny'), ('Allow', 'allowed')):
+            statements = [s for s in matched if s.effect == effect]
+            decided = [s for s in statements if s.determinate]
+            if decided:
+                return decision, decided
+            elif statements:
+                return None
+        return 'implicitDeny', []
+
+
+class AuthorizationGraph:
+    """Principals and policies of an account's authorization details."""
+
+    def __init__(self, details):
+        self.policies = {p['Arn']: p for p in details.get('Policies', ())}
+        self.groups = {g['GroupName']: g for g in details.get('GroupDetailList', ())}
+        self.principals = {}
+        self.principal_names = {}
+        for key, ptype in (('UserDetailList', 'user'),
+                           ('GroupDetailList', 'group'),
+                           ('RoleDetailList', 'role')):
+            for p in details.get(key, ()):
+                self.principals[p['Arn']] = (ptype, p)
+                self.principal_names.setdefault(get_principal_key(p['Arn']), (ptype, p))
+        self.policy_sets = {}
+
+    def get_principal(self, arn):
+        """Return the principal type and details for an arn."""
+        if arn in self.principals:
+            return self.principals[arn]
+        # arns referenced by other resources may omit the principal's path
+        return self.principal_names.get(get_principal_key(arn), (None, None))
+
+    def get_policy_version(self, policy_arn):
+        """Return the default version of a managed policy."""
+        policy = self.policies.get(policy_arn)
+        if policy is None:
+            return None
+        for v in policy.get('PolicyVersionList', ()):
+            if v.get('IsDefaultVersion') or v.get('VersionId') == policy.get(
+                    'DefaultVersionId'):
+                return dict(v, Document=load_document(v['Document']))
+
+    def get_managed_policies(self, arn):
+        """Return the names of managed policies attached to a principal."""
+        ptype, principal = self.get_principal(arn)
+        if principal is None:
+            return None
+        return [p['PolicyName'] for p in principal.get('AttachedManagedPolicies', ())]
+
+    def get_boundary_arn(self, arn):
+        ptype, principal = self.get_principal(arn)
+        if principal is None:
+            return None
+        return principal.get('PermissionsBoundary', {}).get('PermissionsBoundaryArn')
+
+    def get_identity_policies(self, arn):
+        """Return a principal's policy set, including its groups' policies."""
+        ptype, principal = self.get_principal(arn)
+        if principal is None:
+            return None
+        if principal['Arn'] in self.policy_sets:
+            return self.policy_sets[principal['Arn']]
+        entities = [(ptype, principal)]
+        if ptype == 'user':
+            for g in principal.get('GroupList', ()):
+                if g not in self.groups:
+                    return None
+                entities.append(('group', self.groups[g]))
+        policy_set = PolicySet()
+        for etype, entity in entities:
+            for p in entity.get('%sPolicyList' % etype.title(), ()):
+                policy_set.add(p['PolicyDocument'], p['PolicyName'], etype)
+            for p in entity.get('AttachedManagedPolicies', ()):
+                version = self.get_policy_version(p['PolicyArn'])
+                if version is None:
+                    return None
+                policy_set.add(version['Document'], p['PolicyName'], 'IAM Policy')
+        self.policy_sets[principal['Arn']] = policy_set
+        return policy_set
+
+    def get_boundary_policies(self, arn):
+        boundary_arn = self.get_boundary_arn(arn)
+        if boundary_arn is None:
+            return None
+        version = self.get_policy_version(boundary_arn)
+        if version is None:
+            return False
+        return PolicySet().add(
+            version['Document'], boundary_arn.rsplit('/', 1)[-1],
+            'Permissions Boundary Policy')
+
+    def evaluate(self, arn, actions, boundaries=True):
+        """Evaluate actions for a principal as the policy simulator would.
+
+        Returns None if the principal isn't in the snapshot, or any of
+        the actions can't be evaluated without request context.
+        """
+        policy_set = self.get_identity_policies(arn)
+        if policy_set is None:
+            return None
+        boundary = None
+        if boundaries:
+            boundary = self.get_boundary_policies(arn)
+            if boundary is False:
+                return None
+        return evaluate_actions(policy_set, actions, boundary)
+
+    def evaluate_policy(self, document, actions):
+        """Evaluate actions against a single policy document."""
+        return evaluate_actions(
+            PolicySet().add(document, 'PolicyInputList.1', 'IAM Policy'), actions)
+
+
+def evaluate_actions(policy_set, actions, boundary=None):
+    evaluations = []
+    for action in actions:
+        decided = policy_set.decide(action)
+        if decided is None:
+            return None
+        decision, matched = decided
+        evaluation = {
+            'EvalActionName': action,
+            'EvalResourceName': '*',
+            'MissingContextValues': []}
+        if boundary is not None:
+            decided = boundary.decide(action)
+            if decided is None:
+                return None
+            boundary_decision, boundary_matched = decided
+            evaluation['PermissionsBoundaryDecisionDetail'] = {
+                'AllowedByPermissionsBoundary': boundary_decision == 'allowed'}
+            if boundary_decision == 'explicitDeny':
+                decision, matched = boundary_decision, matched + boundary_matched
+            elif decision == 'allowed' and boundary_decision != 'allowed':
+                decision = 'implicitDeny'
+            else:
+                matched = matched + boundary_matched
+        evaluation['EvalDecision'] = decision
+        evaluation['MatchedStatements'] = [s.get_match() for s in matched]
+        evaluations.append(evaluation)
+    return evaluations
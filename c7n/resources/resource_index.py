@@ -0,0 +1,1076 @@
+# Generated by tools/dev/resourceindex.py, regenerate when adding resources
+# or filters/actions to resources.
+
+ResourceIndex = {
+    "aws.account": {
+        "service": "account",
+        "filters": ["check-cloudtrail", "check-config", "credential", "default-ebs-encryption",
+                    "event", "finding", "glue-security-config", "guard-duty", "has-virtual-mfa",
+                    "iam-summary", "missing", "ops-item", "password-policy", "s3-public-block",
+                    "service-limit", "shield-enabled", "value", "xray-encrypt-key"],
+        "actions": ["enable-cloudtrail", "enable-data-events", "invoke-lambda", "invoke-sfn",
+                    "notify", "post-finding", "post-item", "put-metric", "request-limit-increase",
+                    "set-ebs-encryption", "set-glue-catalog-encryption", "set-s3-public-block",
+                    "set-shield-advanced", "set-xray-encrypt", "webhook"]},
+    "aws.acm-certificate": {
+        "service": "acm",
+        "filters": ["config-compliance", "event", "finding", "health-event", "json-diff",
+                    "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.alarm": {
+        "service": "cloudwatch",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.ami": {
+        "service": "ec2",
+        "filters": ["cross-account", "event", "finding", "image-age", "marked-for-op", "ops-item",
+                    "tag-count", "unused", "value"],
+        "actions": ["auto-tag-user", "copy", "copy-related-tag", "deregister", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "normalize-tag", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-launch-permissions", "remove-tag",
+                    "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.app-elb": {
+        "service": "elbv2",
+        "filters": ["config-compliance", "default-vpc", "event", "finding", "health-event",
+                    "healthcheck-protocol-mismatch", "is-logging", "is-not-logging", "json-diff",
+                    "listener", "marked-for-op", "metrics", "network-location", "ops-item",
+                    "security-group", "shield-enabled", "subnet", "tag-count", "target-group",
+                    "value", "vpc", "waf-enabled"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-listener", "modify-security-groups", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "set-s3-logging",
+                    "set-shield", "set-waf", "tag", "webhook"]},
+    "aws.app-elb-target-group": {
+        "service": "elbv2",
+        "filters": ["default-vpc", "event", "finding", "marked-for-op", "ops-item", "tag-count",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.asg": {
+        "service": "autoscaling",
+        "filters": ["capacity-delta", "config-compliance", "event", "finding", "image",
+                    "image-age", "invalid", "json-diff", "launch-config", "marked-for-op",
+                    "metrics", "network-location", "not-encrypted", "offhour", "onhour",
+                    "ops-item", "progagated-tags", "security-group", "subnet", "tag-count",
+                    "user-data", "valid", "value", "vpc-id"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "propagate-tags",
+                    "put-metric", "remove-tag", "rename-tag", "resize", "resume", "suspend",
+                    "tag", "tag-trim", "webhook"]},
+    "aws.backup-plan": {
+        "service": "backup",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.backup-vault": {
+        "service": "backup",
+        "filters": ["event", "finding", "kms-key", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.batch-compute": {
+        "service": "batch",
+        "filters": ["event", "finding", "ops-item", "security-group", "subnet", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "update-environment", "webhook"]},
+    "aws.batch-definition": {
+        "service": "batch",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["deregister", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.cache-cluster": {
+        "service": "elasticache",
+        "filters": ["event", "finding", "health-event", "marked-for-op", "metrics",
+                    "network-location", "ops-item", "security-group", "subnet", "tag-count",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-security-groups", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "snapshot", "tag", "webhook"]},
+    "aws.cache-snapshot": {
+        "service": "elasticache",
+        "filters": ["age", "event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-cluster-tags", "copy-related-tag", "delete",
+                    "invoke-lambda", "invoke-sfn", "mark-for-op", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.cache-subnet-group": {
+        "service": "elasticache",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.cfn": {
+        "service": "cloudformation",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "notify", "post-finding", "post-item", "put-metric", "remove-tag",
+                    "set-protection", "tag", "webhook"]},
+    "aws.cloud-directory": {
+        "service": "clouddirectory",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.cloudhsm-cluster": {
+        "service": "cloudhsmv2",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.cloudsearch": {
+        "service": "cloudsearch",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.cloudtrail": {
+        "service": "cloudtrail",
+        "filters": ["config-compliance", "event", "finding", "is-shadow", "json-diff",
+                    "marked-for-op", "ops-item", "status", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "set-logging", "tag", "update-trail", "webhook"]},
+    "aws.codebuild": {
+        "service": "codebuild",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "metrics", "ops-item", "security-group", "subnet", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.codecommit": {
+        "service": "codecommit",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.codepipeline": {
+        "service": "codepipeline",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.config-recorder": {
+        "service": "config",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.config-rule": {
+        "service": "config",
+        "filters": ["event", "finding", "ops-item", "status", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.customer-gateway": {
+        "service": "ec2",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.datapipeline": {
+        "service": "datapipeline",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.dax": {
+        "service": "dax",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "security-group", "subnet", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-security-groups", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "tag", "update-cluster", "webhook"]},
+    "aws.directconnect": {
+        "service": "directconnect",
+        "filters": ["event", "finding", "health-event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.directory": {
+        "service": "ds",
+        "filters": ["event", "finding", "health-event", "ops-item", "security-group", "subnet",
+                    "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.distribution": {
+        "service": "cloudfront",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "metrics", "mismatch-s3-origin", "ops-item", "shield-enabled",
+                    "shield-metrics", "tag-count", "value", "waf-enabled"],
+        "actions": ["auto-tag-user", "copy-related-tag", "disable", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "set-attributes", "set-protocols", "set-shield", "set-waf",
+                    "tag", "webhook"]},
+    "aws.dlm-policy": {
+        "service": "dlm",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.dms-endpoint": {
+        "service": "dms",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-endpoint", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.dms-instance": {
+        "service": "dms",
+        "filters": ["event", "finding", "health-event", "kms-key", "marked-for-op", "ops-item",
+                    "security-group", "subnet", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-instance", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.dynamodb-backup": {
+        "service": "dynamodb",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.dynamodb-stream": {
+        "service": "dynamodbstreams",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.dynamodb-table": {
+        "service": "dynamodb",
+        "filters": ["config-compliance", "event", "finding", "health-event", "json-diff",
+                    "kms-key", "marked-for-op", "metrics", "ops-item", "value"],
+        "actions": ["auto-tag-user", "backup", "copy-related-tag", "delete", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "set-stream", "tag", "webhook"]},
+    "aws.ebs": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "fault-tolerant", "finding", "health-event",
+                    "instance", "json-diff", "kms-alias", "marked-for-op", "metrics",
+                    "modifyable", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-instance-tags", "copy-related-tag", "delete", "detach",
+                    "encrypt-instance-volumes", "invoke-lambda", "invoke-sfn", "mark-for-op",
+                    "modify", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "snapshot", "tag", "tag-trim",
+                    "webhook"]},
+    "aws.ebs-snapshot": {
+        "service": "ec2",
+        "filters": ["age", "cross-account", "event", "finding", "marked-for-op", "ops-item",
+                    "skip-ami-snapshots", "tag-count", "unused", "value"],
+        "actions": ["auto-tag-user", "copy", "copy-related-tag", "delete", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "normalize-tag", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim",
+                    "webhook"]},
+    "aws.ec2": {
+        "service": "ec2",
+        "filters": ["check-permissions", "config-compliance", "default-vpc", "ebs", "ephemeral",
+                    "event", "finding", "health-event", "image", "image-age", "instance-age",
+                    "instance-attribute", "instance-uptime", "json-diff", "marked-for-op",
+                    "metrics", "network-location", "offhour", "onhour", "ops-item",
+                    "security-group", "singleton", "ssm", "ssm-compliance", "state-age", "subnet",
+                    "tag-count", "termination-protected", "user-data", "value", "vpc"],
+        "actions": ["auto-tag-user", "autorecover-alarm", "copy-related-tag", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "modify-security-groups", "normalize-tag",
+                    "notify", "post-finding", "post-item", "propagate-spot-tags", "put-metric",
+                    "reboot", "remove-tag", "rename-tag", "resize", "send-command",
+                    "set-instance-profile", "set-monitoring", "snapshot", "start", "stop", "tag",
+                    "tag-trim", "terminate", "webhook"]},
+    "aws.ec2-reserved": {
+        "service": "ec2",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.ecr": {
+        "service": "ecr",
+        "filters": ["cross-account", "event", "finding", "lifecycle-rule", "marked-for-op",
+                    "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-statements", "remove-tag", "set-immutability", "set-lifecycle",
+                    "set-scanning", "tag", "webhook"]},
+    "aws.ecs": {
+        "service": "ecs",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.ecs-container-instance": {
+        "service": "ecs",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "taggable", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "set-state", "tag", "update-agent", "webhook"]},
+    "aws.ecs-service": {
+        "service": "ecs",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "taggable",
+                    "task-definition", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.ecs-task": {
+        "service": "ecs",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "taggable",
+                    "task-definition", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "stop", "tag", "webhook"]},
+    "aws.ecs-task-definition": {
+        "service": "ecs",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.efs": {
+        "service": "efs",
+        "filters": ["event", "finding", "health-event", "kms-key", "lifecycle-policy",
+                    "marked-for-op", "metrics", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "configure-lifecycle-policy", "copy-related-tag", "delete",
+                    "invoke-lambda", "invoke-sfn", "mark-for-op", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.efs-mount-target": {
+        "service": "efs",
+        "filters": ["event", "ops-item", "security-group", "subnet", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.eks": {
+        "service": "eks",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "security-group", "subnet",
+                    "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "update-config", "webhook"]},
+    "aws.elastic-ip": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "shield-enabled", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "release", "remove-tag", "rename-tag", "set-shield", "tag",
+                    "tag-trim", "webhook"]},
+    "aws.elasticache-group": {
+        "service": "elasticache",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.elasticbeanstalk": {
+        "service": "elasticbeanstalk",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.elasticbeanstalk-environment": {
+        "service": "elasticbeanstalk",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "terminate", "webhook"]},
+    "aws.elasticsearch": {
+        "service": "es",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "security-group",
+                    "subnet", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-security-groups", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.elb": {
+        "service": "elb",
+        "filters": ["config-compliance", "default-vpc", "event", "finding", "health-event",
+                    "healthcheck-protocol-mismatch", "instance", "is-logging", "is-not-logging",
+                    "is-ssl", "json-diff", "marked-for-op", "metrics", "network-location",
+                    "ops-item", "security-group", "shield-enabled", "shield-metrics",
+                    "ssl-policy", "subnet", "tag-count", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "disable-s3-logging",
+                    "enable-s3-logging", "invoke-lambda", "invoke-sfn", "mark-for-op",
+                    "modify-security-groups", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "set-shield", "set-ssl-listener-policy", "tag", "webhook"]},
+    "aws.emr": {
+        "service": "emr",
+        "filters": ["event", "finding", "health-event", "marked-for-op", "metrics", "ops-item",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "terminate", "webhook"]},
+    "aws.eni": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "flow-logs", "json-diff",
+                    "marked-for-op", "network-location", "ops-item", "security-group", "subnet",
+                    "tag-count", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-security-groups", "normalize-tag", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "rename-tag",
+                    "set-flow-log", "tag", "tag-trim", "webhook"]},
+    "aws.event-rule": {
+        "service": "events",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.event-rule-target": {
+        "service": "events",
+        "filters": ["cross-account", "event", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.firehose": {
+        "service": "firehose",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "encrypt-s3-destination",
+                    "invoke-lambda", "invoke-sfn", "mark-for-op", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.fsx": {
+        "service": "fsx",
+        "filters": ["event", "finding", "kms-key", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "backup", "copy-related-tag", "delete", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "tag", "update", "webhook"]},
+    "aws.fsx-backup": {
+        "service": "fsx",
+        "filters": ["event", "finding", "kms-key", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.gamelift-build": {
+        "service": "gamelift",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.gamelift-fleet": {
+        "service": "gamelift",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.glacier": {
+        "service": "glacier",
+        "filters": ["cross-account", "event", "finding", "marked-for-op", "ops-item", "tag-count",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-statements", "remove-tag", "tag", "webhook"]},
+    "aws.glue-classifier": {
+        "service": "glue",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.glue-connection": {
+        "service": "glue",
+        "filters": ["event", "finding", "ops-item", "security-group", "subnet", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.glue-crawler": {
+        "service": "glue",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.glue-database": {
+        "service": "glue",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.glue-dev-endpoint": {
+        "service": "glue",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.glue-job": {
+        "service": "glue",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.glue-ml-transform": {
+        "service": "glue",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.glue-security-configuration": {
+        "service": "glue",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.glue-table": {
+        "service": "glue",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.glue-trigger": {
+        "service": "glue",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.glue-workflow": {
+        "service": "glue",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.health-event": {
+        "service": "health",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.healthcheck": {
+        "service": "route53",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.hostedzone": {
+        "service": "route53",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "query-logging-enabled",
+                    "shield-enabled", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "set-query-logging", "set-shield", "tag", "webhook"]},
+    "aws.hsm": {
+        "service": "cloudhsm",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.hsm-client": {
+        "service": "cloudhsm",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.hsm-hapg": {
+        "service": "cloudhsm",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.iam-certificate": {
+        "service": "iam",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.iam-group": {
+        "service": "iam",
+        "filters": ["check-permissions", "config-compliance", "event", "finding",
+                    "has-inline-policy", "has-users", "json-diff", "ops-item", "usage", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.iam-policy": {
+        "service": "iam",
+        "filters": ["check-permissions", "config-compliance", "event", "finding", "has-allow-all",
+                    "json-diff", "ops-item", "unused", "usage", "used", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.iam-profile": {
+        "service": "iam",
+        "filters": ["event", "finding", "ops-item", "unused", "used", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.iam-role": {
+        "service": "iam",
+        "filters": ["check-permissions", "config-compliance", "cross-account", "event", "finding",
+                    "has-inline-policy", "has-specific-managed-policy", "json-diff",
+                    "no-specific-managed-policy", "ops-item", "unused", "usage", "used", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "notify", "post-finding", "post-item", "put-metric", "remove-tag",
+                    "set-policy", "tag", "webhook"]},
+    "aws.iam-user": {
+        "service": "iam",
+        "filters": ["access-key", "check-permissions", "config-compliance", "credential", "event",
+                    "finding", "group", "has-inline-policy", "json-diff", "marked-for-op",
+                    "mfa-device", "ops-item", "policy", "usage", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-keys", "remove-tag", "set-groups", "tag", "webhook"]},
+    "aws.identity-pool": {
+        "service": "cognito-identity",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.internet-gateway": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.iot": {
+        "service": "iot",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.kafka": {
+        "service": "kafka",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "security-group", "subnet",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "set-monitoring", "tag", "webhook"]},
+    "aws.key-pair": {
+        "service": "ec2",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.kinesis": {
+        "service": "kinesis",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "tag-count",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "encrypt", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.kinesis-analytics": {
+        "service": "kinesisanalytics",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.kms": {
+        "service": "kms",
+        "filters": ["cross-account", "event", "finding", "grant-count", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-statements", "webhook"]},
+    "aws.kms-key": {
+        "service": "kms",
+        "filters": ["cross-account", "event", "finding", "key-rotation-status", "marked-for-op",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-statements", "remove-tag", "set-rotation", "tag", "webhook"]},
+    "aws.lambda": {
+        "service": "lambda",
+        "filters": ["check-permissions", "config-compliance", "cross-account", "event",
+                    "event-source", "finding", "json-diff", "marked-for-op", "metrics",
+                    "network-location", "ops-item", "reserved-concurrency", "security-group",
+                    "subnet", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-security-groups", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-statements", "remove-tag",
+                    "set-concurrency", "tag", "webhook"]},
+    "aws.lambda-layer": {
+        "service": "lambda",
+        "filters": ["cross-account", "event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "remove-statements", "webhook"]},
+    "aws.launch-config": {
+        "service": "autoscaling",
+        "filters": ["age", "config-compliance", "event", "finding", "json-diff", "ops-item",
+                    "unused", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.launch-template-version": {
+        "service": "ec2",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.lightsail-db": {
+        "service": "lightsail",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.lightsail-elb": {
+        "service": "lightsail",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.lightsail-instance": {
+        "service": "lightsail",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.log-group": {
+        "service": "logs",
+        "filters": ["cross-account", "event", "finding", "last-write", "marked-for-op", "metrics",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "retention", "set-encryption", "tag", "webhook"]},
+    "aws.message-broker": {
+        "service": "mq",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "ops-item", "security-group",
+                    "subnet", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.ml-model": {
+        "service": "machinelearning",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.nat-gateway": {
+        "service": "ec2",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.network-acl": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "s3-cidr", "subnet", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.network-addr": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "shield-enabled", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "release", "remove-tag", "rename-tag", "set-shield", "tag",
+                    "tag-trim", "webhook"]},
+    "aws.ops-item": {
+        "service": "ssm",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "update", "webhook"]},
+    "aws.opswork-cm": {
+        "service": "opsworkscm",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.opswork-stack": {
+        "service": "opsworks",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "stop", "webhook"]},
+    "aws.peering-connection": {
+        "service": "ec2",
+        "filters": ["cross-account", "event", "finding", "marked-for-op", "missing-route",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.qldb": {
+        "service": "qldb",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.r53domain": {
+        "service": "route53domains",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.rds": {
+        "service": "rds",
+        "filters": ["config-compliance", "db-parameter", "default-vpc", "event", "finding",
+                    "health-event", "json-diff", "kms-alias", "marked-for-op", "metrics",
+                    "network-location", "offhour", "onhour", "ops-item", "security-group",
+                    "subnet", "tag-count", "upgrade-available", "value", "vpc"],
+        "actions": ["auto-patch", "auto-tag-user", "copy-related-tag", "delete", "invoke-lambda",
+                    "invoke-sfn", "mark-for-op", "modify-db", "modify-security-groups", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "resize",
+                    "retention", "set-public-access", "set-snapshot-copy-tags", "snapshot",
+                    "start", "stop", "tag", "tag-trim", "upgrade", "webhook"]},
+    "aws.rds-cluster": {
+        "service": "rds",
+        "filters": ["event", "finding", "marked-for-op", "metrics", "network-location", "offhour",
+                    "onhour", "ops-item", "security-group", "subnet", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-db-cluster", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "retention", "snapshot", "start", "stop", "tag",
+                    "webhook"]},
+    "aws.rds-cluster-param-group": {
+        "service": "rds",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["copy", "delete", "invoke-lambda", "invoke-sfn", "modify", "notify",
+                    "post-finding", "post-item", "put-metric", "webhook"]},
+    "aws.rds-cluster-snapshot": {
+        "service": "rds",
+        "filters": ["age", "event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.rds-param-group": {
+        "service": "rds",
+        "filters": ["event", "finding", "metrics", "ops-item", "value"],
+        "actions": ["copy", "delete", "invoke-lambda", "invoke-sfn", "modify", "notify",
+                    "post-finding", "post-item", "put-metric", "webhook"]},
+    "aws.rds-reserved": {
+        "service": "rds",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.rds-snapshot": {
+        "service": "rds",
+        "filters": ["age", "config-compliance", "cross-account", "event", "finding", "json-diff",
+                    "latest", "marked-for-op", "onhour", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "region-copy", "remove-tag", "restore", "tag", "webhook"]},
+    "aws.rds-subnet-group": {
+        "service": "rds",
+        "filters": ["event", "finding", "ops-item", "unused", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.rds-subscription": {
+        "service": "rds",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.redshift": {
+        "service": "redshift",
+        "filters": ["config-compliance", "default-vpc", "event", "finding", "json-diff",
+                    "kms-key", "logging", "marked-for-op", "metrics", "network-location",
+                    "offhour", "onhour", "ops-item", "param", "security-group", "subnet", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "enable-vpc-routing",
+                    "invoke-lambda", "invoke-sfn", "mark-for-op", "modify-security-groups",
+                    "notify", "pause", "post-finding", "post-item", "put-metric", "remove-tag",
+                    "resume", "retention", "set-logging", "set-public-access", "snapshot", "tag",
+                    "tag-trim", "webhook"]},
+    "aws.redshift-snapshot": {
+        "service": "redshift",
+        "filters": ["age", "config-compliance", "cross-account", "event", "finding", "json-diff",
+                    "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "revoke-access", "tag", "webhook"]},
+    "aws.redshift-subnet-group": {
+        "service": "redshift",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.rest-account": {
+        "service": "apigateway",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "update", "webhook"]},
+    "aws.rest-api": {
+        "service": "apigateway",
+        "filters": ["config-compliance", "cross-account", "event", "finding", "json-diff",
+                    "marked-for-op", "metrics", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "update", "webhook"]},
+    "aws.rest-resource": {
+        "service": "apigateway",
+        "filters": ["event", "ops-item", "rest-integration", "rest-method", "value"],
+        "actions": ["delete-integration", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "update-integration", "update-method", "webhook"]},
+    "aws.rest-stage": {
+        "service": "apigateway",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "update", "webhook"]},
+    "aws.rest-vpclink": {
+        "service": "apigateway",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.route-table": {
+        "service": "ec2",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "route", "subnet",
+                    "tag-count", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.rrset": {
+        "service": "route53",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.s3": {
+        "service": "s3",
+        "filters": ["bucket-encryption", "bucket-logging", "bucket-notification",
+                    "check-public-block", "config-compliance", "cross-account", "data-events",
+                    "event", "finding", "global-grants", "has-statement", "inventory",
+                    "is-log-target", "json-diff", "marked-for-op", "metrics",
+                    "missing-policy-statement", "no-encryption-statement", "ops-item", "value"],
+        "actions": ["attach-encrypt", "auto-tag-user", "configure-lifecycle", "copy-related-tag",
+                    "delete", "delete-bucket-notification", "delete-global-grants",
+                    "encrypt-keys", "encryption-policy", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "no-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-statements", "remove-tag", "remove-website-hosting",
+                    "set-bucket-encryption", "set-inventory", "set-public-block",
+                    "set-replication", "set-statements", "tag", "toggle-logging",
+                    "toggle-versioning", "webhook"]},
+    "aws.sagemaker-endpoint": {
+        "service": "sagemaker",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.sagemaker-endpoint-config": {
+        "service": "sagemaker",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.sagemaker-job": {
+        "service": "sagemaker",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "stop", "tag",
+                    "webhook"]},
+    "aws.sagemaker-model": {
+        "service": "sagemaker",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.sagemaker-notebook": {
+        "service": "sagemaker",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "security-group", "subnet",
+                    "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "start", "stop", "tag", "webhook"]},
+    "aws.sagemaker-transform-job": {
+        "service": "sagemaker",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "stop", "tag",
+                    "webhook"]},
+    "aws.secrets-manager": {
+        "service": "secretsmanager",
+        "filters": ["cross-account", "event", "finding", "marked-for-op", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.security-group": {
+        "service": "ec2",
+        "filters": ["config-compliance", "default-vpc", "diff", "egress", "event", "finding",
+                    "ingress", "json-diff", "marked-for-op", "ops-item", "stale", "tag-count",
+                    "unused", "used", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "patch", "post-finding",
+                    "post-item", "put-metric", "remove-permissions", "remove-tag", "rename-tag",
+                    "tag", "tag-trim", "webhook"]},
+    "aws.shield-attack": {
+        "service": "shield",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.shield-protection": {
+        "service": "shield",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.simpledb": {
+        "service": "sdb",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.snowball": {
+        "service": "snowball",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.snowball-cluster": {
+        "service": "snowball",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.sns": {
+        "service": "sns",
+        "filters": ["cross-account", "event", "finding", "kms-key", "marked-for-op", "metrics",
+                    "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "modify-policy", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-statements", "remove-tag", "set-encryption", "tag",
+                    "webhook"]},
+    "aws.sqs": {
+        "service": "sqs",
+        "filters": ["cross-account", "event", "finding", "kms-key", "marked-for-op", "metrics",
+                    "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "delete", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-statements", "remove-tag", "set-encryption", "set-retention-period",
+                    "tag", "webhook"]},
+    "aws.ssm-activation": {
+        "service": "ssm",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.ssm-managed-instance": {
+        "service": "ssm",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "send-command", "webhook"]},
+    "aws.ssm-parameter": {
+        "service": "ssm",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.step-machine": {
+        "service": "stepfunctions",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn", "notify",
+                    "post-finding", "post-item", "put-metric", "remove-tag", "tag", "webhook"]},
+    "aws.storage-gateway": {
+        "service": "storagegateway",
+        "filters": ["event", "finding", "health-event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.streaming-distribution": {
+        "service": "cloudfront",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "metrics", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "disable", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]},
+    "aws.subnet": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "flow-logs", "json-diff",
+                    "marked-for-op", "ops-item", "tag-count", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "set-flow-log", "tag", "tag-trim",
+                    "webhook"]},
+    "aws.support-case": {
+        "service": "support",
+        "filters": ["event", "ops-item", "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.transit-attachment": {
+        "service": "ec2",
+        "filters": ["event", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.transit-gateway": {
+        "service": "ec2",
+        "filters": ["event", "finding", "marked-for-op", "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.user-pool": {
+        "service": "cognito-idp",
+        "filters": ["event", "finding", "ops-item", "value"],
+        "actions": ["delete", "invoke-lambda", "invoke-sfn", "notify", "post-finding",
+                    "post-item", "put-metric", "webhook"]},
+    "aws.vpc": {
+        "service": "ec2",
+        "filters": ["config-compliance", "dhcp-options", "event", "finding", "flow-logs",
+                    "internet-gateway", "json-diff", "marked-for-op", "nat-gateway", "ops-item",
+                    "security-group", "subnet", "tag-count", "value", "vpc-attributes"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "set-flow-log", "tag", "tag-trim",
+                    "webhook"]},
+    "aws.vpc-endpoint": {
+        "service": "ec2",
+        "filters": ["cross-account", "event", "finding", "marked-for-op", "ops-item",
+                    "security-group", "subnet", "tag-count", "value", "vpc"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.vpn-connection": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.vpn-gateway": {
+        "service": "ec2",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "marked-for-op",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "normalize-tag", "notify", "post-finding", "post-item",
+                    "put-metric", "remove-tag", "rename-tag", "tag", "tag-trim", "webhook"]},
+    "aws.waf": {
+        "service": "waf",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "metrics", "ops-item",
+                    "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.waf-regional": {
+        "service": "waf-regional",
+        "filters": ["config-compliance", "event", "finding", "json-diff", "metrics", "ops-item",
+                    "value"],
+        "actions": ["invoke-lambda", "invoke-sfn", "notify", "post-finding", "post-item",
+                    "put-metric", "webhook"]},
+    "aws.workspaces": {
+        "service": "workspaces",
+        "filters": ["connection-status", "event", "finding", "marked-for-op", "metrics",
+                    "ops-item", "tag-count", "value"],
+        "actions": ["auto-tag-user", "copy-related-tag", "invoke-lambda", "invoke-sfn",
+                    "mark-for-op", "notify", "post-finding", "post-item", "put-metric",
+                    "remove-tag", "tag", "webhook"]}
+}
@@ -40,10 +40,11 @@ Actions:
 import copy
 import functools
 import json
-import itertools
 import logging
 import math
 import os
+import re
+import threading
 import time
 import ssl
 
@@ -65,6 +66,7 @@ except ImportError:
 from c7n.actions import (
     ActionRegistry, BaseAction, PutMetric, RemovePolicyBase)
 from c7n.exceptions import PolicyValidationError
+from c7n.executor import ThreadPoolExecutor
 from c7n.filters import (
     FilterRegistry, Filter, CrossAccountAccessFilter, MetricsFilter,
     ValueFilter)
@@ -115,6 +117,73 @@ class S3(query.QueryResourceManager):
         else:
             return super(S3, self).get_source(source_type)
 
+    def validate(self):
+        keys = self.get_augment_keys()
+        if keys is None:
+            return
+        delta = keys.difference([m[1] for m in S3_AUGMENT_TABLE])
+        if delta:
+            raise PolicyValidationError(
+                "Unknown s3 augment keys %s on %s" % (", ".join(sorted(delta)), self.data))
+
+    def get_augment_keys(self):
+        """Return the bucket augment keys declared by the policy, None for all.
+
+        Policies which only need some bucket attributes can skip fetching
+        the others, the bucket location and the keys read by the policy's
+        filters and actions are always fetched.
+
+        :example:
+
+        .. code-block:: yaml
+
+            policies:
+              - name: s3-untagged
+                resource: s3
+                query:
+                  - augment-keys: [Tags]
+                filters:
+                  - "tag:Owner": absent
+        """
+        keys = None
+        for q in self.data.get('query', ()):
+            if 'augment-keys' in q:
+                keys = (keys or set()).union(q['augment-keys'])
+        if keys is not None:
+            keys = keys.union(self.get_required_augment_keys())
+        return keys
+
+    def get_required_augment_keys(self):
+        """Return the bucket augment keys read by the policy's filters and actions.
+
+        Filters and actions declare the keys they read as `augment_keys`,
+        value filters read the key they reference.
+        """
+        table_keys = {m[1] for m in S3_AUGMENT_TABLE}
+        keys = set()
+        for f in list(self.iter_filters()) + list(getattr(self, 'actions', ())):
+            keys.update(getattr(f, 'augment_keys', ()))
+            if isinstance(f, TagActionFilter):
+                keys.add('Tags')
+            if type(f) is not ValueFilter:
+                continue
+            # shorthand value filters are keyed by their referenced key
+            k = f.data.get('key') if 'type' in f.data else list(f.data)[0]
+            if not isinstance(k, six.string_types):
+                continue
+            elif k.startswith('tag:'):
+                keys.add('Tags')
+            else:
+                keys.update(table_keys.intersection([re.split(r'[.\[]', k, 1)[0]]))
+        return keys
+
+    def get_cache_key(self, query):
+        key = super(S3, self).get_cache_key(query)
+        keys = self.get_augment_keys()
+        if keys is not None:
+            key['augment-keys'] = sorted(keys)
+        return key
+
     @classmethod
     def get_permissions(cls):
         perms = ["s3:ListAllMyBuckets"]
@@ -125,13 +194,12 @@ class S3(query.QueryResourceManager):
 class DescribeS3(query.DescribeSource):
 
     def augment(self, buckets):
-        with self.manager.executor_factory(
-                max_workers=min((10, len(buckets) + 1))) as w:
-            results = w.map(
-                assemble_bucket,
-                zip(itertools.repeat(self.manager.session_factory), buckets))
-            results = list(filter(None, results))
-            return results
+        augmenter = BucketAugmenter(
+            self.manager.session_factory,
+            self.manager.executor_factory,
+            get_augment_table(self.manager.get_augment_keys()),
+            BucketRegions(self.manager))
+        return augmenter.augment(buckets)
 
     def get_resources(self, bucket_names):
         return [{'Name': b} for b in bucket_names]
@@ -422,42 +490,168 @@ S3_AUGMENT_TABLE = (
 )
 
 
-def assemble_bucket(item):
-    """Assemble a document representing all the config state around a bucket.
+# concurrent augment calls, and connections of each pooled regional client
+AUGMENT_WORKERS = 32
+# buckets augmented per batch of calls
+AUGMENT_BATCH_SIZE = 500
 
-    TODO: Refactor this, the logic here feels quite muddled.
+
+def get_augment_table(keys=None):
+    """Return the augment table entries for keys, None for all.
+
+    The bucket location is always fetched, as calls and actions are
+    directed to the bucket's region.
     """
-    factory, b = item
-    s = factory()
-    c = s.client('s3')
-    # Bucket Location, Current Client Location, Default Location
-    b_location = c_location = location = "us-east-1"
-    methods = list(S3_AUGMENT_TABLE)
-    for minfo in methods:
+    if keys is None:
+        return list(S3_AUGMENT_TABLE)
+    return [m for m in S3_AUGMENT_TABLE if m[1] in keys or m[1] == 'Location']
+
+
+def get_location(region):
+    """Return the bucket location for a region, as get_bucket_location does."""
+    return {'LocationConstraint': region != 'us-east-1' and region or None}
+
+
+class BucketRegions:
+    """Bucket name to region map, persisted with the resource cache."""
+
+    def __init__(self, manager=None):
+        self.regions = {}
+        self.changed = False
+        self.cache = manager is not None and manager._cache or None
+        if self.cache is None:
+            return
+        self.cache_key = {
+            'account': manager.config.account_id,
+            'region': 'global',
+            'resource': 'BucketRegions'}
+        if self.cache.load():
+            self.regions = dict(self.cache.get(self.cache_key) or {})
+
+    def get(self, name):
+        return self.regions.get(name)
+
+    def set(self, name, region):
+        if self.regions.get(name) != region:
+            self.regions[name] = region
+            self.changed = True
+
+    def save(self):
+        if self.changed and self.cache is not None:
+            self.cache.save(self.cache_key, dict(self.regions))
+            self.changed = False
+
+
+class BucketAugmenter:
+    """Fetch the augment table attributes of buckets.
+
+    A bucket's location is resolved first, from the bucket region map
+    if known, and its other table calls are then issued concurrently,
+    with clients pooled per region.
+    """
+
+    def __init__(self, session_factory, executor_factory=ThreadPoolExecutor,
+                 table=None, regions=None):
+        self.session_factory = session_factory
+        self.executor_factory = executor_factory
+        self.table = list(S3_AUGMENT_TABLE) if table is None else table
+        self.regions = BucketRegions() if regions is None else regions
+        self.session = None
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def get_client(self, region=None):
+        # clients are thread safe, sessions aren't.
+        with self.lock:
+            if region not in self.clients:
+                if self.session is None:
+                    self.session = self.session_factory()
+                self.clients[region] = self.session.client(
+                    's3', region_name=region,
+                    config=Config(max_pool_connections=AUGMENT_WORKERS))
+            return self.clients[region]
+
+    def augment(self, buckets):
+        methods = [m for m in self.table if m[1] != 'Location']
+        with self.executor_factory(max_workers=AUGMENT_WORKERS) as w:
+            for batch in chunks(buckets, AUGMENT_BATCH_SIZE):
+                list(w.map(self.resolve_location, batch))
+                results = [(b, minfo, w.submit(self.invoke, b, minfo))
+                           for b in batch for minfo in methods]
+                for b, minfo, f in results:
+                    self.apply(b, minfo, f.result())
+        self.regions.save()
+        return list(filter(None, buckets))
+
+    def augment_bucket(self, b):
+        self.resolve_location(b)
+        for minfo in self.table:
+            if minfo[1] != 'Location':
+                self.apply(b, minfo, self.invoke(b, minfo))
+        return b
+
+    def resolve_location(self, b):
+        for minfo in self.table:
+            if minfo[1] == 'Location':
+                break
+        else:
+            return
+        region = self.regions.get(b['Name'])
+        if region is not None:
+            b['Location'] = get_location(region)
+            return
+        result = self.invoke(b, minfo)
+        status, v = result
+        # Location == region for all cases but EU
+        # https://docs.aws.amazon.com/AmazonS3/latest/API/RESTBucketGETlocation.html
+        if status == 'set' and v:
+            region = v.get('LocationConstraint') or 'us-east-1'
+            if region == 'EU':
+                region = v['LocationConstraint'] = 'eu-west-1'
+            self.regions.set(b['Name'], region)
+        self.apply(b, minfo, result)
+
+    def apply(self, b, minfo, result):
+        status, v = result
+        if status == 'set':
+            b[minfo[1]] = v
+        elif status == 'denied':
+            b.setdefault('c7n:DeniedMethods', []).append(minfo[0])
+
+    def invoke(self, b, minfo):
+        """Invoke a table method for a bucket.
+
+        Returns a status, set, skip or denied, and the value.
+        """
         m, k, default, select = minfo[:4]
-        try:
-            method = getattr(c, m)
-            v = method(Bucket=b['Name'])
-            v.pop('ResponseMetadata')
-            if select is not None and select in v:
-                v = v[select]
-        except (ssl.SSLError, SSLError) as e:
-            # Proxy issues? i assume
-            log.warning("Bucket ssl error %s: %s %s",
-                        b['Name'], b.get('Location', 'unknown'),
-                        e)
-            continue
-        except ClientError as e:
-            code = e.response['Error']['Code']
-            if code.startswith("NoSuch") or "NotFound" in code:
-                v = default
-            elif code == 'PermanentRedirect':
-                s = factory()
-                c = bucket_client(s, b)
-                # Requeue with the correct region given location constraint
-                methods.append((m, k, default, select))
-                continue
-            else:
+        redirected = False
+        while True:
+            try:
+                v = getattr(self.get_client(self.regions.get(b['Name'])), m)(
+                    Bucket=b['Name'])
+                v.pop('ResponseMetadata')
+                if select is not None and select in v:
+                    v = v[select]
+                return 'set', v
+            except (ssl.SSLError, SSLError) as e:
+                # Proxy issues? i assume
+                log.warning("Bucket ssl error %s: %s %s",
+                            b['Name'], b.get('Location', 'unknown'),
+                            e)
+                return 'skip', None
+            except ClientError as e:
+                code = e.response['Error']['Code']
+                if code.startswith("NoSuch") or "NotFound" in code:
+                    return 'set', default
+                elif code == 'PermanentRedirect' and not redirected:
+                    # Retry in the bucket's region, remembering it for its other calls
+                    redirected = True
+                    region = e.response.get('ResponseMetadata', {}).get(
+                        'HTTPHeaders', {}).get('x-amz-bucket-region') or get_region(b)
+                    self.regions.set(b['Name'], region)
+                    if 'Location' in b:
+                        b['Location'] = get_location(region)
+                    continue
                 log.warning(
                     "Bucket:%s unable to invoke method:%s error:%s ",
                     b['Name'], m, e.response['Error']['Message'])
@@ -471,26 +665,15 @@ def assemble_bucket(item):
                 # they won't have write access either.
 
                 # For other error types we raise and bail policy execution.
-                if e.response['Error']['Code'] == 'AccessDenied':
-                    b.setdefault('c7n:DeniedMethods', []).append(m)
-                    continue
+                if code == 'AccessDenied':
+                    return 'denied', m
                 raise
-        # As soon as we learn location (which generally works)
-        if k == 'Location' and v is not None:
-            b_location = v.get('LocationConstraint')
-            # Location == region for all cases but EU
-            # https://docs.aws.amazon.com/AmazonS3/latest/API/RESTBucketGETlocation.html
-            if b_location is None:
-                b_location = "us-east-1"
-            elif b_location == 'EU':
-                b_location = "eu-west-1"
-                v['LocationConstraint'] = 'eu-west-1'
-            if v and v != c_location:
-                c = s.client('s3', region_name=b_location)
-            elif c_location != location:
-                c = s.client('s3', region_name=location)
-        b[k] = v
-    return b
+
+
+def assemble_bucket(item):
+    """Assemble a document representing all the config state around a bucket."""
+    factory, b = item
+    return BucketAugmenter(factory).augment_bucket(b)
 
 
 def bucket_client(session, b, kms=False):
@@ -596,6 +779,7 @@ class S3CrossAccountFilter(CrossAccountAccessFilter):
                 filters:
                   - type: cross-account
     """
+    augment_keys = ('Policy',)
     permissions = ('s3:GetBucketPolicy',)
 
     def get_accounts(self):
@@ -689,6 +873,7 @@ class GlobalGrantsFilter(Filter):
 
     """
 
+    augment_keys = ('Acl', 'Website')
     schema = type_schema(
         'global-grants',
         allow_website={'type': 'boolean'},
@@ -813,6 +998,7 @@ class HasStatementFilter(BucketFilterBase):
                         Action: 's3:*'
                         Principal: '*'
     """
+    augment_keys = ('Policy',)
     schema = type_schema(
         'has-statement',
         statement_ids={'type': 'array', 'items': {'type': 'string'}},
@@ -898,6 +1084,7 @@ class EncryptionEnabledFilter(Filter):
                 filters:
                   - type: no-encryption-statement
     """
+    augment_keys = ('Policy',)
     schema = type_schema(
         'no-encryption-statement')
 
@@ -949,6 +1136,7 @@ class MissingPolicyStatementFilter(Filter):
                       - RequiredEncryptedPutObject
     """
 
+    augment_keys = ('Policy',)
     schema = type_schema(
         'missing-policy-statement',
         aliases=('missing-statement',),
@@ -993,6 +1181,7 @@ class BucketNotificationFilter(ValueFilter):
                     statement_ids: matched
     """
 
+    augment_keys = ('Notification',)
     schema = type_schema(
         'bucket-notification',
         required=['kind'],
@@ -1059,6 +1248,7 @@ class BucketLoggingFilter(Filter):
                     target_prefix: "{account}/{source_bucket_name}/"
     """
 
+    augment_keys = ('Logging',)
     schema = type_schema(
         'bucket-logging',
         op={'enum': ['enabled', 'disabled', 'equal', 'not-equal', 'eq', 'ne']},
@@ -1117,6 +1307,7 @@ class BucketLoggingFilter(Filter):
 class DeleteBucketNotification(BucketActionBase):
     """Action to delete S3 bucket notification configurations"""
 
+    augment_keys = ('Notification',)
     schema = type_schema(
         'delete-bucket-notification',
         required=['statement_ids'],
@@ -1185,6 +1376,7 @@ class SetPolicyStatement(BucketActionBase):
                             "aws:SecureTransport": false
     """
 
+    augment_keys = ('Policy',)
     permissions = ('s3:PutBucketPolicy',)
 
     schema = type_schema(
@@ -1270,6 +1462,7 @@ class RemovePolicyStatement(RemovePolicyBase):
                       - RequiredEncryptedPutObject
     """
 
+    augment_keys = ('Policy',)
     permissions = ("s3:PutBucketPolicy", "s3:DeleteBucketPolicy")
 
     def process(self, buckets):
@@ -1556,6 +1749,7 @@ class ToggleVersioning(BucketActionBase):
                     enabled: true
     """
 
+    augment_keys = ('Versioning',)
     schema = type_schema(
         'toggle-versioning',
         enabled={'type': 'boolean'})
@@ -1625,6 +1819,7 @@ class ToggleLogging(BucketActionBase):
                     target_bucket: "{account_id}-{region}-s3-logs"
                     target_prefix: "{account}/{source_bucket_name}/"
     """
+    augment_keys = ('Logging',)
     schema = type_schema(
         'toggle-logging',
         enabled={'type': 'boolean'},
@@ -1805,6 +2000,7 @@ class EncryptionRequiredPolicy(BucketActionBase):
                   - encryption-policy
     """
 
+    augment_keys = ('Policy',)
     permissions = ("s3:GetBucketPolicy", "s3:PutBucketPolicy")
     schema = type_schema('encryption-policy')
 
@@ -1926,6 +2122,7 @@ class BucketScanLog:
 
 class ScanBucket(BucketActionBase):
 
+    augment_keys = ('Versioning',)
     permissions = ("s3:ListBucket",)
 
     bucket_ops = {
@@ -2347,6 +2544,7 @@ class LogTarget(Filter):
                   - type: is-log-target
     """
 
+    augment_keys = ('Logging',)
     schema = type_schema(
         'is-log-target',
         services={'type': 'array', 'items': {'enum': [
@@ -2481,6 +2679,7 @@ class DeleteGlobalGrants(BucketActionBase):
                   - delete-global-grants
     """
 
+    augment_keys = ('Acl', 'Website')
     schema = type_schema(
         'delete-global-grants',
         grantees={'type': 'array', 'items': {'type': 'string'}})
@@ -2828,6 +3027,7 @@ class DeleteBucket(ScanBucket):
                     remove-contents: true
     """
 
+    augment_keys = ('Versioning', 'Replication')
     schema = type_schema('delete', **{'remove-contents': {'type': 'boolean'}})
 
     permissions = ('s3:*',)
@@ -2963,6 +3163,7 @@ class Lifecycle(BucketActionBase):
 
     """
 
+    augment_keys = ('Lifecycle',)
     schema = type_schema(
         'configure-lifecycle',
         **{
@@ -0,0 +1,406 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Security group permission matching
+----------------------------------
+
+The ingress and egress filters match a group's permissions, expanded to
+one permission per cidr, prefix list or group pair, against the
+attributes of the filter.
+
+A group's expanded permissions are parsed once into
+:py:class:`GroupPermissions`, indexing port ranges with an interval
+tree and network cidrs with a prefix trie. Parsed groups are cached
+for the run, with a resource planner shared by the policies of the
+run, so filter blocks across policies evaluate against the same
+parsed permissions. Groups are parsed again if their permissions
+change.
+
+A filter block is compiled once into a :py:class:`PermissionMatcher`.
+`Ports` and `OnlyPorts` are answered from the port index, cidr
+containment (``value_type: cidr`` with ``op: in``) from the cidr
+trie, and the other value filters are evaluated once per distinct
+value. Results are identical to evaluating each permission.
+"""
+import ipaddress
+from operator import itemgetter
+
+from c7n.filters.core import ValueFilter
+from c7n.planner import get_run_index
+from c7n.utils import parse_cidr
+
+
+PERMISSION_ATTRS = (
+    'FromPort', 'IpProtocol', 'IpRanges', 'PrefixListIds', 'ToPort', 'UserIdGroupPairs')
+EXPAND_KEYS = ('IpRanges', 'Ipv6Ranges', 'PrefixListIds', 'UserIdGroupPairs')
+DESCRIPTION_KEYS = ('Ipv6Ranges', 'IpRanges', 'UserIdGroupPairs', 'PrefixListIds')
+# filter key -> (permission key, range value key)
+CIDR_KEYS = (
+    ('CidrV6', ('Ipv6Ranges', 'CidrIpv6')),
+    ('Cidr', ('IpRanges', 'CidrIp')))
+
+
+def expand_permissions(permissions):
+    """Expand each list of cidr, prefix list, user id group pair
+    by port/protocol as an individual rule.
+
+    The console ux automatically expands them out as addition/removal is
+    per this expansion, the describe calls automatically group them.
+    """
+    for p in permissions:
+        np = dict(p)
+        values = {}
+        for k in EXPAND_KEYS:
+            values[k] = np.pop(k, ())
+            np[k] = []
+        for k, v in values.items():
+            if not v:
+                continue
+            for e in v:
+                ep = dict(np)
+                ep[k] = [e]
+                yield ep
+
+
+def get_prefix_bits(address, length):
+    ip = int(address)
+    width = address.max_prefixlen
+    return [(ip >> (width - 1 - i)) & 1 for i in range(length)]
+
+
+class IntervalTree:
+    """Static interval tree of closed ranges, for point queries.
+
+    Intervals are sorted by start and laid out as an implicit balanced
+    tree over the sorted list, each node keeping the maximum end of
+    its subtree.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = sorted(intervals, key=itemgetter(0))
+        self.max_ends = [None] * len(self.intervals)
+        self._build(0, len(self.intervals))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self.intervals[mid][1]
+        for end in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if end is not None and end > max_end:
+                max_end = end
+        self.max_ends[mid] = max_end
+        return max_end
+
+    def query(self, point):
+        """Yield the values of the intervals containing point."""
+        stack = [(0, len(self.intervals))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_ends[mid] < point:
+                continue
+            start, end, value = self.intervals[mid]
+            stack.append((lo, mid))
+            if start <= point:
+                if point <= end:
+                    yield value
+                stack.append((mid + 1, hi))
+
+
+class CidrTrie:
+    """Binary prefix trie of networks, for containment queries."""
+
+    def __init__(self):
+        self.roots = {}
+
+    def add(self, network, value):
+        node = self.roots.setdefault(network.version, {})
+        for bit in get_prefix_bits(network.network_address, network.prefixlen):
+            node = node.setdefault(bit, {})
+        node.setdefault(None, []).append(value)
+
+    def subnets(self, network):
+        """Yield the values of networks within network."""
+        node = self.roots.get(network.version)
+        for bit in get_prefix_bits(network.network_address, network.prefixlen):
+            if node is None:
+                return
+            node = node.get(bit)
+        stack = node is not None and [node] or []
+        while stack:
+            node = stack.pop()
+            yield from node.get(None, ())
+            stack.extend(node[bit] for bit in (0, 1) if bit in node)
+
+    def supernets(self, address):
+        """Yield the values of networks containing an address."""
+        node = self.roots.get(address.version)
+        if node is None:
+            return
+        yield from node.get(None, ())
+        for bit in get_prefix_bits(address, address.max_prefixlen):
+            node = node.get(bit)
+            if node is None:
+                return
+            yield from node.get(None, ())
+
+
+class GroupPermissions:
+    """A group's expanded permissions, parsed once for matching."""
+
+    def __init__(self, group_id, permissions):
+        self.group_id = group_id
+        self.permissions = permissions
+        self.expanded = list(expand_permissions(permissions))
+        self._port_tree = None
+        self._single_ports = None
+        self._cidrs = {}
+
+    def get_port_tree(self):
+        if self._port_tree is None:
+            self._port_tree = IntervalTree([
+                (p['FromPort'], p['ToPort'], idx) for idx, p in enumerate(self.expanded)
+                if 'FromPort' in p and 'ToPort' in p])
+        return self._port_tree
+
+    def get_single_ports(self):
+        """Positions of single port permissions by port."""
+        if self._single_ports is None:
+            self._single_ports = ports = {}
+            for idx, p in enumerate(self.expanded):
+                if 'FromPort' in p and 'ToPort' in p and p['FromPort'] == p['ToPort']:
+                    ports.setdefault(p['FromPort'], []).append(idx)
+        return self._single_ports
+
+    def get_ranges(self, range_key):
+        return [(idx, p[range_key][0]) for idx, p in enumerate(self.expanded)
+                if p.get(range_key)]
+
+    def get_cidrs(self, range_key, value_key):
+        """Network cidrs of a range key as a trie, by value.
+
+        Returns the trie, the positions of each network value, and the
+        ranges with values which don't parse as networks.
+        """
+        if range_key not in self._cidrs:
+            trie, networks, others, parsed = CidrTrie(), {}, [], {}
+            for idx, r in self.get_ranges(range_key):
+                value = isinstance(r, dict) and r.get(value_key) or None
+                if isinstance(value, str):
+                    if value not in parsed:
+                        parsed[value] = parse_cidr(value)
+                        if isinstance(parsed[value], ipaddress._BaseNetwork):
+                            trie.add(parsed[value], value)
+                    if isinstance(parsed[value], ipaddress._BaseNetwork):
+                        networks.setdefault(value, []).append(idx)
+                        continue
+                others.append((idx, r))
+            self._cidrs[range_key] = (trie, networks, others)
+        return self._cidrs[range_key]
+
+
+class PermissionIndex:
+    """Parsed group permissions by group and permission key."""
+
+    def __init__(self):
+        self.groups = {}
+
+    def get_group(self, resource, key):
+        permissions = resource[key]
+        cache_key = (resource['GroupId'], key)
+        group = self.groups.get(cache_key)
+        if group is None or (
+                group.permissions is not permissions and group.permissions != permissions):
+            group = self.groups[cache_key] = GroupPermissions(resource['GroupId'], permissions)
+        return group
+
+    def invalidate(self, resource_type, actions=()):
+        if resource_type == 'security-group':
+            self.groups.clear()
+
+
+def get_permission_index(manager):
+    return get_run_index(manager, 'security-group-permissions', PermissionIndex)
+
+
+class ValueMatcher:
+    """A value filter evaluated once per distinct value."""
+
+    def __init__(self, data, manager):
+        self.filter = vf = ValueFilter(data, manager)
+        vf.annotate = False
+        vf._initialize_value()
+        # value types referencing the resource, or the resource set
+        self.cached = vf.vtype not in ('expr', 'resource_count')
+        if self.cached:
+            self.get_value = vf.get_value_accessor(vf.k)
+            self.match_value = vf.compile_value()
+        self.results = {}
+
+    def __call__(self, resource):
+        if not self.cached:
+            return bool(self.filter(resource))
+        value = self.get_value(resource)
+        try:
+            # keyed by type, as equal values of different types can match differently.
+            key = (type(value), value)
+            return self.results[key]
+        except KeyError:
+            result = self.results[key] = bool(self.match_value(value, resource))
+        except TypeError:
+            result = bool(self.match_value(value, resource))
+        return result
+
+
+class CidrMatcher(ValueMatcher):
+    """A cidr value filter, containment comparisons use the group's cidr trie."""
+
+    def __init__(self, data, manager, range_key, value_key):
+        super(CidrMatcher, self).__init__(data, manager)
+        self.range_key = range_key
+        self.value_key = value_key
+        vf = self.filter
+        sentinel = None
+        if (self.cached and vf.vtype == 'cidr' and vf.op == 'in' and
+                vf.k == value_key and 'value_regex' not in vf.data):
+            sentinel = vf.get_value_sentinel()
+        self.network = isinstance(sentinel, ipaddress._BaseNetwork) and sentinel or None
+        self.address = isinstance(sentinel, ipaddress._BaseAddress) and sentinel or None
+
+    def get_matches(self, group):
+        """Positions of the group's permissions with a matching range."""
+        if self.network is None and self.address is None:
+            return {idx for idx, r in group.get_ranges(self.range_key) if self(r)}
+        trie, networks, others = group.get_cidrs(self.range_key, self.value_key)
+        if self.network is not None:
+            values = trie.subnets(self.network)
+        else:
+            values = trie.supernets(self.address)
+        matches = {idx for v in values for idx in networks[v]}
+        matches.update(idx for idx, r in others if self(r))
+        return matches
+
+
+def get_value_data(key, value):
+    if isinstance(value, dict):
+        return dict(value, key=key)
+    return {key: value}
+
+
+class PermissionMatcher:
+    """An ingress or egress filter block, compiled for matching groups."""
+
+    def __init__(self, data, manager=None):
+        self.match_op = data.get('match-operator', 'and') == 'and' and all or any
+        self.ports = 'Ports' in data and data['Ports'] or ()
+        self.only_ports = 'OnlyPorts' in data and data['OnlyPorts'] or ()
+        self.attrs = [ValueMatcher(get_value_data(k, data[k]), manager)
+                      for k in PERMISSION_ATTRS if k in data]
+        self.cidrs = [CidrMatcher(get_value_data(value_key, data[k]), manager,
+                                  range_key, value_key)
+                      for k, (range_key, value_key) in CIDR_KEYS if k in data]
+        self.description = None
+        if 'Description' in data:
+            self.description = ValueMatcher(
+                dict(data['Description'], key='Description'), manager)
+        self.has_self_reference = 'SelfReference' in data
+        self.self_reference = data.get('SelfReference')
+
+    def match(self, group):
+        """Return the group's matching expanded permissions."""
+        perms = group.expanded
+        checks = []
+        if self.ports or self.only_ports:
+            checks.append(self.get_port_check(group))
+        if self.cidrs:
+            checks.append(self.get_cidr_check(group))
+        if self.has_self_reference:
+            checks.append(self.get_self_reference_check(group))
+        if self.description is not None:
+            checks.append(self.check_description)
+        checks.extend(self.get_attr_check(m) for m in self.attrs)
+
+        conjunction = self.match_op is all
+        matched = []
+        for idx, perm in enumerate(perms):
+            # any([]) == False, and permissions without any applicable
+            # checks don't match a conjunction either.
+            result = False
+            for check in checks:
+                found = check(idx, perm)
+                if found is None:
+                    continue
+                result = bool(found)
+                if result != conjunction:
+                    break
+            if result:
+                matched.append(perm)
+        return matched
+
+    def get_port_check(self, group):
+        tree = group.get_port_tree()
+        port_matches = set()
+        for port in self.ports:
+            port_matches.update(tree.query(port))
+        single_ports = group.get_single_ports()
+        only_matches = set()
+        for port in self.only_ports:
+            only_matches.update(single_ports.get(port, ()))
+
+        def check(idx, perm):
+            if 'FromPort' not in perm or 'ToPort' not in perm:
+                return None
+            found = None
+            if self.ports:
+                found = idx in port_matches
+            # OnlyPorts matches permissions allowing ports outside of the set
+            if self.only_ports:
+                found = idx not in only_matches and found is not False
+            return found
+        return check
+
+    def get_cidr_check(self, group):
+        matches = [m.get_matches(group) for m in self.cidrs]
+
+        def check(idx, perm):
+            return self.match_op([idx in m for m in matches])
+        return check
+
+    def get_self_reference_check(self, group):
+        def check(idx, perm):
+            found = None
+            if self.self_reference is not None:
+                found = False
+            if 'UserIdGroupPairs' in perm and self.has_self_reference:
+                self_reference = group.group_id in [
+                    p['GroupId'] for p in perm['UserIdGroupPairs']]
+                if self.self_reference is False and not self_reference:
+                    found = True
+                if self.self_reference is True and self_reference:
+                    found = True
+            return found
+        return check
+
+    def check_description(self, idx, perm):
+        for k in DESCRIPTION_KEYS:
+            if k not in perm or not perm[k]:
+                continue
+            return self.description(perm[k][0])
+        return False
+
+    def get_attr_check(self, matcher):
+        return lambda idx, perm: matcher(perm)
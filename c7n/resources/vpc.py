@@ -21,14 +21,17 @@ from c7n.exceptions import PolicyValidationError, ClientError
 from c7n.filters import (
     DefaultVpcBase, Filter, ValueFilter)
 import c7n.filters.vpc as net_filters
+from c7n.filters.vpc import get_sg_references
 from c7n.filters.iamaccess import CrossAccountAccessFilter
 from c7n.filters.related import RelatedResourceFilter
 from c7n.filters.revisions import Diff
 from c7n import query, resolver
 from c7n.manager import resources
 from c7n.resources.securityhub import OtherResourcePostFinding
+from c7n.resources.sgmatch import (
+    PermissionMatcher, expand_permissions, get_permission_index)
 from c7n.utils import (
-    chunks, local_session, type_schema, get_retry, parse_cidr)
+    local_session, type_schema, get_retry, parse_cidr)
 
 from c7n.resources.shield import IsShieldProtected, SetShieldProtection
 
@@ -693,69 +696,15 @@ class SGUsage(Filter):
         if not resources:
             return resources
         # Check that groups are not referenced across accounts
-        client = local_session(self.manager.session_factory).client('ec2')
-        peered_ids = set()
-        for resource_set in chunks(resources, 200):
-            for sg_ref in client.describe_security_group_references(
-                    GroupId=[r['GroupId'] for r in resource_set]
-            )['SecurityGroupReferenceSet']:
-                peered_ids.add(sg_ref['GroupId'])
+        peered_ids = get_sg_references(self.manager).get_peered(
+            self.manager, [r['GroupId'] for r in resources])
         self.log.debug(
             "%d of %d groups w/ peered refs", len(peered_ids), len(resources))
         return [r for r in resources if r['GroupId'] not in peered_ids]
 
     def scan_groups(self):
-        used = set()
-        for kind, scanner in (
-                ("nics", self.get_eni_sgs),
-                ("sg-perm-refs", self.get_sg_refs),
-                ('lambdas', self.get_lambda_sgs),
-                ("launch-configs", self.get_launch_config_sgs),
-        ):
-            sg_ids = scanner()
-            new_refs = sg_ids.difference(used)
-            used = used.union(sg_ids)
-            self.log.debug(
-                "%s using %d sgs, new refs %s total %s",
-                kind, len(sg_ids), len(new_refs), len(used))
-
-        return used
-
-    def get_launch_config_sgs(self):
-        # Note assuming we also have launch config garbage collection
-        # enabled.
-        sg_ids = set()
-        for cfg in self.manager.get_resource_manager('launch-config').resources():
-            for g in cfg['SecurityGroups']:
-                sg_ids.add(g)
-            for g in cfg['ClassicLinkVPCSecurityGroups']:
-                sg_ids.add(g)
-        return sg_ids
-
-    def get_lambda_sgs(self):
-        sg_ids = set()
-        for func in self.manager.get_resource_manager('lambda').resources():
-            if 'VpcConfig' not in func:
-                continue
-            for g in func['VpcConfig']['SecurityGroupIds']:
-                sg_ids.add(g)
-        return sg_ids
-
-    def get_eni_sgs(self):
-        sg_ids = set()
-        for nic in self.manager.get_resource_manager('eni').resources():
-            for g in nic['Groups']:
-                sg_ids.add(g['GroupId'])
-        return sg_ids
-
-    def get_sg_refs(self):
-        sg_ids = set()
-        for sg in self.manager.get_resource_manager('security-group').resources():
-            for perm_type in ('IpPermissions', 'IpPermissionsEgress'):
-                for p in sg.get(perm_type, []):
-                    for g in p.get('UserIdGroupPairs', ()):
-                        sg_ids.add(g['GroupId'])
-        return sg_ids
+        """Return the security group reference index, scanning usage as needed."""
+        return get_sg_references(self.manager).refresh(self.manager)
 
 
 @SecurityGroup.filter_registry.register('unused')
@@ -784,10 +733,10 @@ class UnusedSecurityGroup(SGUsage):
     schema = type_schema('unused')
 
     def process(self, resources, event=None):
-        used = self.scan_groups()
+        references = self.scan_groups()
         unused = [
             r for r in resources
-            if r['GroupId'] not in used and 'VpcId' in r]
+            if not references.is_used(r['GroupId']) and 'VpcId' in r]
         return unused and self.filter_peered_refs(unused) or []
 
 
@@ -811,10 +760,10 @@ class UsedSecurityGroup(SGUsage):
     schema = type_schema('used')
 
     def process(self, resources, event=None):
-        used = self.scan_groups()
+        references = self.scan_groups()
         unused = [
             r for r in resources
-            if r['GroupId'] not in used and 'VpcId' in r]
+            if not references.is_used(r['GroupId']) and 'VpcId' in r]
         unused = set([g['GroupId'] for g in self.filter_peered_refs(unused)])
         return [r for r in resources if r['GroupId'] not in unused]
 
@@ -843,15 +792,14 @@ class Stale(Filter):
     permissions = ('ec2:DescribeStaleSecurityGroups',)
 
     def process(self, resources, event=None):
-        client = local_session(self.manager.session_factory).client('ec2')
+        references = get_sg_references(self.manager)
         vpc_ids = set([r['VpcId'] for r in resources if 'VpcId' in r])
         group_map = {r['GroupId']: r for r in resources}
         results = []
         self.log.debug("Querying %d vpc for stale refs", len(vpc_ids))
         stale_count = 0
         for vpc_id in vpc_ids:
-            stale_groups = client.describe_stale_security_groups(
-                VpcId=vpc_id).get('StaleSecurityGroupSet', ())
+            stale_groups = references.get_stale(self.manager, vpc_id)
 
             stale_count += len(stale_groups)
             for s in stale_groups:
@@ -992,157 +940,25 @@ class SGPermission(Filter):
                 ", ".join(delta), self.manager.data))
         return self
 
+    matcher = permission_index = None
+
     def process(self, resources, event=None):
-        self.vfilters = []
-        fattrs = list(sorted(self.perm_attrs.intersection(self.data.keys())))
-        self.ports = 'Ports' in self.data and self.data['Ports'] or ()
-        self.only_ports = (
-            'OnlyPorts' in self.data and self.data['OnlyPorts'] or ())
-        for f in fattrs:
-            fv = self.data.get(f)
-            if isinstance(fv, dict):
-                fv['key'] = f
-            else:
-                fv = {f: fv}
-            vf = ValueFilter(fv, self.manager)
-            vf.annotate = False
-            self.vfilters.append(vf)
+        self.matcher = PermissionMatcher(self.data, self.manager)
+        self.permission_index = get_permission_index(self.manager)
         return super(SGPermission, self).process(resources, event)
 
-    def process_ports(self, perm):
-        found = None
-        if 'FromPort' in perm and 'ToPort' in perm:
-            for port in self.ports:
-                if port >= perm['FromPort'] and port <= perm['ToPort']:
-                    found = True
-                    break
-                found = False
-            only_found = False
-            for port in self.only_ports:
-                if port == perm['FromPort'] and port == perm['ToPort']:
-                    only_found = True
-            if self.only_ports and not only_found:
-                found = found is None or found and True or False
-            if self.only_ports and only_found:
-                found = False
-        return found
-
-    def _process_cidr(self, cidr_key, cidr_type, range_type, perm):
-
-        found = None
-        ip_perms = perm.get(range_type, [])
-        if not ip_perms:
-            return False
-
-        match_range = self.data[cidr_key]
-
-        if isinstance(match_range, dict):
-            match_range['key'] = cidr_type
-        else:
-            match_range = {cidr_type: match_range}
-
-        vf = ValueFilter(match_range, self.manager)
-        vf.annotate = False
-
-        for ip_range in ip_perms:
-            found = vf(ip_range)
-            if found:
-                break
-            else:
-                found = False
-        return found
-
-    def process_cidrs(self, perm):
-        found_v6 = found_v4 = None
-        if 'CidrV6' in self.data:
-            found_v6 = self._process_cidr('CidrV6', 'CidrIpv6', 'Ipv6Ranges', perm)
-        if 'Cidr' in self.data:
-            found_v4 = self._process_cidr('Cidr', 'CidrIp', 'IpRanges', perm)
-        match_op = self.data.get('match-operator', 'and') == 'and' and all or any
-        cidr_match = [k for k in (found_v6, found_v4) if k is not None]
-        if not cidr_match:
-            return None
-        return match_op(cidr_match)
-
-    def process_description(self, perm):
-        if 'Description' not in self.data:
-            return None
-
-        d = dict(self.data['Description'])
-        d['key'] = 'Description'
-
-        vf = ValueFilter(d, self.manager)
-        vf.annotate = False
-
-        for k in ('Ipv6Ranges', 'IpRanges', 'UserIdGroupPairs', 'PrefixListIds'):
-            if k not in perm or not perm[k]:
-                continue
-            return vf(perm[k][0])
-        return False
-
-    def process_self_reference(self, perm, sg_id):
-        found = None
-        ref_match = self.data.get('SelfReference')
-        if ref_match is not None:
-            found = False
-        if 'UserIdGroupPairs' in perm and 'SelfReference' in self.data:
-            self_reference = sg_id in [p['GroupId']
-                                       for p in perm['UserIdGroupPairs']]
-            if ref_match is False and not self_reference:
-                found = True
-            if ref_match is True and self_reference:
-                found = True
-        return found
-
     def expand_permissions(self, permissions):
-        """Expand each list of cidr, prefix list, user id group pair
-        by port/protocol as an individual rule.
-
-        The console ux automatically expands them out as addition/removal is
-        per this expansion, the describe calls automatically group them.
-        """
-        for p in permissions:
-            np = dict(p)
-            values = {}
-            for k in (u'IpRanges',
-                      u'Ipv6Ranges',
-                      u'PrefixListIds',
-                      u'UserIdGroupPairs'):
-                values[k] = np.pop(k, ())
-                np[k] = []
-            for k, v in values.items():
-                if not v:
-                    continue
-                for e in v:
-                    ep = dict(np)
-                    ep[k] = [e]
-                    yield ep
+        return expand_permissions(permissions)
 
     def __call__(self, resource):
-        matched = []
-        sg_id = resource['GroupId']
-        match_op = self.data.get('match-operator', 'and') == 'and' and all or any
-        for perm in self.expand_permissions(resource[self.ip_permissions_key]):
-            perm_matches = {}
-            for idx, f in enumerate(self.vfilters):
-                perm_matches[idx] = bool(f(perm))
-            perm_matches['description'] = self.process_description(perm)
-            perm_matches['ports'] = self.process_ports(perm)
-            perm_matches['cidrs'] = self.process_cidrs(perm)
-            perm_matches['self-refs'] = self.process_self_reference(perm, sg_id)
-            perm_match_values = list(filter(
-                lambda x: x is not None, perm_matches.values()))
-
-            # account for one python behavior any([]) == False, all([]) == True
-            if match_op == all and not perm_match_values:
-                continue
-
-            match = match_op(perm_match_values)
-            if match:
-                matched.append(perm)
-
+        if self.matcher is None:
+            self.matcher = PermissionMatcher(self.data, self.manager)
+            self.permission_index = get_permission_index(self.manager)
+        group = self.permission_index.get_group(resource, self.ip_permissions_key)
+        matched = self.matcher.match(group)
         if matched:
-            resource['Matched%s' % self.ip_permissions_key] = matched
+            # parsed permissions are shared across policies, annotate copies
+            resource['Matched%s' % self.ip_permissions_key] = [dict(p) for p in matched]
             return True
 
 
@@ -1404,10 +1220,13 @@ class InterfaceModifyVpcSecurityGroups(ModifyVpcSecurityGroupsAction):
         client = local_session(self.manager.session_factory).client('ec2')
         groups = super(
             InterfaceModifyVpcSecurityGroups, self).get_groups(resources)
+        references = get_sg_references(self.manager, shared=True)
         for idx, r in enumerate(resources):
             client.modify_network_interface_attribute(
                 NetworkInterfaceId=r['NetworkInterfaceId'],
                 Groups=groups[idx])
+            if references is not None:
+                references.update('eni', r['NetworkInterfaceId'], groups[idx])
 
 
 @NetworkInterface.action_registry.register('delete')
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import copy
+from collections import Counter
 import csv
 from datetime import datetime, timedelta
 import json
@@ -24,6 +25,7 @@ import re
 import sys
 import threading
 import time
+import weakref
 
 import six
 from six.moves.urllib import parse as urlparse
@@ -31,6 +33,7 @@ from six.moves.urllib.request import getproxies
 
 from c7n import config
 from c7n.exceptions import ClientError, PolicyValidationError
+from c7n.executor import get_execution_scope
 
 # Try to play nice in a serverless environment, where we don't require yaml
 
@@ -365,6 +368,65 @@ def snapshot_identifier(prefix, db_identifier):
 
 retry_log = logging.getLogger('c7n.retry')
 
+# Error codes of api throttling, retried by resource queries and
+# accounted as throttles in api stats
+THROTTLE_CODES = (
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'Throttled',
+    'Throttling',
+    'Client.RequestLimitExceeded',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'RequestThrottled',
+    'SlowDown')
+
+
+class RetryStats:
+    """Accounting of get_retry retries, throttles and backoff.
+
+    Kept per execution scope, so concurrently executing policies only
+    account their own retries, and keyed by (operation, stat). Api stats
+    consume these as deltas over a policy execution.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.scoped = weakref.WeakKeyDictionary()
+
+    def record(self, func, code, delay):
+        operation = get_operation_name(func)
+        scope = get_execution_scope()
+        with self.lock:
+            stats = self.stats if scope is None else self.scoped.setdefault(scope, Counter())
+            stats[(operation, 'retries')] += 1
+            stats[(operation, 'backoff')] += delay
+            if code in THROTTLE_CODES:
+                stats[(operation, 'throttles')] += 1
+
+    def get_snapshot(self, scope=None):
+        with self.lock:
+            if scope is None:
+                return dict(self.stats)
+            return dict(self.scoped.get(scope, ()))
+
+
+retry_stats = RetryStats()
+
+
+def get_operation_name(func):
+    """Name a retried function as service.Operation where it's a client method."""
+    func = getattr(func, '__wrapped__', func)
+    meta = getattr(getattr(func, '__self__', None), 'meta', None)
+    name = getattr(func, '__name__', None) or getattr(
+        getattr(func, 'func', None), '__name__', 'unknown')
+    if meta is None or not hasattr(meta, 'method_to_api_mapping'):
+        return name
+    return "%s.%s" % (
+        meta.service_model.endpoint_prefix, meta.method_to_api_mapping.get(name, name))
+
 
 def get_retry(codes=(), max_attempts=8, min_delay=1, log_retries=False):
     """Decorator for retry boto3 api call on transient errors.
@@ -401,7 +463,9 @@ def get_retry(codes=(), max_attempts=8, min_delay=1, log_retries=False):
                         log_retries,
                         "retrying %s on error:%s attempt:%d last delay:%0.2f",
                         func, e.response['Error']['Code'], idx, delay)
+                retry_stats.record(func, e.response['Error']['Code'], delay)
             time.sleep(delay)
+    _retry.codes = codes
     return _retry
 
 
@@ -417,6 +481,127 @@ def backoff_delays(start, stop, factor=2.0, jitter=False):
         cur = cur * factor
 
 
+class TokenBucket:
+    """Thread safe token bucket rate limiter.
+
+    :param rate: tokens added per second.
+    :param burst: bucket capacity, defaults to rate.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.last = clock()
+        self.lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Take tokens from the bucket, blocking till they're available.
+
+        Returns the time spent waiting.
+        """
+        delay = self._reserve(tokens)
+        if delay:
+            self.sleep(delay)
+        return delay
+
+
+class RateLimiter:
+    """A set of token buckets, one per key."""
+
+    def __init__(self, rate, burst=None, bucket_factory=TokenBucket):
+        self.rate = rate
+        self.burst = burst
+        self.bucket_factory = bucket_factory
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, key, tokens=1):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.setdefault(
+                    key, self.bucket_factory(self.rate, self.burst))
+        return bucket.acquire(tokens)
+
+
+class AdaptiveConcurrency:
+    """An additive increase / multiplicative decrease concurrency limit.
+
+    Used as a context manager around units of work, blocking while the
+    number in flight is at the limit. The limit grows by one after a
+    limit's worth of successful calls, and is scaled down by `backoff`
+    on throttling. Throttles within `cooldown` seconds of a back off
+    are counted but don't back off again, as they're typically from
+    calls issued before it. The peak limit reached and the number of
+    back offs are kept for reporting.
+    """
+
+    def __init__(self, initial=3, minimum=1, maximum=16, backoff=0.5,
+                 cooldown=1.0, clock=time.time):
+        self.minimum = minimum
+        self.maximum = max(maximum, initial)
+        self.limit = initial
+        self.peak = initial
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.clock = clock
+        self.in_flight = 0
+        self.successes = 0
+        self.throttles = 0
+        self.decreases = 0
+        self.last_backoff = None
+        self.condition = threading.Condition()
+
+    def __enter__(self):
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def success(self):
+        with self.condition:
+            self.successes += 1
+            if self.successes < self.limit or self.limit >= self.maximum:
+                return
+            self.successes = 0
+            self.limit += 1
+            self.peak = max(self.peak, self.limit)
+            self.condition.notify_all()
+
+    def throttled(self):
+        with self.condition:
+            self.throttles += 1
+            now = self.clock()
+            if self.last_backoff is not None and now - self.last_backoff < self.cooldown:
+                return
+            self.last_backoff = now
+            self.successes = 0
+            limit = max(self.minimum, int(self.limit * self.backoff))
+            if limit < self.limit:
+                self.decreases += 1
+            self.limit = limit
+
+
 def parse_cidr(value):
     """Process cidr ranges."""
     klass = IPv4Network
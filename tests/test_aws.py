@@ -13,13 +13,15 @@
 # limitations under the License.
 
 import json
+import os
 
 from mock import Mock
 
 from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
+from c7n.executor import ThreadPoolExecutor
 from c7n.resources import aws
-from c7n import output
+from c7n import output, utils
 
 from .common import BaseTest
 
@@ -122,6 +124,15 @@ class UtilTest(BaseTest):
         aws._default_account_id(config)
         self.assertEqual(config.account_id, '644160558196')
 
+    def test_service_region_map(self):
+        service_region_map, resource_service_map = aws.get_service_region_map(
+            ['us-east-1', 'cn-north-1'], ['aws.ec2', 'ebs', 'aws.account'])
+        self.assertEqual(resource_service_map, {'ec2': 'ec2', 'ebs': 'ec2'})
+        self.assertIn('us-west-2', service_region_map['ec2'])
+        self.assertIn('cn-north-1', service_region_map['ec2'])
+        # sdk endpoint metadata is only resolved once per process
+        self.assertIs(aws.get_available_regions('ec2'), aws.get_available_regions('ec2'))
+
     def test_validate(self):
         self.assertRaises(
             PolicyValidationError,
@@ -158,6 +169,137 @@ class TracerTest(BaseTest):
                 pass
             self.assertNotEqual(w.cause, {})
 
+    def test_profile_tracer(self):
+        session_factory = self.replay_flight_data('test_ec2_state_transition_age_filter')
+        p = self.load_policy(
+            {'name': 'ec2-profile', 'resource': 'ec2',
+             'filters': [{'State.Name': 'running'}]},
+            config={'tracer': 'profile'}, output_dir=None,
+            session_factory=session_factory)
+        self.assertIsInstance(p.ctx.tracer, output.ProfileTracer)
+        p.run()
+
+        with open(os.path.join(p.ctx.log_dir, 'profile.json')) as fh:
+            summary = json.load(fh)
+        self.assertEqual(summary['policy'], 'ec2-profile')
+        self.assertIn('ec2-profile;resource-fetch', summary['segments'])
+        self.assertIn('ec2-profile;filter;filter:value', summary['segments'])
+        self.assertEqual(
+            [f['filter'] for f in summary['filter-stats']], ['value'])
+
+        with open(os.path.join(p.ctx.log_dir, 'flamegraph.folded')) as fh:
+            stacks = dict(line.rsplit(' ', 1) for line in fh.read().splitlines())
+        self.assertIn('ec2-profile;resource-fetch', stacks)
+        self.assertTrue(all(int(v) > 0 for v in stacks.values()))
+
+    def test_profile_api_latency(self):
+        ctx = Bag(policy=Bag(name='test', resource_type='ec2'), metrics=None)
+        ctx.tracer = tracer = output.ProfileTracer(ctx)
+        stats = aws.ApiStats(ctx)
+        model = Bag(name='DescribeInstances', service_model=Bag(endpoint_prefix='ec2'))
+        tracer.__enter__()
+        with tracer.subsegment('resource-fetch'):
+            context = {}
+            stats._start(model, context=context)
+            stats._record(None, None, model, context=context)
+            stats._start(model, context=context)
+            stats._record_error(exception=ValueError(), context=context)
+        summary = tracer.get_summary()
+        self.assertEqual(summary['api-calls']['ec2.DescribeInstances']['count'], 2)
+        self.assertEqual(summary['api-calls']['ec2.DescribeInstances']['errors'], 1)
+        self.assertEqual(
+            summary['segments']['test;resource-fetch;api:ec2.DescribeInstances']['count'], 2)
+        self.assertEqual(stats.api_calls['ec2.DescribeInstances'], 1)
+
+    def test_profile_worker_frames(self):
+        ctx = Bag(policy=Bag(name='test', resource_type='ec2'), metrics=None,
+                  filter_stats=[{'filter': 'value', 'resources-in': 2, 'resources-out': 1}])
+        ctx.tracer = tracer = output.ProfileTracer(ctx)
+        tracer.__enter__()
+
+        def augment(operation):
+            with tracer.subsegment('page'):
+                tracer.record_api_call(operation, 0.25)
+
+        with tracer.subsegment('resource-fetch'):
+            with tracer.subsegment('augment'):
+                with ThreadPoolExecutor(max_workers=1) as w:
+                    list(w.map(augment, ['ec2.DescribeTags', 'ec2.DescribeVolumes']))
+            with ThreadPoolExecutor(max_workers=1) as w:
+                w.submit(tracer.record_api_call, 'ec2.DescribeImages', 0.5).result()
+        summary = tracer.get_summary()
+        self.assertEqual(
+            summary['segments']['test;resource-fetch;augment;page']['count'], 2)
+        self.assertIn(
+            'test;resource-fetch;augment;page;api:ec2.DescribeTags', summary['segments'])
+        self.assertIn('test;resource-fetch;api:ec2.DescribeImages', summary['segments'])
+        self.assertEqual(summary['filter-stats'], ctx.filter_stats)
+
+    def test_api_stats_accounting(self):
+        metrics = []
+        ctx = Bag(policy=Bag(name='test', resource_type='ec2'), tracer=None,
+                  session_factory=None)
+        ctx.metrics = Bag(put_metric=lambda name, value, unit: metrics.append(
+            (name, value, unit)))
+        stats = aws.ApiStats(ctx)
+        self.patch(stats, 'get_handlers', lambda: ())
+        stats.__enter__()
+
+        model = Bag(name='DescribeInstances', service_model=Bag(endpoint_prefix='ec2'))
+        context = {}
+        stats._start(model, context=context)
+        stats._record_retry(
+            response=(None, {'Error': {'Code': 'RequestLimitExceeded'}}),
+            operation=model, request_dict={'context': context})
+        stats._record_backoff(request=Bag(context=context))
+        stats._record(
+            Bag(status_code=200, headers={'content-length': '2048'}),
+            {'ResponseMetadata': {'RetryAttempts': 1}}, model, context=context)
+
+        client = Bag(meta=Bag(
+            service_model=Bag(endpoint_prefix='ec2'),
+            method_to_api_mapping={'describe_volumes': 'DescribeVolumes'}))
+
+        class describe_volumes:
+            __self__ = client
+        utils.retry_stats.record(describe_volumes, 'Throttling', 0.5)
+
+        operations = stats.get_operation_stats()
+        self.assertEqual(operations['ec2.DescribeInstances']['count'], 1)
+        self.assertEqual(operations['ec2.DescribeInstances']['retries'], 1)
+        self.assertEqual(operations['ec2.DescribeInstances']['throttles'], 1)
+        self.assertEqual(operations['ec2.DescribeInstances']['bytes'], 2048)
+        self.assertIn('backoff', operations['ec2.DescribeInstances'])
+        self.assertIn('p99', operations['ec2.DescribeInstances'])
+        self.assertEqual(
+            operations['ec2.DescribeVolumes'],
+            {'retries': 1, 'throttles': 1, 'backoff': 0.5})
+
+        self.patch(aws.utils, 'local_session', lambda factory: Bag(
+            events=Bag(unregister=lambda *args, **kw: None)))
+        stats.__exit__()
+        self.assertEqual(
+            {m[0]: m[1] for m in metrics if m[0] in (
+                'ApiCalls', 'ApiRetries', 'ApiThrottles', 'ApiResponseSize')},
+            {'ApiCalls': 1, 'ApiRetries': 2, 'ApiThrottles': 2, 'ApiResponseSize': 2048})
+        self.assertIn('ApiLatencyP99', [m[0] for m in metrics])
+
+    def test_latency_histogram(self):
+        histogram = output.LatencyHistogram()
+        for d in (0.001, 0.02, 0.02, 45):
+            histogram.add(d)
+        histogram.add(0.3, error=True)
+        summary = histogram.get_summary()
+        self.assertEqual(summary['count'], 5)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['max'], 45)
+        self.assertEqual(
+            summary['histogram'],
+            {'le-0.01': 1, 'le-0.025': 2, 'le-0.5': 1, 'le-inf': 1})
+        self.assertTrue(0.01 < histogram.percentile(50) <= 0.025)
+        self.assertEqual(histogram.percentile(100), 45)
+        self.assertEqual(output.LatencyHistogram().percentile(99), 0)
+
 
 class OutputMetricsTest(BaseTest):
 
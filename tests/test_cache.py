@@ -15,7 +15,9 @@ from unittest import TestCase
 from c7n import cache, config
 from argparse import Namespace
 from six.moves import cPickle as pickle
+import sqlite3
 import tempfile
+import time
 import mock
 import os
 
@@ -49,6 +51,71 @@ class MemCacheTest(TestCase):
             {'hello': 'world'})
 
 
+class SqlKvCacheTest(TestCase):
+
+    def get_cache(self, **kw):
+        path = os.path.join(tempfile.mkdtemp(), "cache.db")
+        self.addCleanup(lambda: [os.unlink(p) for p in (
+            path, path + "-wal", path + "-shm") if os.path.exists(p)])
+        kw.setdefault("cache_period", 60)
+        c = cache.SqlKvCache(Namespace(cache="sqlite://" + path, **kw))
+        self.addCleanup(c.close)
+        return c
+
+    def test_factory(self):
+        self.assertIsInstance(
+            cache.factory(Namespace(cache_period=5, cache="sqlite://x.db")),
+            cache.SqlKvCache)
+
+    def test_get_set(self):
+        c = self.get_cache()
+        self.assertEqual(c.size(), 0)
+        self.assertTrue(c.load())
+        k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+        self.assertEqual(c.get(k1), None)
+        c.save(k1, [1, 2, 3])
+        c.save({"resource": "asg"}, [4])
+        self.assertEqual(c.get(k1), [1, 2, 3])
+        self.assertTrue(c.size() > 0)
+
+        c2 = cache.SqlKvCache(Namespace(cache=c.config.cache, cache_period=60))
+        self.addCleanup(c2.close)
+        self.assertEqual(c2.get(k1), [1, 2, 3])
+        self.assertEqual(c2.get({"resource": "asg"}), [4])
+
+    def test_shared_connection(self):
+        c = self.get_cache()
+        c.save("key", "value")
+        c2 = cache.SqlKvCache(Namespace(cache=c.config.cache, cache_period=60))
+        self.addCleanup(c2.close)
+        self.assertEqual(c2.get("key"), "value")
+        self.assertIs(c2.conn, c.conn)
+        self.assertIs(c2.lock, c.lock)
+        conn = c.conn
+        c.close()
+        self.assertEqual(c2.get("key"), "value")
+        c2.close()
+        self.assertNotIn(c2.key, cache.SqlKvCache.connections)
+        self.assertRaises(sqlite3.ProgrammingError, conn.execute, "select 1")
+
+    def test_expiration(self):
+        c = self.get_cache(cache_period=1)
+        c.save("key", "value")
+        with mock.patch.object(cache.time, "time", return_value=time.time() + 61):
+            self.assertEqual(c.get("key"), None)
+            c.save("other", "value")
+        self.assertEqual(
+            c.conn.execute("select count(*) from c7n_cache").fetchone()[0], 1)
+
+    def test_eviction(self):
+        c = self.get_cache()
+        c.max_size = len(pickle.dumps("x" * 100, protocol=pickle.HIGHEST_PROTOCOL)) * 2
+        for i in range(4):
+            c.save(i, "x" * 100)
+        self.assertEqual([c.get(i) is not None for i in range(4)],
+                         [False, False, True, True])
+
+
 class FileCacheManagerTest(TestCase):
 
     def setUp(self):
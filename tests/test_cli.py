@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
+import logging
 import os
 import sys
 
@@ -165,6 +166,34 @@ class ValidateTest(CliTest):
         # duplicate policy names
         self.run_and_expect_failure(["custodian", "validate", yaml_file, yaml_file], 1)
 
+    def test_validate_cache(self):
+        policy = {"name": "foo", "resource": "s3",
+                  "actions": [{"type": "tag", "tags": {"custodian_cleanup": "yes"}}]}
+        yaml_file = self.write_policy_file({"policies": [policy]})
+        cache_file = os.path.join(self.get_temp_dir(), "validate.db")
+        self.run_and_expect_success(
+            ["custodian", "validate", "--cache", cache_file, yaml_file])
+
+        validated = []
+        self.patch(commands.Policy, "validate", lambda p: validated.append(p.name))
+        self.run_and_expect_success(
+            ["custodian", "validate", "--cache", cache_file, yaml_file])
+        self.assertEqual(validated, [])
+
+        # changed policies are revalidated
+        policy["actions"][0]["tags"]["custodian_cleanup"] = "no"
+        yaml_file = self.write_policy_file({"policies": [policy]})
+        self.run_and_expect_success(
+            ["custodian", "validate", "--cache", cache_file, yaml_file])
+        self.assertEqual(validated, ["foo"])
+
+    def test_validate_jobs(self):
+        files = [self.write_policy_file({"policies": [
+            {"name": name, "resource": "s3"}]}) for name in ("foo", "bar")]
+        self.run_and_expect_success(["custodian", "validate", "-j", "2"] + files)
+        self.run_and_expect_failure(
+            ["custodian", "validate", "-j", "2"] + files + files[:1], 1)
+
 
 class SchemaTest(CliTest):
 
@@ -495,6 +524,46 @@ class RunTest(CliTest):
             ]
         )
 
+    def test_ec2_jobs(self):
+        session_factory = self.replay_flight_data(
+            "test_ec2_state_transition_age_filter"
+        )
+
+        from c7n.policy import PolicyCollection
+
+        self.patch(
+            PolicyCollection,
+            "session_factory",
+            staticmethod(lambda x=None: session_factory),
+        )
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file(
+            {
+                "policies": [
+                    {"name": "ec2-running", "resource": "ec2",
+                     "filters": [{"State.Name": "running"}]},
+                    {"name": "ec2-terminated", "resource": "ec2",
+                     "filters": [{"State.Name": "terminated"}]},
+                ]
+            }
+        )
+
+        self.capture_logging("custodian", level=logging.DEBUG)
+        self.run_and_expect_success(
+            ["custodian", "run", "--cache-period", "0", "-j", "2",
+             "-s", temp_dir, yaml_file])
+
+        for name, count in (("ec2-running", 2), ("ec2-terminated", 1)):
+            with open(os.path.join(temp_dir, name, "resources.json")) as fh:
+                self.assertEqual(len(json.load(fh)), count)
+            with open(os.path.join(temp_dir, name, "custodian-run.log")) as fh:
+                policy_log = fh.read()
+            self.assertIn("policy:%s" % name, policy_log)
+            self.assertNotIn(
+                "policy:%s" % (name == "ec2-running" and "ec2-terminated" or "ec2-running"),
+                policy_log)
+
     def test_error(self):
         from c7n.policy import Policy
 
@@ -93,3 +93,17 @@ class Credential(BaseTest):
         client = local_session(factory).client('ec2')
         self.assertTrue(
             'check-ec2' in client._client_config.user_agent)
+
+    def test_client_pool(self):
+        factory = SessionFactory('us-east-1')
+        session = factory()
+        client = session.client('ec2')
+        self.assertIs(session.client('ec2'), client)
+        self.assertIsNot(session.client('ec2', region_name='us-west-2'), client)
+        self.assertIsNot(session.client('ec2', endpoint_url='https://localhost'), client)
+
+        # subscribers are registered on extant pooled clients
+        registered = []
+        factory.set_subscribers((registered.append,))
+        factory.update(session)
+        self.assertIn(client.meta, registered)
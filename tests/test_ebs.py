@@ -17,15 +17,18 @@ import sys
 from botocore.exceptions import ClientError
 import mock
 
+from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
 from c7n.executor import MainThreadExecutor
+from c7n.planner import ResourcePlanner
 from c7n.resources.ebs import (
     CopyInstanceTags,
     EncryptInstanceVolumes,
     CopySnapshot,
     Delete,
     ErrorHandler,
-    SnapshotQueryParser as QueryParser
+    SnapshotQueryParser as QueryParser,
+    SnapshotReferences
 )
 
 from .common import BaseTest
@@ -266,6 +269,82 @@ class SnapshotUnusedTest(BaseTest):
         )
         resources = policy.run()
         self.assertEqual(len(resources), 2)
+        self.assertTrue(all(r["c7n:SnapshotReferences"] for r in resources))
+
+
+class SnapshotReferencesTest(BaseTest):
+
+    def get_manager(self, populations):
+        calls = []
+
+        def get_resources(resource_type):
+            return lambda *args: calls.append(resource_type) or populations[resource_type]
+
+        class Manager:
+
+            def get_resource_manager(self, resource_type):
+                return Bag(
+                    resources=get_resources(resource_type),
+                    get_resources=get_resources(resource_type),
+                    get_asg_templates=lambda asgs: {
+                        ('lt-1', '2'): [a['AutoScalingGroupName'] for a in asgs]})
+
+        return Manager(), calls
+
+    def test_snapshot_references(self):
+        ebs = {'Ebs': {'SnapshotId': 'snap-1'}}
+        populations = {
+            'ami': [{'ImageId': 'ami-1', 'BlockDeviceMappings': [
+                ebs, {'DeviceName': '/dev/sdb', 'VirtualName': 'ephemeral0'}]},
+                {'ImageId': 'ami-2', 'BlockDeviceMappings': None}],
+            'asg': [{'AutoScalingGroupName': 'asg-1'}],
+            'launch-template-version': [{
+                'LaunchTemplateId': 'lt-1', 'VersionNumber': 2,
+                'LaunchTemplateData': {'BlockDeviceMappings': [
+                    ebs, {'Ebs': {'SnapshotId': 'snap-2'}}]}}],
+            'launch-config': []}
+        manager, calls = self.get_manager(populations)
+        index = SnapshotReferences().refresh(manager)
+        self.assertEqual(
+            index.get_references('snap-1'),
+            [('ami', 'ami-1'), ('launch-template-version', 'lt-1:2')])
+        self.assertEqual(index.get_references('snap-2', ('ami',)), [])
+        self.assertEqual(index.get_references('snap-3'), [])
+        # launch configs are only scanned when groups use them
+        self.assertEqual(calls, ['ami', 'asg', 'launch-template-version'])
+
+        index.refresh(manager)
+        self.assertEqual(len(calls), 3)
+
+        populations['ami'] = []
+        index.invalidate('ami', ['deregister'])
+        index.invalidate('ebs-snapshot', ['delete'])
+        index.refresh(manager)
+        self.assertEqual(calls[3:], ['ami'])
+        self.assertEqual(
+            index.get_references('snap-1'), [('launch-template-version', 'lt-1:2')])
+
+    def test_snapshot_references_shared(self):
+        factory = self.replay_flight_data("test_ebs_snapshot_unused")
+        policies = [
+            self.load_policy(
+                {"name": name, "resource": "ebs-snapshot",
+                 "filters": [{"type": "unused", "value": value}]},
+                session_factory=factory)
+            for name, value in (("snap-unused", True), ("snap-used", False))]
+        planner = ResourcePlanner(policies)
+        scans = []
+        scan_ami = SnapshotReferences.scan_ami
+
+        def record_scan(index, manager):
+            scans.append(manager.data['name'])
+            return scan_ami(index, manager)
+
+        self.patch(SnapshotReferences, "scan_ami", record_scan)
+        self.assertEqual(len(policies[0].run()), 1)
+        self.assertEqual(len(policies[1].run()), 2)
+        self.assertEqual(scans, ["snap-unused"])
+        self.assertEqual(len(planner.indexes), 1)
 
 
 class SnapshotTrimTest(BaseTest):
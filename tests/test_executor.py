@@ -48,6 +48,15 @@ class ExecutorBase:
 class ThreadExecutorTest(ExecutorBase, unittest.TestCase):
     executor_factory = executor.ThreadPoolExecutor
 
+    def test_execution_scope(self):
+        self.assertIsNone(executor.get_execution_scope())
+        with executor.execution_scope('policy-a'):
+            with self.executor_factory(max_workers=2) as w:
+                scopes = list(w.map(
+                    lambda x: executor.get_execution_scope(), range(3)))
+        self.assertEqual(scopes, ['policy-a'] * 3)
+        self.assertIsNone(executor.get_execution_scope())
+
 
 class MainExecutorTest(ExecutorBase, unittest.TestCase):
     executor_factory = executor.MainThreadExecutor
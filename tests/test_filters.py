@@ -18,6 +18,8 @@ from dateutil.parser import parse as parse_date
 import unittest
 import os
 
+import mock
+
 from c7n.exceptions import PolicyValidationError
 from c7n.executor import MainThreadExecutor
 from c7n import filters as base_filters
@@ -25,7 +27,8 @@ from c7n.resources.ec2 import filters
 from c7n.resources.elb import ELB
 from c7n.utils import annotation
 from .common import instance, event_data, Bag, BaseTest
-from c7n.filters.core import ValueRegex, parse_date as core_parse_date
+from c7n.filters import vector
+from c7n.filters.core import ANNOTATION_KEY, ValueRegex, parse_date as core_parse_date
 
 
 class BaseFilterTest(unittest.TestCase):
@@ -239,6 +242,69 @@ class TestValueFilter(unittest.TestCase):
         self.assertEqual(vf.v, None)
         self.assertFalse(res)
 
+    def test_value_compiled_sentinel(self):
+        vf = filters.factory({
+            "type": "value", "key": "CreateTime",
+            "value_type": "date", "op": "gt", "value": "2019/01/01"})
+        vf._initialize_value()
+        self.assertEqual(
+            vf.get_value_sentinel(), datetime(2019, 1, 1, tzinfo=tz.tzutc()))
+        self.assertTrue(vf.match({"CreateTime": "2019-06-01T00:00:00+00:00"}))
+        self.assertFalse(vf.match({"CreateTime": "2018-06-01T00:00:00+00:00"}))
+
+        vf = filters.factory({
+            "type": "value", "key": "Cidr",
+            "value_type": "cidr", "op": "in", "value": "10.0.0.0/16"})
+        self.assertTrue(vf.match({"Cidr": "10.0.1.0"}))
+        self.assertFalse(vf.match({"Cidr": "10.1.1.0"}))
+
+        vf = filters.factory({
+            "type": "value", "key": "Version",
+            "value_type": "version", "op": "gte", "value": "5.7"})
+        self.assertTrue(vf.match({"Version": "5.10.1"}))
+        self.assertFalse(vf.match({"Version": "5.6.40"}))
+
+    def test_value_compiled_age(self):
+        vf = filters.factory({
+            "type": "value", "key": "LaunchTime",
+            "value_type": "age", "op": "gt", "value": 1})
+        vf._initialize_value()
+        self.assertEqual(vf.get_value_sentinel(), timedelta(1))
+        now = datetime.now(tz=tz.tzutc())
+        self.assertTrue(vf.match({"LaunchTime": now - timedelta(2)}))
+        self.assertFalse(vf.match({"LaunchTime": now}))
+
+    def test_value_compiled_membership(self):
+        vf = filters.factory({
+            "type": "value", "key": "Thing", "op": "not-in",
+            "value": ["Foo", "Bar"]})
+        self.assertTrue(vf.match({"Thing": "Baz"}))
+        self.assertFalse(vf.match({"Thing": "Foo"}))
+        # unhashable resource values fall back to list membership
+        self.assertTrue(vf.match({"Thing": ["Foo"]}))
+        self.assertTrue(vf.match({}))
+
+    def test_value_compiled_once(self):
+        vf = filters.factory({
+            "type": "value", "key": "Name", "op": "regex", "value": "^web-.*"})
+        self.assertTrue(vf.match({"Name": "WEB-1"}))
+        compiled = vf._match
+        self.assertFalse(vf.match({"Name": "db-1"}))
+        self.assertFalse(vf.match({"Name": 5}))
+        self.assertIs(vf._match, compiled)
+
+    def test_value_compiled_accessor(self):
+        resource = {"a.b": 1, "a": {"b": 2},
+                    "Tags": [{"Key": "Env", "Value": "prod-1"}]}
+        vf = filters.factory({"type": "value", "key": "a.b", "value": 1})
+        self.assertTrue(vf.match(resource))
+        vf = filters.factory({"type": "value", "key": "a.b", "value": 2})
+        self.assertTrue(vf.match({"a": {"b": 2}}))
+        vf = filters.factory({
+            "type": "value", "key": "tag:Env", "value_regex": "^(\\w+)-.*",
+            "value": "prod"})
+        self.assertTrue(vf.match(resource))
+
 
 class TestAgeFilter(unittest.TestCase):
 
@@ -444,6 +510,14 @@ class TestValueTypes(BaseFilterTest):
         # nothing should be able to parse this
         t("1234567890123456", None)
 
+    def test_parse_date_iso_fallback(self):
+        expected = datetime(2019, 4, 1, 10, 30, tzinfo=tz.tzutc())
+        self.assertEqual(core_parse_date('2019-04-01T10:30:00+00:00'), expected)
+        # python 3.6 lacks datetime.fromisoformat
+        with mock.patch('c7n.filters.core.FROM_ISO_FORMAT', None):
+            self.assertEqual(core_parse_date('2019-04-01T10:30:00+00:00'), expected)
+            self.assertEqual(core_parse_date('2019-04-01T10:30:00Z'), expected)
+
     def test_version(self):
         fdata = {
             "type": "value",
@@ -1003,6 +1077,275 @@ class TestFilterRegistry(unittest.TestCase):
         self.assertRaises(PolicyValidationError, reg.factory, {"type": ""})
 
 
+class TestFilterOrdering(BaseTest):
+
+    def get_resources(self):
+        return [{"InstanceId": "i-%d" % idx,
+                 "State": {"Name": idx % 2 and "running" or "stopped"}}
+                for idx in range(4)]
+
+    def test_order_filters(self):
+        p = self.load_policy({
+            "name": "ec2-order",
+            "resource": "ec2",
+            "filters": [
+                {"type": "metrics", "name": "CPUUtilization", "value": 1, "op": "lt"},
+                {"type": "value", "key": '"c7n.metrics"', "value": "present"},
+                {"State.Name": "running"},
+                {"type": "value", "value_type": "resource_count", "op": "gt", "value": 1},
+                {"type": "instance-age", "days": 30},
+                {"or": [{"InstanceType": "t2.micro"}, {"tag:Env": "dev"}]}]})
+        ordered = base_filters.core.order_filters(p.resource_manager.filters)
+        self.assertEqual(
+            [f.type for f in ordered],
+            ["value", "metrics", "value", "value", "instance-age", "or"])
+        self.assertEqual(ordered[1:3], p.resource_manager.filters[:2])
+        self.assertFalse(ordered[0].is_remote())
+        self.assertFalse(ordered[5].is_remote())
+
+    def test_filter_classification(self):
+        p = self.load_policy({
+            "name": "ec2-classify",
+            "resource": "ec2",
+            "filters": [
+                {"not": [{"type": "value", "value_type": "resource_count",
+                          "op": "gt", "value": 1}]},
+                {"c7n:MatchedFilters": "present"},
+                {"type": "value", "key": "Description", "value": "c7n resource_count"},
+                {"type": "ssm"}]})
+        filters = p.resource_manager.filters
+        self.assertEqual(
+            [base_filters.core.is_resource_set_filter(f) for f in filters],
+            [True, False, False, False])
+        self.assertEqual(
+            [base_filters.core.is_annotation_filter(f) for f in filters],
+            [False, True, False, True])
+
+    def test_or_optimized(self):
+        p = self.load_policy({
+            "name": "ec2-order",
+            "resource": "ec2",
+            "filters": [{"or": [
+                {"type": "metrics", "name": "CPUUtilization", "value": 1, "op": "lt"},
+                {"State.Name": "running"}]}]},
+            config={"optimize_filters": True})
+        metrics = p.resource_manager.filters[0].filters[0]
+        evaluated = []
+
+        def process(resources, event=None):
+            evaluated.extend([r["InstanceId"] for r in resources])
+            return resources[:1]
+
+        self.patch(metrics, "process", process)
+        resources = p.resource_manager.filter_resources(self.get_resources())
+        # metrics annotate resources, so matched resources are evaluated
+        self.assertEqual(evaluated, ["i-0", "i-1", "i-2", "i-3"])
+        self.assertEqual(
+            sorted([r["InstanceId"] for r in resources]), ["i-0", "i-1", "i-3"])
+        self.assertEqual(
+            [(s["filter"], s["block"], s["remote"], s["resources-in"], s["resources-out"])
+             for s in p.resource_manager.ctx.filter_stats],
+            [("value", "or", False, 4, 2),
+             ("metrics", "or", True, 4, 1),
+             ("or", None, True, 4, 3)])
+
+        # filters which don't annotate skip matched resources
+        del evaluated[:]
+        self.patch(base_filters.core, "is_annotating_filter", lambda f: f is not metrics)
+        p.resource_manager.filter_resources(self.get_resources())
+        self.assertEqual(evaluated, ["i-0", "i-2"])
+
+    def test_or_optimized_annotations(self):
+        def run(optimize):
+            p = self.load_policy({
+                "name": "ec2-or",
+                "resource": "ec2",
+                "filters": [{"or": [{"tag:A": "present"}, {"tag:B": "present"}]}]},
+                config={"optimize_filters": optimize})
+            resources = p.resource_manager.filter_resources([
+                {"InstanceId": "i-0", "Tags": [
+                    {"Key": "A", "Value": "1"}, {"Key": "B", "Value": "1"}]}])
+            return [r[ANNOTATION_KEY] for r in resources]
+
+        self.assertEqual(run(False), [["tag:A", "tag:B"]])
+        self.assertEqual(run(True), run(False))
+
+    def test_and_unoptimized(self):
+        p = self.load_policy({
+            "name": "ec2-order",
+            "resource": "ec2",
+            "filters": [
+                {"type": "metrics", "name": "CPUUtilization", "value": 1, "op": "lt"},
+                {"State.Name": "running"}]})
+        metrics = p.resource_manager.filters[0]
+        evaluated = []
+
+        def process(resources, event=None):
+            evaluated.extend([r["InstanceId"] for r in resources])
+            return resources
+
+        self.patch(metrics, "process", process)
+        resources = p.resource_manager.filter_resources(self.get_resources())
+        self.assertEqual(len(evaluated), 4)
+        self.assertEqual([r["InstanceId"] for r in resources], ["i-1", "i-3"])
+
+
+@unittest.skipIf(not vector.HAVE_NUMPY, "numpy not installed")
+class TestVectorFilters(BaseTest):
+
+    def get_resources(self, count=vector.MIN_RESOURCES):
+        now = datetime.now(tz=tz.tzutc())
+        states = ["running", "stopped", None]
+        sizes = [1, 2.5, "3", None, True, [4], 10]
+        resources = []
+        for idx in range(count):
+            r = {"InstanceId": "i-%d" % idx,
+                 "Size": sizes[idx % len(sizes)],
+                 "LaunchTime": (now - timedelta(days=idx % 60, hours=1)).isoformat(),
+                 "Tags": [{"Key": "Owner", "Value": "team-%d@example.com" % (idx % 5)}]}
+            if states[idx % 3]:
+                r["State"] = {"Name": states[idx % 3]}
+            if idx % 4:
+                r["Tags"].append({"Key": "Env", "Value": ["dev", "prod", ""][idx % 3]})
+            if idx % 11 == 0:
+                r["LaunchTime"] = "not a date"
+            resources.append(r)
+        return resources
+
+    def assertVectorized(self, filters):
+        results = []
+        for optimize in (False, True):
+            p = self.load_policy(
+                {"name": "ec2-vector", "resource": "ec2", "filters": filters},
+                config={"optimize_filters": optimize})
+            plan = vector.get_filter_plan(
+                p.resource_manager.filters, self.get_resources(), p.resource_manager)
+            self.assertEqual(
+                [f.type for f in plan if isinstance(f, vector.VectorFilterSet)],
+                optimize and ["vector"] or [])
+            results.append([
+                (r["InstanceId"], r.get(ANNOTATION_KEY))
+                for r in p.resource_manager.filter_resources(self.get_resources())])
+        self.assertEqual(results[0], results[1])
+        return results[1]
+
+    def test_vector_equality(self):
+        resources = self.assertVectorized([
+            {"State.Name": "running"},
+            {"tag:Env": "present"},
+            {"type": "value", "key": "tag:Env", "op": "ne", "value": "prod"}])
+        self.assertTrue(resources)
+        self.assertEqual(resources[0][1], ["State.Name", "tag:Env", "tag:Env"])
+
+    def test_vector_absent_empty(self):
+        self.assertTrue(self.assertVectorized([
+            {"State.Name": "absent"}, {"tag:Env": "empty"}]))
+        self.assertTrue(self.assertVectorized([{"tag:Env": "not-null"}]))
+
+    def test_vector_membership(self):
+        self.assertTrue(self.assertVectorized([
+            {"type": "value", "key": "State.Name", "op": "in", "value": ["running", "x"]},
+            {"type": "value", "key": "tag:Env", "op": "not-in", "value": ["dev"]}]))
+
+    def test_vector_numbers(self):
+        self.assertTrue(self.assertVectorized([
+            {"type": "value", "key": "Size", "op": "gte", "value": 1}]))
+        self.assertTrue(self.assertVectorized([
+            {"type": "value", "key": "Size", "op": "lt", "value": 2.5}]))
+
+    def test_vector_dates(self):
+        self.assertTrue(self.assertVectorized([
+            {"type": "value", "key": "LaunchTime", "value_type": "age",
+             "op": "gt", "value": 30}]))
+        self.assertTrue(self.assertVectorized([
+            {"type": "value", "key": "LaunchTime", "value_type": "expiration",
+             "op": "lte", "value": -10}]))
+
+    def test_vector_value_regex(self):
+        self.assertTrue(self.assertVectorized([
+            {"type": "value", "key": "tag:Owner", "value_regex": "^([^@]+)@.*",
+             "op": "glob", "value": "team-[12]"}]))
+
+    def test_vector_plan(self):
+        p = self.load_policy({
+            "name": "ec2-vector",
+            "resource": "ec2",
+            "filters": [
+                {"State.Name": "running"},
+                {"tag:Env": "present"},
+                {"or": [{"tag:Env": "dev"}, {"tag:Env": "prod"}]},
+                {"type": "value", "key": "Size", "value_type": "expr", "value": "Size"},
+                {"tag:Owner": "present"}]},
+            config={"optimize_filters": True})
+        filters = p.resource_manager.filters
+        manager = p.resource_manager
+        self.assertEqual(
+            vector.get_filter_plan(filters, self.get_resources(10), manager), filters)
+        plan = vector.get_filter_plan(filters, self.get_resources(), manager)
+        self.assertEqual(
+            [f.type for f in plan], ["vector", "or", "value", "vector"])
+        self.assertEqual(plan[0].filters, filters[:2])
+
+        manager.filter_resources(self.get_resources())
+        self.assertEqual(
+            [(s["filter"], s["block"], s["resources-in"], s["resources-out"])
+             for s in manager.ctx.filter_stats],
+            [("value", None, 1000, 334),
+             ("value", None, 334, 250),
+             ("value", "or", 250, 250),
+             ("value", "or", 250, 0),
+             ("or", None, 250, 250),
+             ("value", None, 250, 0)])
+
+
+class TestBatchMetrics(BaseTest):
+
+    def test_metrics_batch(self):
+        session_factory = self.replay_flight_data("test_metrics_batch")
+        p = self.load_policy(
+            {
+                "name": "ec2-idle",
+                "resource": "ec2",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "name": "CPUUtilization",
+                        "value": 10,
+                        "op": "lt",
+                        "missing-value": 0,
+                        "batch": True,
+                    }
+                ],
+            },
+            session_factory=session_factory,
+        )
+        self.assertEqual(
+            p.resource_manager.filters[0].get_permissions(),
+            ("cloudwatch:GetMetricData",))
+        resources = p.run()
+        self.assertEqual(
+            sorted([r["InstanceId"] for r in resources]),
+            ["i-1aebf7c0", "i-b2d2a876"])
+        metrics = {r["InstanceId"]: r["c7n.metrics"]["AWS/EC2.CPUUtilization.Average"]
+                   for r in resources}
+        self.assertEqual(metrics["i-b2d2a876"][0]["Average"], 5.0)
+        self.assertEqual(metrics["i-1aebf7c0"][0]["c7n:detail"], "Fill value for missing data")
+
+    def test_metrics_batch_chunk_size(self):
+        p = self.load_policy({
+            "name": "ec2-idle",
+            "resource": "ec2",
+            "filters": [{"type": "metrics", "name": "CPUUtilization",
+                         "value": 10, "days": 30, "period": 300, "batch": True}]})
+        f = p.resource_manager.filters[0]
+        f.end = datetime.utcnow()
+        f.start = f.end - timedelta(30)
+        f.period = 300
+        self.assertEqual(f.get_metric_data_chunk_size(), 11)
+        f.period = 86400
+        self.assertEqual(f.get_metric_data_chunk_size(), 500)
+
+
 class TestMissingMetrics(BaseTest):
 
     def test_missing_metrics(self):
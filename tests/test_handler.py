@@ -72,6 +72,7 @@ class HandleTest(BaseTest):
         work_dir = self.change_cwd()
         self.patch(handler, 'policy_data', None)
         self.patch(handler, 'policy_config', None)
+        self.patch(handler, 'policies', None)
 
         # don't require api creds to resolve account id
         if 'execution-options' not in policy_data:
@@ -130,6 +131,60 @@ class HandleTest(BaseTest):
         self.assertFalse('Skipping failed operation: foi' in output.getvalue())
         mock_collection.from_data.assert_called_once()
 
+    def test_dispatch_err_batch_event(self):
+        output, executions = self.setupLambdaEnv({
+            'execution-options': {'output_dir': 's3://xyz', 'account_id': '004'},
+            'policies': [{'resource': 'ec2', 'name': 'xyz'}]},
+            log_level=logging.DEBUG)
+
+        failed = {'eventSource': 'aws:sqs', 'body': json.dumps(
+            {'detail': {'errorCode': 'unauthorized'}})}
+        ok = {'eventSource': 'aws:sqs', 'body': json.dumps({'detail': {}})}
+        self.assertEqual(handler.dispatch_event({'Records': [failed]}, None), None)
+        self.assertEqual(handler.dispatch_event({'Records': [failed, ok]}, None), True)
+        self.assertTrue('Skipping 1 failed operations' in output.getvalue())
+        self.assertEqual(executions[0][0]['Records'], [ok])
+
+    def test_dispatch_warm_invocation(self):
+        output, executions = self.setupLambdaEnv({
+            'execution-options': {'output_dir': 's3://xyz', 'account_id': '004'},
+            'policies': [{'resource': 'ec2', 'name': 'xyz'}]})
+        handler.dispatch_event({'detail': {}}, None)
+        policies = handler.policies
+
+        # simulate a member account role assumption during the invocation
+        policy = list(policies)[0]
+        policy.options['account_id'] = '005'
+        policy.session_factory.assume_role = 'arn:aws:iam::005:role/member'
+
+        handler.dispatch_event({'detail': {}}, None)
+        self.assertIs(handler.policies, policies)
+        self.assertEqual(len(executions), 2)
+        self.assertEqual(policy.options['account_id'], '004')
+        self.assertEqual(policy.session_factory.assume_role, None)
+
+    def test_dispatch_warm_value_from(self):
+        values = self.get_temp_dir()
+        values = os.path.join(values, 'names.txt')
+        with open(values, 'w') as fh:
+            fh.write('a\n')
+        self.setupLambdaEnv({
+            'execution-options': {'output_dir': 's3://xyz', 'account_id': '004'},
+            'policies': [{'resource': 'ec2', 'name': 'xyz', 'filters': [{
+                'type': 'value', 'key': 'Name', 'op': 'in',
+                'value_from': {'url': 'file://%s' % values, 'format': 'txt'}}]}]})
+        handler.dispatch_event({'detail': {}}, None)
+        f = list(handler.policies)[0].resource_manager.filters[0]
+        self.assertTrue(f({'Name': 'a'}))
+
+        # value sources are resolved again by warm invocations
+        with open(values, 'w') as fh:
+            fh.write('b\n')
+        handler.dispatch_event({'detail': {}}, None)
+        self.assertIs(list(handler.policies)[0].resource_manager.filters[0], f)
+        self.assertFalse(f({'Name': 'a'}))
+        self.assertTrue(f({'Name': 'b'}))
+
     def test_dispatch_err_handle(self):
         output, executions = self.setupLambdaEnv({
             'execution-options': {'output_dir': 's3://xyz', 'account_id': '004'},
@@ -49,6 +49,7 @@ from c7n.resources.iam import (
     NoSpecificIamRoleManagedPolicy,
     PolicyQueryParser
 )
+from c7n.resources.iamgraph import AuthorizationGraph
 
 from c7n.executor import MainThreadExecutor
 
@@ -945,6 +946,96 @@ class IamManagedPolicyUsage(BaseTest):
         self.assertEqual(len(resources), 2)
 
 
+class IamAuthorizationGraphTest(BaseTest):
+
+    def test_check_permissions_local(self):
+        factory = self.replay_flight_data("test_iam_role_check_permissions_local")
+        p = self.load_policy({
+            "name": "iam-role-check-local",
+            "resource": "iam-role",
+            "filters": [{
+                "type": "check-permissions",
+                "evaluation": "local",
+                "match": "denied",
+                "actions": ["iam:CreateUser"]}]},
+            session_factory=factory)
+        self.assertIn(
+            "iam:GetAccountAuthorizationDetails",
+            p.resource_manager.filters[0].get_permissions())
+        resources = p.run()
+        self.assertEqual(
+            {r["RoleName"]: [(e["EvalDecision"], e["MissingContextValues"])
+                             for e in r["c7n:perm-matches"]] for r in resources},
+            {"bounded-role": [("implicitDeny", [])],
+             "reader-role": [("implicitDeny", [])],
+             # conditional statements are evaluated with the simulator
+             "conditional-role": [("implicitDeny", ["aws:MultiFactorAuthPresent"])]})
+
+    def test_has_specific_managed_policy_details(self):
+        factory = self.replay_flight_data("test_iam_role_check_permissions_local")
+        self.patch(SpecificIamRoleManagedPolicy, "authorization_details_threshold", 1)
+        p = self.load_policy({
+            "name": "iam-role-managed-policy",
+            "resource": "iam-role",
+            "filters": [{
+                "type": "has-specific-managed-policy",
+                "value": "AdministratorAccess"}]},
+            session_factory=factory)
+        resources = p.run()
+        self.assertEqual(
+            sorted([r["RoleName"] for r in resources]), ["admin-role", "bounded-role"])
+
+    def test_authorization_graph(self):
+        arn = "arn:aws:iam::123456789012:%s/%s"
+        graph = AuthorizationGraph({
+            "UserDetailList": [{
+                "UserName": "alice", "Arn": arn % ("user", "dev/alice"),
+                "GroupList": ["devs"],
+                "UserPolicyList": [{"PolicyName": "no-delete", "PolicyDocument": {
+                    "Statement": {"Effect": "Deny", "Action": "*:Delete*",
+                                  "Resource": "*"}}}],
+                "AttachedManagedPolicies": []}],
+            "GroupDetailList": [{
+                "GroupName": "devs", "Arn": arn % ("group", "devs"),
+                "GroupPolicyList": [],
+                "AttachedManagedPolicies": [{
+                    "PolicyName": "dev", "PolicyArn": arn % ("policy", "dev")}]}],
+            "RoleDetailList": [],
+            "Policies": [{
+                "Arn": arn % ("policy", "dev"), "DefaultVersionId": "v1",
+                "PolicyVersionList": [{"VersionId": "v1", "IsDefaultVersion": True,
+                                       "Document": json.dumps({"Statement": [
+                                           {"Effect": "Allow", "Action": ["ec2:*", "S3:Get*"],
+                                            "Resource": "*"},
+                                           {"Effect": "Allow", "Action": "s3:PutObject",
+                                            "Resource": "arn:aws:s3:::bucket/*"}]})}]}]})
+
+        def decisions(principal, actions):
+            evaluations = graph.evaluate(principal, actions)
+            return evaluations and [e["EvalDecision"] for e in evaluations]
+
+        self.assertEqual(
+            decisions(arn % ("user", "dev/alice"),
+                      ["ec2:RunInstances", "s3:GetObject", "ec2:DeleteVolume", "iam:GetUser"]),
+            ["allowed", "allowed", "explicitDeny", "implicitDeny"])
+        # principals are also found without their path
+        self.assertEqual(
+            decisions(arn % ("user", "alice"), ["s3:getobject"]), ["allowed"])
+        self.assertEqual(
+            decisions(arn % ("group", "devs"), ["ec2:DeleteVolume"]), ["allowed"])
+        # resource scoped statements can't be decided locally
+        self.assertEqual(decisions(arn % ("user", "alice"), ["s3:PutObject"]), None)
+        # nor unknown principals
+        self.assertEqual(
+            decisions("arn:aws:iam::210987654321:user/alice", ["s3:GetObject"]), None)
+        self.assertEqual(
+            [e["MatchedStatements"] for e in graph.evaluate(
+                arn % ("user", "alice"), ["ec2:DeleteVolume"])],
+            [[{"SourcePolicyId": "no-delete", "SourcePolicyType": "user"}]])
+        self.assertEqual(
+            graph.get_managed_policies(arn % ("group", "devs")), ["dev"])
+
+
 class IamInlinePolicyUsage(BaseTest):
 
     def test_iam_user_has_inline_policy(self):
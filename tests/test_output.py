@@ -22,8 +22,8 @@ from dateutil.parser import parse as date_parse
 
 from c7n.ctx import ExecutionContext
 from c7n.config import Config
-from c7n.output import DirectoryOutput, LogFile, metrics_outputs
-from c7n.resources.aws import S3Output, MetricsOutput
+from c7n.output import DirectoryOutput, GzipFileHandler, LogFile, metrics_outputs
+from c7n.resources.aws import S3Output, MetricsOutput, get_uploader
 from c7n.testing import mock_datetime_now, TestUtils
 
 from .common import Bag, BaseTest
@@ -146,6 +146,71 @@ class S3OutputTest(TestUtils):
             extra_args={"ACL": "bucket-owner-full-control", "ServerSideEncryption": "AES256"},
         )
 
+    def test_stream_upload(self):
+        output_dir = "s3://cloud-custodian/policies?stream=true"
+        ctx = ExecutionContext(
+            None, Bag(name="xyz", provider_name="ostack"),
+            Config.empty(output_dir=output_dir))
+        output = S3Output(ctx, {'url': output_dir, 'stream': 'true'})
+        self.addCleanup(shutil.rmtree, output.root_dir, ignore_errors=True)
+        ctx.output = output
+        ctx.metrics = metrics = mock.MagicMock()
+        uploaded = {}
+
+        def upload_file(path, bucket, key, extra_args):
+            with gzip.open(path) as fh:
+                uploaded[key] = fh.read()
+
+        output.transfer = mock.MagicMock()
+        output.transfer.upload_file = upload_file
+
+        log_output = LogFile(ctx, {})
+        self.assertTrue(isinstance(log_output.get_handler(), GzipFileHandler))
+        output.write_file("resources.json", "[]")
+        with open(os.path.join(output.root_dir, "opted_out.json"), "w") as fh:
+            fh.write("{}")
+        output.__exit__()
+        get_uploader().flush()
+
+        prefix = output.key_prefix.lstrip('/')
+        self.assertNotIn("?", prefix)
+        self.assertEqual(uploaded, {
+            "%s/resources.json.gz" % prefix: b"[]",
+            "%s/opted_out.json.gz" % prefix: b"{}",
+            "%s/custodian-run.log.gz" % prefix: b""})
+        self.assertFalse(os.path.exists(output.root_dir))
+        metrics.put_metric.assert_any_call(
+            'OutputUploadBytes', mock.ANY, 'Bytes', Scope='Policy', buffer=False)
+
+    def test_stream_upload_error(self):
+        output_dir = "s3://cloud-custodian/policies?stream=true"
+        ctx = ExecutionContext(
+            None, Bag(name="xyz", provider_name="ostack"),
+            Config.empty(output_dir=output_dir))
+        output = S3Output(ctx, {'url': output_dir, 'stream': 'true'})
+        self.addCleanup(shutil.rmtree, output.root_dir, ignore_errors=True)
+        ctx.output = output
+        ctx.metrics = metrics = mock.MagicMock()
+        uploaded = []
+
+        def upload_file(path, bucket, key, extra_args):
+            if key.endswith("resources.json.gz"):
+                raise ValueError("denied")
+            uploaded.append(key)
+
+        output.transfer = mock.MagicMock()
+        output.transfer.upload_file = upload_file
+        LogFile(ctx, {}).get_handler()
+        output.write_file("resources.json", "[]")
+        self.assertRaises(ValueError, output.__exit__)
+        get_uploader().flush()
+
+        # the run log is still uploaded
+        self.assertEqual(
+            uploaded, ["%s/custodian-run.log.gz" % output.key_prefix.lstrip('/')])
+        metrics.put_metric.assert_any_call(
+            'OutputUploadErrors', 1, 'Count', Scope='Policy', buffer=False)
+
     def test_sans_prefix(self):
         output = self.get_s3_output()
 
@@ -0,0 +1,136 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from c7n.config import Bag
+from c7n.planner import RelatedResourceIndex, ResourcePlanner
+from c7n.query import DescribeSource
+
+from .common import BaseTest
+
+
+class ResourcePlannerTest(BaseTest):
+
+    def get_policies(self, session_factory, *policies):
+        return [self.load_policy(p, session_factory=session_factory) for p in policies]
+
+    def test_planner_groups(self):
+        policies = self.get_policies(
+            None,
+            {'name': 'ec2-a', 'resource': 'ec2'},
+            {'name': 'ec2-b', 'resource': 'ec2', 'filters': [{'State.Name': 'running'}]},
+            {'name': 'ec2-c', 'resource': 'ec2', 'query': [
+                {'instance-state-name': 'running'}]},
+            {'name': 'ebs-a', 'resource': 'ebs'})
+        planner = ResourcePlanner(policies)
+        self.assertEqual(
+            planner.get_stats(),
+            {'groups': 3, 'shared-groups': 1, 'shared-policies': 2})
+        self.assertEqual(policies[0].ctx.planner, planner)
+
+    def test_planner_shared_fetch(self):
+        factory = self.replay_flight_data('test_ec2_state_transition_age_filter')
+        policies = self.get_policies(
+            factory,
+            {'name': 'ec2-a', 'resource': 'ec2'},
+            {'name': 'ec2-b', 'resource': 'ec2',
+             'filters': [{'State.Name': 'running'}]})
+        planner = ResourcePlanner(policies)
+
+        fetches = []
+        original = DescribeSource.resources
+
+        def resources(source, query):
+            fetches.append(query)
+            return original(source, query)
+
+        self.patch(DescribeSource, 'resources', resources)
+        first = policies[0].resource_manager.resources()
+        first[0]['c7n:annotation'] = True
+        second = policies[1].resource_manager.resources()
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(
+            [r['InstanceId'] for r in second],
+            [r['InstanceId'] for r in first if r['State']['Name'] == 'running'])
+        self.assertFalse([r for r in second if 'c7n:annotation' in r])
+        # every policy in the group has consumed the snapshot
+        self.assertIsNone(list(planner.groups.values())[0].data)
+
+
+class RelatedManager:
+
+    type = 'security-group'
+    source_type = 'describe'
+
+    def __init__(self, ids):
+        self.config = Bag(account_id='123', region='us-east-1')
+        self.ids = ids
+        self.calls = []
+
+    def get_model(self):
+        return Bag(id='GroupId')
+
+    def resources(self):
+        self.calls.append(None)
+        return [{'GroupId': i} for i in self.ids]
+
+    def get_resources(self, ids):
+        self.calls.append(sorted(ids))
+        return [{'GroupId': i} for i in ids if i in self.ids]
+
+
+class RelatedResourceIndexTest(BaseTest):
+
+    def test_related_lookup(self):
+        index = RelatedResourceIndex()
+        manager = RelatedManager(['sg-%d' % i for i in range(20)])
+        self.assertEqual(
+            index.get_resources(manager, ['sg-1', 'sg-2', 'sg-x'], 4),
+            {'sg-1': {'GroupId': 'sg-1'}, 'sg-2': {'GroupId': 'sg-2'}})
+        # indexed and known absent ids aren't fetched again
+        index.get_resources(manager, ['sg-1', 'sg-x', 'sg-3'], 2)
+        self.assertEqual(manager.calls, [['sg-1', 'sg-2', 'sg-x'], ['sg-3']])
+        # enough missing ids fetch the full population
+        related = index.get_resources(manager, ['sg-5', 'sg-6', 'sg-7'], 3)
+        self.assertEqual(len(related), 3)
+        index.get_resources(manager, ['sg-8', 'sg-9', 'sg-10', 'sg-11'], 3)
+        self.assertEqual(len(manager.calls), 3)
+
+        index.invalidate('123', 'us-east-1', 'security-group')
+        index.get_resources(manager, ['sg-1'], 3)
+        self.assertEqual(len(manager.calls), 4)
+
+    def test_related_filter_shared(self):
+        factory = self.replay_flight_data('test_ec2_security_group_filter')
+        sg_filter = {
+            'type': 'security-group', 'key': 'GroupName',
+            'value': '(.*PROD-ONLY.*)', 'op': 'regex'}
+        policies = [
+            self.load_policy({'name': name, 'resource': 'ec2', 'filters': [sg_filter]},
+                             session_factory=factory)
+            for name in ('ec2-sg-a', 'ec2-sg-b')]
+        planner = ResourcePlanner(policies)
+
+        fetches = []
+        original = DescribeSource.get_resources
+
+        def get_resources(source, ids, cache=True):
+            fetches.append(source.manager.type)
+            return original(source, ids, cache)
+
+        self.patch(DescribeSource, 'get_resources', get_resources)
+        first = policies[0].resource_manager.resources()
+        second = policies[1].resource_manager.resources()
+        self.assertEqual(fetches, ['security-group'])
+        self.assertEqual(len(first), len(second))
+        self.assertTrue(first)
+        self.assertEqual(len(planner.related.entries), 1)
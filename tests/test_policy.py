@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 import json
 import logging
 import mock
+import os
 import shutil
 import tempfile
 
@@ -25,9 +26,9 @@ from c7n.exceptions import ResourceLimitExceeded, PolicyValidationError
 from c7n.resources import aws, load_available
 from c7n.resources.aws import AWS
 from c7n.resources.ec2 import EC2
-from c7n.schema import generate, JsonSchemaValidator
+from c7n.schema import ElementSchema, generate, JsonSchemaValidator
 from c7n.utils import dumps
-from c7n.query import ConfigSource, TypeInfo
+from c7n.query import ConfigSource, ResourceQuery, TypeInfo
 from c7n.version import version
 
 from .common import BaseTest, event_data, Bag
@@ -99,6 +100,23 @@ class PolicyMetaLint(BaseTest):
             for aname, a in v.action_registry.items():
                 self.assertIn(aname, a.schema["properties"]["type"]["enum"])
 
+    def test_resource_index(self):
+        # the index is generated, refresh with tools/dev/resourceindex.py
+        self.assertEqual(set(AWS.resource_index), set(AWS.resource_map))
+        stale = []
+        for type_name, entry in AWS.resource_index.items():
+            resource_class = AWS.resources.get(type_name.split('.', 1)[-1])
+            current = {
+                'service': getattr(resource_class.resource_type, 'service', None),
+                'filters': sorted(ElementSchema.name(f) for f in ElementSchema.elements(
+                    resource_class.filter_registry)),
+                'actions': sorted(ElementSchema.name(a) for a in ElementSchema.elements(
+                    resource_class.action_registry))}
+            if current != entry:
+                stale.append(type_name)
+        if stale:
+            self.fail("stale resource index entries %s" % ", ".join(stale))
+
     def test_schema(self):
         try:
             schema = generate()
@@ -999,6 +1017,111 @@ class LambdaModeTest(BaseTest):
             'mode=config-rule:version=%s' % version)
 
 
+class CloudTrailBatchModeTest(BaseTest):
+
+    def get_batch_event(self, *instance_sets):
+        records = []
+        for idx, instance_ids in enumerate(instance_sets):
+            detail = event_data("event-cloud-trail-run-instances.json")
+            detail['responseElements']['instancesSet']['items'] = [
+                {'instanceId': i} for i in instance_ids]
+            records.append({
+                'eventSource': 'aws:sqs',
+                'body': json.dumps({
+                    'id': 'event-%d' % idx, 'account': '644160558196',
+                    'region': 'us-east-1', 'detail': detail})})
+        return {'Records': records}
+
+    def load_batch_policy(self, **kw):
+        data = {
+            'name': 'ec2-batch',
+            'resource': 'aws.ec2',
+            'mode': {
+                'type': 'cloudtrail',
+                'events': ['RunInstances'],
+                'batch': {'queue': 'arn:aws:sqs:us-east-1:644160558196:events',
+                          'size': 100, 'window': 30}}}
+        data.update(kw)
+        return self.load_policy(data, output_dir=self.get_temp_dir())
+
+    @mock.patch("c7n.query.QueryResourceManager.get_resources")
+    def test_batch_resolve(self, get_resources):
+        get_resources.side_effect = lambda ids, cache=True: [
+            {'InstanceId': i} for i in ids]
+        p = self.load_batch_policy(
+            filters=[{'type': 'value', 'key': 'InstanceId', 'op': 'ne', 'value': 'i-3'}])
+        resources = p.push(self.get_batch_event(
+            ['i-1', 'i-2'], ['i-1'], ['i-3']), None)
+        get_resources.assert_called_once_with(['i-1', 'i-2', 'i-3'])
+        self.assertEqual(
+            {r['InstanceId']: r['c7n:Events'] for r in resources},
+            {'i-1': ['event-0', 'event-1'], 'i-2': ['event-0']})
+        with open(os.path.join(p.ctx.log_dir, 'events.json')) as fh:
+            self.assertEqual(
+                [e['id'] for e in json.load(fh)], ['event-0', 'event-1', 'event-2'])
+
+    @mock.patch("c7n.query.QueryResourceManager.get_resources")
+    def test_batch_event_filter(self, get_resources):
+        get_resources.side_effect = lambda ids, cache=True: [
+            {'InstanceId': i} for i in ids]
+        p = self.load_batch_policy(
+            filters=[{'type': 'event', 'key': 'id', 'value': 'event-1'}])
+        resources = p.push(self.get_batch_event(['i-1', 'i-2'], ['i-2']), None)
+        self.assertEqual([r['InstanceId'] for r in resources], ['i-2'])
+
+    def test_batch_size_window(self):
+        self.assertRaises(
+            PolicyValidationError, self.load_batch_policy, mode={
+                'type': 'cloudtrail', 'events': ['RunInstances'],
+                'batch': {'queue': 'arn:aws:sqs:us-east-1:644160558196:events',
+                          'size': 100}})
+        p = self.load_batch_policy(mode={
+            'type': 'cloudtrail', 'events': ['RunInstances'],
+            'batch': {'queue': 'arn:aws:sqs:us-east-1:644160558196:events', 'size': 10}})
+        self.assertEqual(p.data['mode']['batch']['size'], 10)
+
+    def test_batch_event_source(self):
+        from c7n import mu
+        p = self.load_batch_policy()
+        events = mu.PolicyLambda(p).get_events(None)
+        self.assertIsInstance(events[0], mu.CloudWatchEventQueueSource)
+        self.assertEqual(events[0].subscription.batch_size, 100)
+        self.assertEqual(events[0].subscription.batch_window, 30)
+
+    def test_batched_get_resources(self):
+        p = self.load_batch_policy()
+        query = ResourceQuery(None)
+        calls = []
+
+        def resources(resource_manager, **params):
+            calls.append(params['InstanceIds'])
+            return [{'InstanceId': i} for i in params['InstanceIds']]
+
+        self.patch(query, 'filter', resources)
+        ids = ['i-%d' % i for i in range(45)]
+        self.assertEqual(
+            [r['InstanceId'] for r in query.get(p.resource_manager, ids)], ids)
+        self.assertEqual([len(c) for c in calls], [45])
+
+        # apis capping ids per call are queried in batches
+        del calls[:]
+        self.patch(p.resource_manager.resource_type, 'filter_batch_size', 20)
+        self.assertEqual(
+            [r['InstanceId'] for r in query.get(p.resource_manager, ids)], ids)
+        self.assertEqual([len(c) for c in calls], [20, 20, 5])
+
+    @mock.patch("c7n.query.QueryResourceManager.get_resources")
+    def test_batch_resolve_chunked(self, get_resources):
+        get_resources.side_effect = lambda ids, cache=True: [
+            {'InstanceId': i} for i in ids]
+        p = self.load_batch_policy()
+        ids = ['i-%d' % i for i in range(45)]
+        resources = p.push(self.get_batch_event(ids[:30], ids[30:]), None)
+        self.assertEqual(len(resources), 45)
+        self.assertEqual(
+            [len(c[0][0]) for c in get_resources.call_args_list], [20, 20, 5])
+
+
 class PullModeTest(BaseTest):
 
     def test_skip_when_region_not_equal(self):
@@ -172,3 +172,37 @@ class QueryResourceManagerTest(BaseTest):
         self.assertEqual(len(resources), 1)
         resources = p.resource_manager.get_resources(["igw-5bce113f"])
         self.assertEqual(resources, [])
+
+    def test_stream_resources(self):
+        session_factory = self.replay_flight_data('test_query_pagination_retry')
+        p = self.load_policy(
+            {"name": "log-stream",
+             "resource": "log-group",
+             "filters": [
+                 {"type": "value", "key": "logGroupName", "value": "present"},
+                 {"type": "value", "value_type": "resource_count",
+                  "op": "gte", "value": 11}]},
+            config={"stream_resources": True},
+            session_factory=session_factory)
+        pages = []
+
+        def augment(resources):
+            pages.append(len(resources))
+            return resources
+
+        self.patch(p.resource_manager, 'augment', augment)
+        resources = p.resource_manager.resources()
+        self.assertEqual(len(resources), 11)
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(sum(pages), 11)
+
+    def test_augment_concurrency_metrics(self):
+        factory = self.replay_flight_data("test_kinesis_stream_query")
+        p = self.load_policy(
+            {"name": "kstream", "resource": "kinesis"}, session_factory=factory)
+        resources = p.resource_manager.resources()
+        self.assertTrue(resources[0]["Shards"])
+        metrics = {m['MetricName']: m['Value'] for m in p.ctx.metrics.buf}
+        self.assertEqual(metrics['AugmentConcurrency'], 3)
+        self.assertEqual(metrics['AugmentThrottles'], 0)
+        self.assertEqual(metrics['AugmentBackoffs'], 0)
@@ -11,7 +11,21 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from c7n.reports.csvout import Formatter
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from c7n.reports.columnar import (
+    HAVE_PYARROW, RAW_COLUMN, SNAPSHOT_FILE, TAGS_COLUMN, SnapshotSchema,
+    iter_snapshot, write_snapshot)
+from c7n.config import Bag
+from c7n.reports import csvout
+from c7n.reports.csvout import (
+    Formatter, RecordIndex, fs_record_set, get_manifest, get_record_blob,
+    get_record_keys, iter_json_array, report)
 from .common import BaseTest, load_data
 
 
@@ -140,3 +154,152 @@ class TestMultiReport(BaseTest):
             recs = list(map(lambda x: self.records[x], rec_ids))
             rows = list(map(lambda x: self.rows[x], row_ids))
             self.assertEqual(formatter.to_csv(recs), rows)
+
+
+class TestColumnarSnapshot(BaseTest):
+
+    def get_resources(self):
+        return [
+            {'InstanceId': 'i-%d' % i, 'LaunchTime': '2020-01-0%d' % (i + 1),
+             'Tags': [{'Key': 'Name', 'Value': 'web-%d' % i}],
+             'State': {'Name': 'running'}}
+            for i in range(5)]
+
+    def test_snapshot_schema(self):
+        p = self.load_policy({"name": "snapshot-ec2", "resource": "ec2"})
+        schema = SnapshotSchema(p.resource_manager.resource_type)
+        self.assertIn('InstanceId', schema.fields)
+        self.assertFalse([f for f in schema.fields if f.startswith('tag:')])
+        columns = schema.flatten(self.get_resources()[:2])
+        self.assertEqual(columns['InstanceId'], ['i-0', 'i-1'])
+        self.assertEqual(columns[TAGS_COLUMN], [[('Name', 'web-0')], [('Name', 'web-1')]])
+        self.assertEqual(len(columns[RAW_COLUMN]), 2)
+
+    def test_record_keys(self):
+        keys = get_record_keys([
+            {'Key': 'ec2/2020/01/01/00/resources.json.gz'},
+            {'Key': 'ec2/2020/01/01/00/resources.parquet'},
+            {'Key': 'ec2/2020/01/01/01/resources.json.gz'},
+            {'Key': 'ec2/2020/01/01/01/custodian-run.log.gz'}])
+        expected = ['ec2/2020/01/01/00/resources.json.gz',
+                    'ec2/2020/01/01/01/resources.json.gz']
+        if HAVE_PYARROW:
+            expected[0] = 'ec2/2020/01/01/00/resources.parquet'
+        self.assertEqual([k['Key'] for k in keys], expected)
+
+    @unittest.skipIf(not HAVE_PYARROW, "pyarrow not installed")
+    def test_snapshot_roundtrip(self):
+        p = self.load_policy({"name": "snapshot-ec2", "resource": "ec2"})
+        resources = self.get_resources()
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, output_dir)
+        path = os.path.join(output_dir, SNAPSHOT_FILE)
+        write_snapshot(path, p.resource_manager.resource_type, resources, row_group_size=2)
+        self.addCleanup(os.unlink, path)
+        self.assertEqual(list(iter_snapshot(path)), resources)
+        self.assertEqual(
+            [r['InstanceId'] for r in iter_snapshot(path, columns=['InstanceId'])],
+            [r['InstanceId'] for r in resources])
+        records = fs_record_set(output_dir, 'snapshot-ec2')
+        self.assertEqual(len(records), 5)
+        self.assertIn('CustodianDate', records[0])
+
+
+class TestStreamingReport(BaseTest):
+
+    def test_iter_json_array(self):
+        data = [
+            {'InstanceId': 'i-1', 'Name': 'a [bracket], "quoted"\n'},
+            [1, 2], 12345, None, "}]", {}]
+        for text in (json.dumps(data), json.dumps(data, indent=2)):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size=3)), data)
+            self.assertEqual(list(iter_json_array(io.StringIO(text))), data)
+        self.assertEqual(list(iter_json_array(io.StringIO(' [ ] '))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"a": 1}, {"b"'), chunk_size=4))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('{"a": 1}')))
+
+    def test_record_index_spill(self):
+        index = RecordIndex(max_size=2)
+        self.assertEqual(
+            [index.add(i) for i in ('i-1', 'i-2', 'i-3', 'i-1', 'i-3', 'i-4', 'i-2')],
+            [True, True, True, False, False, True, False])
+        self.assertEqual(len(index), 4)
+        self.assertTrue(os.path.exists(index.path))
+        index.close()
+        self.assertFalse(os.path.exists(index.path))
+
+    def test_manifest_blob(self):
+        path = os.path.join(self.get_temp_dir(), 'manifest.db')
+        manifest = get_manifest(path, 1)
+        self.addCleanup(manifest.close)
+        blob = gzip.compress(json.dumps([{'InstanceId': 'i-1'}]).encode('utf8'))
+        key = {'Key': 'ec2/2020/01/01/00/resources.json.gz', 'ETag': '"abc"'}
+        fetched = []
+
+        def get_object(Bucket, Key):
+            fetched.append(Key)
+            return {'Body': io.BytesIO(blob)}
+
+        client = Bag(get_object=get_object)
+        self.patch(csvout, 'local_session', lambda factory: Bag(client=lambda s: client))
+        self.patch(csvout, 'CHUNK_SIZE', 16)
+        with get_record_blob(None, 'bucket', key, manifest) as fh:
+            self.assertEqual(fh.read(), blob)
+
+        # the manifest records the path of a local copy of the file
+        copy = manifest.get(('report', 'bucket', key['Key'], key['ETag']))
+        self.assertTrue(copy.startswith(path + '.files'))
+        with get_record_blob(None, 'bucket', key, manifest) as fh:
+            self.assertEqual(fh.name, copy)
+            self.assertEqual(fh.read(), blob)
+        self.assertEqual(fetched, [key['Key']])
+
+        # copies older than the report window are pruned
+        os.utime(copy, (0, 0))
+        get_manifest(path, 1).close()
+        self.assertFalse(os.path.exists(copy))
+        with get_record_blob(None, 'bucket', key, manifest) as fh:
+            self.assertEqual(fh.read(), blob)
+        self.assertEqual(len(fetched), 2)
+
+    def test_report_streaming(self):
+        output_dir = self.get_temp_dir()
+        policies = []
+        # record files are dated by their change time, which can't be set.
+        ctimes = {}
+        stat = os.stat
+
+        def record_stat(path, *args, **kw):
+            result = stat(path, *args, **kw)
+            if path not in ctimes:
+                return result
+            return os.stat_result(tuple(result)[:9] + (ctimes[path],))
+
+        self.patch(os, 'stat', record_stat)
+        for idx, name in enumerate(('ec2-old', 'ec2-new')):
+            p = self.load_policy(
+                {'name': name, 'resource': 'ec2'}, output_dir=output_dir)
+            p.ctx.initialize()
+            record_path = os.path.join(p.ctx.log_dir, 'resources.json')
+            with open(record_path, 'w') as fh:
+                json.dump([{'InstanceId': 'i-%d' % i, 'Generation': idx}
+                           for i in range(idx, idx + 3)], fh)
+            ctimes[record_path] = 86400 * (idx + 1)
+            policies.append(p)
+
+        options = Bag(field=['Generation=Generation'], no_default_fields=True,
+                      format='csv', days=1)
+        output, raw = io.StringIO(), io.StringIO()
+        report(policies, None, options, output, raw)
+        rows = [r.split(',') for r in output.getvalue().split()]
+        self.assertEqual(rows[0], ['Generation'])
+        # newest first, with only the latest record for a resource
+        self.assertEqual(rows[1:], [['1'], ['1'], ['1'], ['0']])
+        self.assertEqual(len(json.loads(raw.getvalue())), 6)
+
+        options['format'] = 'json'
+        output = io.StringIO()
+        report(policies, None, options, output)
+        self.assertEqual(len(json.loads(output.getvalue())), 6)
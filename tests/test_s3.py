@@ -1255,6 +1255,112 @@ class BucketPolicyStatements(BaseTest):
         self.assertEqual(len(p.run()), 1)
 
 
+class BucketAugmentTest(BaseTest):
+
+    def get_session_factory(self, regions, calls):
+
+        class Client:
+
+            def __init__(self, region):
+                self.region = region
+
+            def invoke(self, op, Bucket, response):
+                calls.append((op, self.region, Bucket))
+                # bucket locations are available from any region
+                if op != 'location' and regions[Bucket] != (self.region or 'us-east-1'):
+                    raise ClientError({
+                        'Error': {'Code': 'PermanentRedirect', 'Message': 'redirect'},
+                        'ResponseMetadata': {'HTTPHeaders': {
+                            'x-amz-bucket-region': regions[Bucket]}}}, op)
+                return dict(response, ResponseMetadata={})
+
+            def get_bucket_location(self, Bucket):
+                return self.invoke('location', Bucket, s3.get_location(regions[Bucket]))
+
+            def get_bucket_tagging(self, Bucket):
+                return self.invoke('tagging', Bucket, {'TagSet': [{'Key': 'App', 'Value': 'x'}]})
+
+        class Session:
+
+            def client(self, service, region_name=None, config=None):
+                return Client(region_name)
+
+        return Session
+
+    def test_bucket_augment_regions(self):
+        table = [('get_bucket_location', 'Location', {}, None),
+                 ('get_bucket_tagging', 'Tags', [], 'TagSet')]
+        regions = {'east': 'us-east-1', 'west': 'us-west-2', 'moved': 'eu-west-1'}
+        calls = []
+        bucket_regions = s3.BucketRegions()
+        augmenter = s3.BucketAugmenter(
+            self.get_session_factory(regions, calls), MainThreadExecutor,
+            table, bucket_regions)
+        buckets = augmenter.augment([{'Name': 'east'}, {'Name': 'west'}])
+        self.assertEqual(
+            [b['Location'] for b in buckets],
+            [{'LocationConstraint': None}, {'LocationConstraint': 'us-west-2'}])
+        self.assertEqual([b['Tags'] for b in buckets], [[{'Key': 'App', 'Value': 'x'}]] * 2)
+        # table calls go to the bucket's region after its location is known
+        self.assertEqual(calls, [
+            ('location', None, 'east'), ('location', None, 'west'),
+            ('tagging', 'us-east-1', 'east'), ('tagging', 'us-west-2', 'west')])
+        self.assertEqual(bucket_regions.regions, {'east': 'us-east-1', 'west': 'us-west-2'})
+
+        # known regions skip the location call, stale ones are redirected
+        bucket_regions.set('moved', 'us-west-2')
+        del calls[:]
+        buckets = augmenter.augment([{'Name': 'west'}, {'Name': 'moved'}])
+        self.assertEqual(calls, [
+            ('tagging', 'us-west-2', 'west'), ('tagging', 'us-west-2', 'moved'),
+            ('tagging', 'eu-west-1', 'moved')])
+        self.assertEqual(buckets[1]['Location'], {'LocationConstraint': 'eu-west-1'})
+        self.assertEqual(bucket_regions.get('moved'), 'eu-west-1')
+
+    def test_bucket_augment_keys(self):
+        self.patch(s3.S3, "executor_factory", MainThreadExecutor)
+        p = self.load_policy({
+            "name": "bucket-tags", "resource": "s3",
+            "query": [{"augment-keys": ["Tags"]}]})
+        self.assertEqual(p.resource_manager.get_augment_keys(), {"Tags"})
+        self.assertEqual(
+            [m[1] for m in s3.get_augment_table(p.resource_manager.get_augment_keys())],
+            ["Location", "Tags"])
+        self.assertEqual(
+            p.resource_manager.get_cache_key(None)["augment-keys"], ["Tags"])
+        self.assertEqual(
+            len(s3.get_augment_table(self.load_policy(
+                {"name": "bucket-all", "resource": "s3"}).resource_manager.get_augment_keys())),
+            len(s3.S3_AUGMENT_TABLE))
+        self.assertRaises(
+            PolicyValidationError,
+            self.load_policy,
+            {"name": "bucket-tags", "resource": "s3",
+             "query": [{"augment-keys": ["Tagz"]}]})
+
+    def test_bucket_augment_keys_required(self):
+        p = self.load_policy({
+            "name": "bucket-statements", "resource": "s3",
+            "query": [{"augment-keys": ["Tags"]}],
+            "filters": [
+                {"tag:Env": "dev"},
+                {"or": [{"Versioning.Status": "Enabled"},
+                        {"type": "value", "key": "Logging.TargetBucket", "value": "present"},
+                        {"type": "global-grants"}]}],
+            "actions": [{
+                "type": "set-statements",
+                "statements": [{
+                    "Sid": "DenyHttp", "Effect": "Deny", "Action": "s3:GetObject",
+                    "Principal": "*", "Resource": "arn:aws:s3:::{bucket_name}/*"}]}]})
+        self.assertEqual(
+            p.resource_manager.get_augment_keys(),
+            {"Tags", "Policy", "Versioning", "Logging", "Acl", "Website"})
+        # the existing bucket policy is fetched and merged with the statements
+        self.assertIn(
+            "get_bucket_policy",
+            [m[0] for m in s3.get_augment_table(p.resource_manager.get_augment_keys())])
+
+
 class S3Test(BaseTest):
 
     def test_bucket_get_resources(self):
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import functools
 import json
 import ipaddress
 import os
@@ -25,6 +26,7 @@ import mock
 
 from c7n import utils
 from c7n.config import Config
+from c7n.executor import execution_scope
 from .common import BaseTest
 
 
@@ -64,6 +66,41 @@ class Backoff(BaseTest):
         else:
             self.fail("should have raised")
 
+    def test_retry_stats(self):
+        self.patch(time, "sleep", lambda x: x)
+        self.patch(utils, "retry_stats", utils.RetryStats())
+
+        @functools.wraps(lambda: None)
+        def throttled():
+            raise ClientError({"Error": {"Code": "Throttling"}}, "something")
+
+        retry = utils.get_retry(("Throttling",), 3, min_delay=0.5)
+        self.assertRaises(ClientError, retry, throttled)
+        stats = utils.retry_stats.get_snapshot()
+        self.assertEqual(stats[('<lambda>', 'retries')], 2)
+        self.assertEqual(stats[('<lambda>', 'throttles')], 2)
+        self.assertTrue(stats[('<lambda>', 'backoff')] > 0)
+
+    def test_retry_stats_scope(self):
+        self.patch(time, "sleep", lambda x: x)
+        self.patch(utils, "retry_stats", utils.RetryStats())
+
+        @functools.wraps(lambda: None)
+        def throttled():
+            raise ClientError({"Error": {"Code": "Throttling"}}, "something")
+
+        class Scope:
+            pass
+
+        first, second = Scope(), Scope()
+        retry = utils.get_retry(("Throttling",), 2, min_delay=0.5)
+        with execution_scope(first):
+            self.assertRaises(ClientError, retry, throttled)
+        self.assertEqual(
+            utils.retry_stats.get_snapshot(first)[('<lambda>', 'retries')], 1)
+        self.assertEqual(utils.retry_stats.get_snapshot(second), {})
+        self.assertEqual(utils.retry_stats.get_snapshot(), {})
+
     def test_delays(self):
         self.assertEqual(
             list(utils.backoff_delays(1, 256)),
@@ -77,6 +114,73 @@ class Backoff(BaseTest):
             self.assertTrue(i < maxv)
 
 
+class TokenBucketTest(BaseTest):
+
+    def test_token_bucket(self):
+        now = [100.0]
+        sleeps = []
+
+        def sleep(delay):
+            sleeps.append(delay)
+            now[0] += delay
+
+        bucket = utils.TokenBucket(2, burst=2, clock=lambda: now[0], sleep=sleep)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertEqual(bucket.acquire(), 0.5)
+        self.assertEqual(sleeps, [0.5])
+        now[0] += 1
+        self.assertEqual(bucket.acquire(), 0)
+
+    def test_rate_limiter_keys(self):
+        limiter = utils.RateLimiter(1)
+        limiter.acquire(('ec2', 'us-east-1', '123'))
+        limiter.acquire(('ec2', 'us-west-2', '123'))
+        self.assertEqual(len(limiter.buckets), 2)
+
+
+class AdaptiveConcurrencyTest(BaseTest):
+
+    def test_additive_increase(self):
+        controller = utils.AdaptiveConcurrency(2, maximum=3)
+        for i in range(2):
+            controller.success()
+        self.assertEqual(controller.limit, 3)
+        for i in range(6):
+            controller.success()
+        self.assertEqual(controller.limit, 3)
+        self.assertEqual(controller.peak, 3)
+
+    def test_multiplicative_decrease(self):
+        now = [100.0]
+        controller = utils.AdaptiveConcurrency(
+            8, minimum=2, clock=lambda: now[0])
+        controller.throttled()
+        self.assertEqual(controller.limit, 4)
+        # throttles from calls already in flight don't back off again
+        controller.throttled()
+        self.assertEqual(controller.limit, 4)
+        now[0] += 2
+        controller.throttled()
+        now[0] += 2
+        controller.throttled()
+        self.assertEqual(controller.limit, 2)
+        self.assertEqual(controller.throttles, 4)
+        # backing off at the minimum isn't a decrease
+        self.assertEqual(controller.decreases, 2)
+        self.assertEqual(controller.peak, 8)
+
+    def test_in_flight(self):
+        controller = utils.AdaptiveConcurrency(1)
+        with controller:
+            self.assertEqual(controller.in_flight, 1)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_retry_codes(self):
+        retry = utils.get_retry(('Throttling',))
+        self.assertEqual(retry.codes, ('Throttling',))
+
+
 class UrlConfTest(BaseTest):
 
     def test_parse_url(self):
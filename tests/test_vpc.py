@@ -14,7 +14,13 @@
 from .common import BaseTest, functional, event_data
 
 from botocore.exceptions import ClientError as BotoClientError
+from c7n.config import Bag
 from c7n.exceptions import PolicyValidationError
+from c7n.filters import vpc as vpc_filters
+from c7n.filters.vpc import SecurityGroupReferences
+from c7n.planner import ResourcePlanner
+from c7n.resources.sgmatch import CidrTrie, GroupPermissions, IntervalTree
+from c7n.utils import parse_cidr
 
 
 class VpcTest(BaseTest):
@@ -2430,6 +2436,174 @@ class SecurityGroupTest(BaseTest):
         self.assertEqual(resources[0]["Tags"][0]["Value"], "scenario-2-test")
 
 
+class SecurityGroupReferencesTest(BaseTest):
+
+    def get_manager(self, populations):
+        calls = []
+
+        class Manager:
+            session_factory = None
+
+            def get_resource_manager(self, resource_type):
+                return Bag(resources=lambda: (
+                    calls.append(resource_type) or populations[resource_type]))
+
+        return Manager(), calls
+
+    def test_sg_references_incremental(self):
+        populations = {
+            'eni': [{'NetworkInterfaceId': 'eni-1', 'Groups': [{'GroupId': 'sg-1'}]}],
+            'security-group': [
+                {'GroupId': 'sg-1', 'GroupName': 'web', 'IpPermissions': [
+                    {'UserIdGroupPairs': [{'GroupId': 'sg-2'}]}]},
+                {'GroupId': 'sg-2', 'GroupName': 'db'},
+                {'GroupId': 'sg-3', 'GroupName': 'idle'}],
+            'lambda': [{'FunctionName': 'f', 'VpcConfig': {'SecurityGroupIds': ['sg-4']}}],
+            'launch-config': [{'LaunchConfigurationName': 'lc', 'SecurityGroups': [],
+                               'ClassicLinkVPCSecurityGroups': []}]}
+        manager, calls = self.get_manager(populations)
+        index = SecurityGroupReferences().refresh(manager)
+        self.assertEqual(
+            [g for g in ('sg-1', 'sg-2', 'sg-3', 'sg-4') if index.is_used(g)],
+            ['sg-1', 'sg-2', 'sg-4'])
+        self.assertEqual(index.get_references('sg-2'), {('security-group', 'sg-1')})
+        self.assertEqual(
+            [g['GroupId'] for g in index.get_groups_by_name(['db'])], ['sg-2'])
+
+        # current sources aren't scanned again
+        index.refresh(manager)
+        self.assertEqual(calls, ['eni', 'security-group', 'lambda', 'launch-config'])
+
+        # interfaces updated in place by modify-security-groups
+        index.update('eni', 'eni-1', ['sg-3'])
+        index.invalidate('eni', ['modify-security-groups'])
+        index.refresh(manager)
+        self.assertEqual(len(calls), 4)
+        self.assertFalse(index.is_used('sg-1'))
+        self.assertTrue(index.is_used('sg-3'))
+
+        # other actions rescan the modified type, and interfaces
+        populations['lambda'] = []
+        index.invalidate('lambda', ['delete'])
+        index.refresh(manager)
+        self.assertEqual(calls[4:], ['eni', 'lambda'])
+        self.assertFalse(index.is_used('sg-4'))
+        self.assertTrue(index.is_used('sg-1'))
+
+    def test_sg_references_peered_error(self):
+        responses = [BotoClientError({'Error': {'Code': 'Throttling'}}, 'Describe'),
+                     {'SecurityGroupReferenceSet': [{'GroupId': 'sg-2'}]}]
+
+        def describe(GroupId):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        client = Bag(describe_security_group_references=describe)
+        self.patch(vpc_filters, 'local_session', lambda factory: Bag(
+            client=lambda service: client))
+        manager, calls = self.get_manager({})
+        index = SecurityGroupReferences()
+        self.assertRaises(BotoClientError, index.get_peered, manager, ['sg-1', 'sg-2'])
+        self.assertEqual(index.peered, {})
+        self.assertEqual(index.get_peered(manager, ['sg-1', 'sg-2']), {'sg-2'})
+
+    def test_sg_references_shared(self):
+        factory = self.replay_flight_data("test_security_group_unused")
+        policies = [
+            self.load_policy(
+                {"name": name, "resource": "security-group", "filters": ["unused"]},
+                session_factory=factory)
+            for name in ("sg-unused-a", "sg-unused-b")]
+        planner = ResourcePlanner(policies)
+        refresh = SecurityGroupReferences.refresh
+        scans = []
+
+        def record_refresh(index, manager, resource_types=None):
+            scans.append(len(index.current))
+            return refresh(index, manager, resource_types)
+
+        self.patch(SecurityGroupReferences, "refresh", record_refresh)
+        first = policies[0].run()
+        second = policies[1].run()
+        self.assertEqual(len(first), 1)
+        self.assertEqual(
+            [r["GroupId"] for r in first], [r["GroupId"] for r in second])
+        self.assertEqual(scans, [0, 4])
+        self.assertEqual(len(planner.indexes), 1)
+
+
+class SGPermissionMatcherTest(BaseTest):
+
+    def test_interval_tree(self):
+        intervals = [(22, 22, 'ssh'), (0, 65535, 'all'), (80, 443, 'web'),
+                     (443, 443, 'https'), (1000, 2000, 'high')]
+        tree = IntervalTree(intervals)
+        for port in (-1, 0, 22, 80, 100, 443, 444, 1500, 65535, 65536):
+            self.assertEqual(
+                set(tree.query(port)),
+                {v for start, end, v in intervals if start <= port <= end})
+        self.assertEqual(list(IntervalTree([]).query(22)), [])
+
+    def test_cidr_trie(self):
+        trie = CidrTrie()
+        for cidr in ('0.0.0.0/0', '10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24', '192.168.0.0/16'):
+            trie.add(parse_cidr(cidr), cidr)
+        self.assertEqual(
+            sorted(trie.subnets(parse_cidr('10.0.0.0/8'))),
+            ['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24'])
+        self.assertEqual(list(trie.subnets(parse_cidr('172.16.0.0/12'))), [])
+        self.assertEqual(
+            sorted(trie.supernets(parse_cidr('10.1.2.3'))),
+            ['0.0.0.0/0', '10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24'])
+
+    def test_permission_index_shared(self):
+        group = {
+            "GroupId": "sg-1",
+            "IpPermissions": [
+                {"IpProtocol": "tcp", "FromPort": 22, "ToPort": 22,
+                 "IpRanges": [{"CidrIp": "10.1.0.0/16"}, {"CidrIp": "0.0.0.0/0"}],
+                 "UserIdGroupPairs": [{"GroupId": "sg-1"}]},
+                {"IpProtocol": "tcp", "FromPort": 80, "ToPort": 443,
+                 "IpRanges": [{"CidrIp": "10.2.3.0/24"}]},
+                {"IpProtocol": "-1", "IpRanges": [{"CidrIp": "172.16.0.0/12"}]}]}
+        policies = [
+            self.load_policy({
+                "name": "sg-ssh-private", "resource": "security-group",
+                "filters": [{"type": "ingress", "Ports": [22], "Cidr": {
+                    "value_type": "cidr", "op": "in", "value": "10.0.0.0/8"}}]}),
+            self.load_policy({
+                "name": "sg-web", "resource": "security-group",
+                "filters": [{"type": "ingress", "OnlyPorts": [22]}]})]
+        ResourcePlanner(policies)
+        init = GroupPermissions.__init__
+        parsed = []
+
+        def record_init(group, group_id, permissions):
+            parsed.append(group_id)
+            init(group, group_id, permissions)
+
+        self.patch(GroupPermissions, "__init__", record_init)
+
+        resources = policies[0].resource_manager.filter_resources([dict(group)])
+        self.assertEqual(
+            resources[0]["MatchedIpPermissions"],
+            [{"IpProtocol": "tcp", "FromPort": 22, "ToPort": 22,
+              "IpRanges": [{"CidrIp": "10.1.0.0/16"}], "Ipv6Ranges": [],
+              "PrefixListIds": [], "UserIdGroupPairs": []}])
+        resources = policies[1].resource_manager.filter_resources([dict(group)])
+        self.assertEqual(
+            [(p["IpProtocol"], p["IpRanges"]) for p in resources[0]["MatchedIpPermissions"]],
+            [("tcp", [{"CidrIp": "10.2.3.0/24"}])])
+        self.assertEqual(parsed, ["sg-1"])
+
+        # changed permissions are parsed again
+        group["IpPermissions"] = group["IpPermissions"][1:]
+        self.assertEqual(policies[0].resource_manager.filter_resources([dict(group)]), [])
+        self.assertEqual(parsed, ["sg-1", "sg-1"])
+
+
 class EndpointTest(BaseTest):
 
     def test_endpoint_subnet(self):
@@ -276,18 +276,20 @@ class QueryResourceManager(ResourceManager):
     def resources(self, query=None):
         cache_key = self.get_cache_key(query)
 
-        resources = None
-        if self._cache.load():
-            resources = self._cache.get(cache_key)
-            if resources is not None:
-                self.log.debug("Using cached %s: %d" % (
-                    "%s.%s" % (self.__class__.__module__,
-                               self.__class__.__name__),
-                    len(resources)))
-
-        if resources is None:
-            resources = self.augment(self.source.get_resources(query))
-            self._cache.save(cache_key, resources)
+        with self.get_resource_snapshot() as snapshot:
+            resources = snapshot.get(cache_key)
+            if resources is None and self._cache.load():
+                resources = self._cache.get(cache_key)
+                if resources is not None:
+                    self.log.debug("Using cached %s: %d" % (
+                        "%s.%s" % (self.__class__.__module__,
+                                   self.__class__.__name__),
+                        len(resources)))
+
+            if resources is None:
+                resources = self.augment(self.source.get_resources(query))
+                self._cache.save(cache_key, resources)
+            snapshot.save(cache_key, resources)
 
         resource_count = len(resources)
         resources = self.filter_resources(resources)
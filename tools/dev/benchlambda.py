@@ -0,0 +1,189 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark policy lambda cold and warm invocation latency.
+
+Invokes the lambda entry point (c7n.handler.dispatch_event) with a
+cloudtrail policy's config.json, as lambda would within a container,
+with aws api calls answered in process from recorded data. Reports the
+handler import time, the first (cold) invocation and the warm
+invocation latency distribution, the best of several runs each in a
+fresh interpreter. With a baseline file, exits non zero if any
+measure regresses beyond the threshold.
+
+  $ python tools/dev/benchlambda.py -i 200 -o results.json
+  $ python tools/dev/benchlambda.py -i 200 -b results.json -t 0.2
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchpolicy import (
+    ACCOUNT_ID, Lookup, Responder, Template, ec2_instance, load_placebo)
+
+
+POLICY = {
+    'name': 'bench-lambda-ec2',
+    'resource': 'aws.ec2',
+    'mode': {'type': 'cloudtrail', 'events': ['RunInstances']},
+    'filters': [
+        {'State.Name': 'running'},
+        {'tag:Owner': 'absent'}],
+    'actions': [{'type': 'tag', 'key': 'Owner', 'value': 'unknown'}]}
+
+EVENT_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'tests', 'data', 'cwe', 'event-cloud-trail-run-instances.json')
+
+INSTANCES_PER_EVENT = 3
+
+
+def get_event(idx):
+    with open(EVENT_FILE) as fh:
+        detail = json.load(fh)
+    detail['responseElements']['instancesSet']['items'] = [
+        {'instanceId': 'i-%017x' % (idx * INSTANCES_PER_EVENT + i)}
+        for i in range(INSTANCES_PER_EVENT)]
+    return {'id': 'event-%d' % idx, 'account': ACCOUNT_ID,
+            'region': 'us-east-1', 'detail': detail}
+
+
+def get_responder():
+    template = Template(load_placebo(
+        'test_ec2_state_transition_age_filter',
+        'ec2.DescribeInstances')['data']['Reservations'][0]['Instances'][0], ec2_instance)
+
+    def describe(params):
+        instances = [template(int(i[2:], 16)) for i in params.get('InstanceIds', ())]
+        return {'Reservations': [{
+            'ReservationId': 'r-bench', 'OwnerId': ACCOUNT_ID,
+            'Groups': [], 'Instances': instances}]}
+
+    return Responder({'ec2.DescribeInstances': Lookup(describe)})
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_invocations(count):
+    os.chdir(tempfile.mkdtemp())
+    with open('config.json', 'w') as fh:
+        json.dump({'execution-options': {'account_id': ACCOUNT_ID},
+                   'policies': [POLICY]}, fh)
+    events = [get_event(i) for i in range(count + 1)]
+
+    t = time.time()
+    from c7n import handler
+    from c7n.credentials import SessionFactory
+    import_time = time.time() - t
+
+    # answer api calls for the handler's sessions
+    responder = get_responder()
+    update = SessionFactory.update
+
+    def update_session(self, session):
+        session.events.register(
+            'provide-client-params.*.*', responder.record_params,
+            unique_id='bench-params')
+        session.events.register('before-call.*.*', responder, unique_id='bench')
+        return update(self, session)
+
+    SessionFactory.update = update_session
+
+    t = time.time()
+    handler.dispatch_event(events[0], None)
+    cold = time.time() - t
+
+    warm = []
+    for e in events[1:]:
+        t = time.time()
+        handler.dispatch_event(e, None)
+        warm.append(time.time() - t)
+
+    return {
+        'import': import_time,
+        'cold': cold,
+        'warm-p50': percentile(warm, 0.5),
+        'warm-p90': percentile(warm, 0.9),
+        'warm-p99': percentile(warm, 0.99),
+        'api-calls': responder.calls,
+        'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def run_subprocess(count):
+    env = dict(os.environ)
+    env.update({
+        'AWS_ACCESS_KEY_ID': 'bench', 'AWS_SECRET_ACCESS_KEY': 'bench',
+        'AWS_DEFAULT_REGION': 'us-east-1', 'C7N_DEBUG_EVENT': 'no'})
+    env.pop('AWS_PROFILE', None)
+    output = subprocess.check_output([
+        sys.executable, os.path.abspath(__file__), '--run',
+        '--invocations', str(count)], env=env)
+    return json.loads(output.decode('utf8').strip().splitlines()[-1])
+
+
+MEASURES = ('import', 'cold', 'warm-p50', 'warm-p90', 'warm-p99', 'rss')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '-i', '--invocations', type=int, default=100, help="number of warm invocations")
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', help="write results as json")
+    parser.add_argument('-b', '--baseline', help="compare against json results")
+    parser.add_argument(
+        '-t', '--threshold', type=float, default=0.2,
+        help="allowed regression over baseline as a fraction")
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.run:
+        print(json.dumps(run_invocations(options.invocations)))
+        return
+
+    runs = [run_subprocess(options.invocations) for i in range(options.repeat)]
+    results = {m: min(r[m] for r in runs) for m in MEASURES}
+    results['invocations'] = options.invocations
+    print("import:%0.3fs cold:%0.3fs warm p50:%0.4fs p90:%0.4fs p99:%0.4fs rss:%0.1fmb" % (
+        results['import'], results['cold'], results['warm-p50'],
+        results['warm-p90'], results['warm-p99'], results['rss'] / 1024.0))
+
+    if options.output:
+        with open(options.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if not options.baseline:
+        return
+    with open(options.baseline) as fh:
+        baseline = json.load(fh)
+    regressions = []
+    for m in MEASURES:
+        limit = baseline[m] * (1 + options.threshold)
+        if results[m] > limit:
+            regressions.append("%s %0.4f > %0.4f" % (m, results[m], limit))
+    if regressions:
+        print("regressions:\n  %s" % "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,502 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark policy execution stages over recorded api responses.
+
+Resource templates are taken from recorded flight data (placebo for aws,
+flights for gcp and cassettes for azure) and replicated with unique ids
+and varied attributes up to the requested resource count. Aws api calls
+are answered in process, a page at a time, so the benchmark measures
+custodian's fetch (pagination, camelResource), augment (including
+universal_augment), filter_resources and serialization (utils.dumps)
+rather than the network. Gcp and azure scenarios measure filtering and
+serialization, and are skipped if the provider isn't installed.
+
+Each scenario runs in a fresh interpreter, reporting per stage duration,
+throughput in resources per second and peak rss, the best of several
+runs. With a baseline file, exits non zero if any stage's throughput or
+peak rss regresses beyond the threshold.
+
+  $ python tools/dev/benchpolicy.py -c 100000 -o results.json
+  $ python tools/dev/benchpolicy.py -c 100000 -b results.json -t 0.2
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import time
+
+from dateutil.tz import tzutc
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PLACEBO_DIR = os.path.join(ROOT, 'tests', 'data', 'placebo')
+GCP_FLIGHT_DIR = os.path.join(ROOT, 'tools', 'c7n_gcp', 'tests', 'data', 'flights')
+AZURE_CASSETTE_DIR = os.path.join(ROOT, 'tools', 'c7n_azure', 'tests_azure', 'cassettes')
+
+ACCOUNT_ID = '123456789012'
+NOW = datetime.datetime.now(tz=tzutc())
+ENVS = ('dev', 'test', 'stage', 'qa', 'perf', 'prod', 'shared')
+MIN_DURATION = 0.05
+
+
+def pick(values, idx, salt=1):
+    """Deterministically vary attributes across generated resources."""
+    return values[(idx * 7919 + salt * 104729) % len(values)]
+
+
+def load_placebo(flight, operation):
+    from placebo.serializer import deserialize
+    with open(os.path.join(PLACEBO_DIR, flight, '%s_1.json' % operation)) as fh:
+        return json.load(fh, object_hook=deserialize)
+
+
+def load_placebo_flight(flight):
+    responses = {}
+    for path in sorted(glob.glob(os.path.join(PLACEBO_DIR, flight, '*_1.json'))):
+        operation = os.path.basename(path).rsplit('_', 1)[0]
+        responses[operation] = load_placebo(flight, operation)
+    return responses
+
+
+class Template:
+    """Generate resources from a recorded template."""
+
+    def __init__(self, template, vary):
+        self.blob = pickle.dumps(template, protocol=pickle.HIGHEST_PROTOCOL)
+        self.vary = vary
+
+    def __call__(self, idx):
+        r = pickle.loads(self.blob)
+        self.vary(r, idx)
+        return r
+
+    def generate(self, count):
+        return [self(i) for i in range(count)]
+
+
+class Listing:
+    """A paginated api listing of synthetic items, generated a page at a time."""
+
+    def __init__(self, count, factory, items_key, page_size=None,
+                 token_in=None, token_out=None, truncated=None, wrap=None):
+        self.count = count
+        self.factory = factory
+        self.items_key = items_key
+        self.page_size = page_size or count
+        self.token_in = token_in
+        self.token_out = token_out or token_in
+        self.truncated = truncated
+        self.wrap = wrap
+
+    def page(self, params):
+        start = self.token_in and int(params.get(self.token_in) or 0) or 0
+        end = min(start + self.page_size, self.count)
+        items = [self.factory(i) for i in range(start, end)]
+        response = self.wrap and self.wrap(items) or {self.items_key: items}
+        if end < self.count:
+            response[self.token_out] = str(end)
+        if self.truncated:
+            response[self.truncated] = end < self.count
+        return response
+
+
+class Lookup:
+    """An api call answered per request parameters."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def page(self, params):
+        return self.func(params)
+
+
+class HttpResponse:
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = b''
+        self.raw = None
+
+
+class Responder:
+    """Answer aws api calls from synthetic listings and recorded responses."""
+
+    def __init__(self, listings, recorded=None):
+        self.listings = listings
+        self.recorded = recorded or {}
+        self.calls = 0
+
+    def record_params(self, params, context, **kwargs):
+        context['bench-params'] = dict(params)
+
+    def __call__(self, model, context, **kwargs):
+        self.calls += 1
+        operation = '%s.%s' % (model.service_model.endpoint_prefix, model.name)
+        if operation in self.listings:
+            data = self.listings[operation].page(context['bench-params'])
+            status = 200
+        else:
+            response = self.recorded.get(operation, {'status_code': 200, 'data': {}})
+            data = pickle.loads(pickle.dumps(response['data']))
+            status = response['status_code']
+        data.setdefault('ResponseMetadata', {'HTTPStatusCode': status})
+        return HttpResponse(status), data
+
+
+def get_aws_session_factory(responder):
+    import boto3
+    session = boto3.Session(
+        region_name='us-east-1', aws_access_key_id='bench',
+        aws_secret_access_key='bench')
+    session.events.register('provide-client-params.*.*', responder.record_params)
+    session.events.register('before-call.*.*', responder)
+    return lambda region=None, assume=None: session
+
+
+def lower_camel(value):
+    """Convert a describe response shape to the config service's."""
+    if isinstance(value, dict):
+        return {k[:1].lower() + k[1:]: lower_camel(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [lower_camel(v) for v in value]
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def ec2_instance(r, idx):
+    r['InstanceId'] = 'i-%017x' % idx
+    r['State'] = {'Name': pick(('running', 'stopped', 'terminated'), idx)}
+    r['InstanceType'] = pick(('t2.micro', 'm5.large', 'c5.xlarge'), idx, 2)
+    r['LaunchTime'] = NOW - datetime.timedelta(days=idx % 120)
+    r['PrivateIpAddress'] = '10.%d.%d.%d' % (idx % 4, idx // 254 % 256, idx % 254 + 1)
+    r['Tags'] = [
+        {'Key': 'Name', 'Value': 'instance-%d' % idx},
+        {'Key': 'Env', 'Value': pick(ENVS, idx, 3)}]
+    if idx % 5:
+        r['Tags'].append({'Key': 'Owner', 'Value': 'team-%d@example.com' % (idx % 20)})
+
+
+EC2_FILTERS = [
+    {'State.Name': 'running'},
+    {'type': 'value', 'key': 'tag:Env', 'op': 'in',
+     'value': ['dev', 'test', 'stage', 'qa', 'perf']},
+    {'type': 'instance-age', 'days': 30},
+    {'type': 'value', 'key': 'PrivateIpAddress', 'value_type': 'cidr',
+     'op': 'in', 'value': '10.1.0.0/16'},
+    {'or': [{'tag:Owner': 'absent'}, {'InstanceType': 'm5.large'}]}]
+
+
+def ec2_scenario(count):
+    template = Template(load_placebo(
+        'test_ec2_state_transition_age_filter',
+        'ec2.DescribeInstances')['data']['Reservations'][0]['Instances'][0], ec2_instance)
+    return {
+        'policy': {'name': 'bench-ec2', 'resource': 'aws.ec2', 'filters': EC2_FILTERS},
+        'listings': {
+            'ec2.DescribeInstances': Listing(
+                count, template, 'Reservations', 1000, 'NextToken',
+                wrap=lambda items: {'Reservations': [{
+                    'ReservationId': 'r-%s' % items[0]['InstanceId'][2:],
+                    'OwnerId': ACCOUNT_ID, 'Groups': [], 'Instances': items}]})}}
+
+
+def ec2_config_scenario(count):
+    template = Template(load_placebo(
+        'test_ec2_state_transition_age_filter',
+        'ec2.DescribeInstances')['data']['Reservations'][0]['Instances'][0], ec2_instance)
+
+    def config_item(idx):
+        return json.dumps({
+            'configuration': lower_camel(template(idx)),
+            'supplementaryConfiguration': {}})
+
+    return {
+        'policy': {'name': 'bench-ec2-config', 'resource': 'aws.ec2',
+                   'source': 'config', 'filters': EC2_FILTERS},
+        'listings': {
+            'config.SelectResourceConfig': Listing(
+                count, config_item, 'Results', 100, 'NextToken')}}
+
+
+def s3_scenario(count):
+    recorded = load_placebo_flight('test_s3_normalize')
+
+    def bucket(r, idx):
+        r['Name'] = 'bench-bucket-%d' % idx
+        r['CreationDate'] = NOW - datetime.timedelta(days=idx % 365)
+
+    template = Template(recorded['s3.ListBuckets']['data']['Buckets'][0], bucket)
+    recorded['s3.GetBucketLocation'] = {
+        'status_code': 200, 'data': {'LocationConstraint': None}}
+    return {
+        'policy': {'name': 'bench-s3', 'resource': 'aws.s3', 'filters': [
+            {'type': 'value', 'key': 'Name', 'op': 'regex', 'value': '^bench-bucket-[0-9]*1$'},
+            {'type': 'global-grants'},
+            {'Versioning.Status': 'absent'}]},
+        'listings': {
+            's3.ListBuckets': Listing(
+                count, template, 'Buckets', wrap=lambda items: {
+                    'Buckets': items, 'Owner': {'ID': 'bench'}})},
+        'recorded': recorded}
+
+
+def iam_scenario(count):
+    recorded = load_placebo_flight('test_iam_role_unused')
+
+    def role(r, idx):
+        r['RoleName'] = 'bench-role-%d' % idx
+        r['RoleId'] = 'AROA%016X' % idx
+        r['Arn'] = 'arn:aws:iam::%s:role/bench-role-%d' % (ACCOUNT_ID, idx)
+        r['CreateDate'] = NOW - datetime.timedelta(days=idx % 365)
+
+    template = Template(recorded['iam.ListRoles']['data']['Roles'][0], role)
+    recorded['iam.ListRolePolicies'] = {
+        'status_code': 200, 'data': {'PolicyNames': [], 'IsTruncated': False}}
+    return {
+        'policy': {'name': 'bench-iam-role', 'resource': 'aws.iam-role', 'filters': [
+            {'type': 'value', 'key': 'RoleName', 'op': 'regex', 'value': '^bench-role-[0-9]*7$'},
+            {'type': 'value', 'key': 'CreateDate', 'value_type': 'age',
+             'op': 'gt', 'value': 30},
+            {'type': 'has-inline-policy', 'value': False}]},
+        'listings': {
+            'iam.ListRoles': Listing(
+                count, template, 'Roles', 100, 'Marker', truncated='IsTruncated'),
+            'iam.GetRole': Lookup(lambda params: {
+                'Role': template(int(params['RoleName'].rsplit('-', 1)[-1]))})},
+        'recorded': recorded}
+
+
+def lambda_scenario(count):
+    recorded = load_placebo_flight('test_lambda_tag_and_remove')
+    arn = 'arn:aws:lambda:us-east-1:%s:function:bench-fn-%%d' % ACCOUNT_ID
+
+    def function(r, idx):
+        r['FunctionName'] = 'bench-fn-%d' % idx
+        r['FunctionArn'] = arn % idx
+        r['Runtime'] = pick(('python3.7', 'python3.8', 'nodejs12.x', 'java11'), idx)
+        r['MemorySize'] = pick((128, 256, 512, 1024), idx, 2)
+        r.pop('Tags', None)
+
+    def tag_mapping(idx):
+        return {'ResourceARN': arn % idx, 'Tags': [
+            {'Key': 'Env', 'Value': pick(ENVS, idx, 3)}]}
+
+    template = Template(recorded['lambda.ListFunctions']['data']['Functions'][0], function)
+    return {
+        'policy': {'name': 'bench-lambda', 'resource': 'aws.lambda', 'filters': [
+            {'type': 'value', 'key': 'Runtime', 'op': 'glob', 'value': 'python*'},
+            {'type': 'value', 'key': 'MemorySize', 'op': 'gte', 'value': 256},
+            {'tag:Env': 'prod'}]},
+        'listings': {
+            'lambda.ListFunctions': Listing(
+                count, template, 'Functions', 50, 'Marker', 'NextMarker'),
+            'tagging.GetResources': Listing(
+                count, tag_mapping, 'ResourceTagMappingList', 100, 'PaginationToken')},
+        'recorded': recorded}
+
+
+def gcp_instance_scenario(count):
+    with open(glob.glob(os.path.join(
+            GCP_FLIGHT_DIR, 'instance-query', '*aggregated-instances_1.json'))[0]) as fh:
+        items = json.load(fh)['body']['items']
+    instance = [v['instances'][0] for v in items.values() if 'instances' in v][0]
+
+    def vary(r, idx):
+        r['name'] = 'bench-instance-%d' % idx
+        r['id'] = str(idx)
+        r['status'] = pick(('RUNNING', 'TERMINATED', 'STOPPING'), idx)
+        r['labels'] = {'env': pick(ENVS, idx, 3)}
+
+    return {
+        'policy': {'name': 'bench-gcp-instance', 'resource': 'gcp.instance', 'filters': [
+            {'status': 'RUNNING'},
+            {'type': 'value', 'key': 'labels.env', 'op': 'in', 'value': ['dev', 'test']},
+            {'type': 'value', 'key': 'name', 'op': 'regex', 'value': '^bench-instance-[0-9]*3$'}]},
+        'resources': Template(instance, vary).generate(count)}
+
+
+def azure_vm_scenario(count):
+    with open(os.path.join(AZURE_CASSETTE_DIR, 'VMTest.test_find_running.json')) as fh:
+        interactions = json.load(fh)['interactions']
+    vm = interactions[0]['response']['body']['data']['value'][0]
+
+    def vary(r, idx):
+        r['name'] = 'bench-vm-%d' % idx
+        r['id'] = '%s-%d' % (vm['id'], idx)
+        r['tags'] = {'env': pick(ENVS, idx, 3)}
+        r['properties']['hardwareProfile'] = {
+            'vmSize': pick(('Basic_A0', 'Standard_D2s_v3', 'Standard_B1s'), idx)}
+
+    return {
+        'policy': {'name': 'bench-azure-vm', 'resource': 'azure.vm', 'filters': [
+            {'type': 'value', 'key': 'properties.hardwareProfile.vmSize',
+             'op': 'in', 'value': ['Standard_D2s_v3', 'Standard_B1s']},
+            {'tag:env': 'prod'}]},
+        'resources': Template(vm, vary).generate(count)}
+
+
+SCENARIOS = {
+    'ec2': ec2_scenario,
+    'ec2-config': ec2_config_scenario,
+    's3': s3_scenario,
+    'iam-role': iam_scenario,
+    'lambda': lambda_scenario,
+    'gcp-instance': gcp_instance_scenario,
+    'azure-vm': azure_vm_scenario,
+}
+
+
+class StageTimer:
+
+    def __init__(self, count):
+        self.count = count
+        self.stages = {}
+
+    def __call__(self, name, func, *args):
+        t = time.time()
+        result = func(*args)
+        duration = time.time() - t
+        self.stages[name] = {
+            'duration': duration,
+            'throughput': self.count / max(duration, 1e-6),
+            'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+        return result
+
+
+def run_scenario(name, count):
+    from c7n.config import Config
+    from c7n.policy import Policy
+    from c7n.resources import load_resources
+    from c7n.utils import dumps
+
+    timer = StageTimer(count)
+    scenario = SCENARIOS[name](count)
+    try:
+        load_resources((scenario['policy']['resource'],))
+    except ImportError as e:
+        return {'skipped': str(e)}
+
+    options = Config.empty(region='us-east-1', account_id=ACCOUNT_ID)
+    if 'resources' in scenario:
+        policy = Policy(scenario['policy'], options)
+        resources = scenario['resources']
+    else:
+        responder = Responder(scenario['listings'], scenario.get('recorded'))
+        policy = Policy(
+            scenario['policy'], options, session_factory=get_aws_session_factory(responder))
+        manager = policy.resource_manager
+        query = manager.source.get_query_params(None) or {}
+        resources = timer('fetch', manager.source.resources, query)
+        resources = timer('augment', manager.augment, resources)
+        assert len(resources) == count, "fetched %d of %d resources" % (len(resources), count)
+
+    manager = policy.resource_manager
+    matched = timer('filter', manager.filter_resources, resources)
+    timer('serialize', dumps, resources)
+    return {'count': count, 'matched': len(matched), 'stages': timer.stages}
+
+
+def run_subprocess(name, count):
+    output = subprocess.check_output([
+        sys.executable, os.path.abspath(__file__), '--run-scenario', name,
+        '--count', str(count)])
+    return json.loads(output)
+
+
+def get_best(runs):
+    if 'skipped' in runs[0]:
+        return runs[0]
+    best = dict(runs[0])
+    best['stages'] = {}
+    for stage in runs[0]['stages']:
+        results = [r['stages'][stage] for r in runs]
+        best['stages'][stage] = {
+            'duration': min(r['duration'] for r in results),
+            'throughput': max(r['throughput'] for r in results),
+            'rss': min(r['rss'] for r in results)}
+    return best
+
+
+def get_regressions(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        for stage, stats in result.get('stages', {}).items():
+            base = baseline.get(name, {}).get('stages', {}).get(stage)
+            if not base or baseline[name]['count'] != result['count']:
+                continue
+            limit = base['throughput'] * (1 - threshold)
+            # stages too short to time reliably only have their rss compared
+            if base['duration'] > MIN_DURATION and stats['throughput'] < limit:
+                regressions.append("%s %s throughput %0.1f < %0.1f" % (
+                    name, stage, stats['throughput'], limit))
+            limit = base['rss'] * (1 + threshold)
+            if stats['rss'] > limit:
+                regressions.append("%s %s rss %0.1fmb > %0.1fmb" % (
+                    name, stage, stats['rss'] / 1024.0, limit / 1024.0))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '-c', '--count', type=int, default=10000, help="number of resources per scenario")
+    parser.add_argument('-r', '--repeat', type=int, default=1)
+    parser.add_argument('-s', '--scenario', action='append', choices=list(SCENARIOS))
+    parser.add_argument('-o', '--output', help="write results as json")
+    parser.add_argument('-b', '--baseline', help="compare against json results")
+    parser.add_argument(
+        '-t', '--threshold', type=float, default=0.2,
+        help="allowed regression over baseline as a fraction")
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.run_scenario:
+        print(json.dumps(run_scenario(options.run_scenario, options.count)))
+        return
+
+    results = {}
+    for name in options.scenario or SCENARIOS:
+        results[name] = result = get_best(
+            [run_subprocess(name, options.count) for i in range(options.repeat)])
+        if 'skipped' in result:
+            print("%-15s skipped: %s" % (name, result['skipped']))
+            continue
+        for stage, stats in result['stages'].items():
+            print("%-15s %-10s duration:%0.3fs throughput:%0.0f/s rss:%0.1fmb" % (
+                name, stage, stats['duration'], stats['throughput'], stats['rss'] / 1024.0))
+
+    if options.output:
+        with open(options.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if not options.baseline:
+        return
+    with open(options.baseline) as fh:
+        baseline = json.load(fh)
+    regressions = get_regressions(results, baseline, options.threshold)
+    if regressions:
+        print("regressions:\n  %s" % "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
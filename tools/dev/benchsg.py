@@ -0,0 +1,107 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark security group ingress filters on synthetic rule sets.
+
+Evaluates several ingress filter blocks over security groups with a
+large number of rules, parsing group permissions per filter block
+(cold) and sharing parsed permissions across the blocks as policies
+of a run do with a resource planner (shared).
+"""
+import argparse
+import random
+import time
+
+from c7n.resources import sgmatch
+from c7n.resources.vpc import SecurityGroup
+
+
+BLOCKS = [
+    {'type': 'ingress', 'Ports': [22, 3389], 'Cidr': {
+        'value': ['0.0.0.0/0', '::/0'], 'op': 'in'}},
+    {'type': 'ingress', 'OnlyPorts': [443]},
+    {'type': 'ingress', 'Cidr': {'value_type': 'cidr', 'op': 'in', 'value': '10.0.0.0/8'}},
+    {'type': 'ingress', 'Cidr': {'value_type': 'cidr', 'op': 'in', 'value': '10.1.2.3'}},
+    {'type': 'ingress', 'IpProtocol': '-1', 'SelfReference': False},
+    {'type': 'ingress', 'Ports': [8080], 'match-operator': 'or',
+     'Description': {'value': 'absent'}},
+]
+
+
+def generate_groups(rules, rules_per_group):
+    rand = random.Random(42)
+    ports = [22, 80, 443, 3389, 5432, 8080, 8443]
+    for gidx in range(0, rules, rules_per_group):
+        permissions = []
+        for idx in range(min(rules_per_group, rules - gidx)):
+            protocol = rand.choice(['tcp', 'tcp', 'udp', '-1'])
+            perm = {'IpProtocol': protocol, 'IpRanges': [], 'Ipv6Ranges': [],
+                    'PrefixListIds': [], 'UserIdGroupPairs': []}
+            if protocol != '-1':
+                start = rand.choice(ports + [rand.randint(1024, 60000)])
+                perm['FromPort'] = start
+                perm['ToPort'] = rand.choice([start, start, start + rand.randint(1, 1000)])
+            if rand.random() < 0.2:
+                perm['UserIdGroupPairs'].append({'GroupId': 'sg-%017x' % rand.randint(0, 50)})
+            else:
+                cidr = {'CidrIp': rand.choice([
+                    '0.0.0.0/0',
+                    '10.%d.%d.0/24' % (rand.randint(0, 3), rand.randint(0, 255)),
+                    '172.%d.0.0/16' % rand.randint(16, 31),
+                    '192.168.%d.%d/32' % (rand.randint(0, 255), rand.randint(0, 255))])}
+                if rand.random() < 0.5:
+                    cidr['Description'] = 'rule %d' % idx
+                perm['IpRanges'].append(cidr)
+            permissions.append(perm)
+        yield {'GroupId': 'sg-%017x' % gidx, 'IpPermissions': permissions,
+               'IpPermissionsEgress': []}
+
+
+def timed(fdata, groups, index):
+    f = SecurityGroup.filter_registry.factory(dict(fdata))
+    t = time.time()
+    f.matcher = sgmatch.PermissionMatcher(f.data)
+    f.permission_index = index
+    matched = sum([1 for g in groups if f(g)])
+    rules = sum([len(g.get('MatchedIpPermissions', ())) for g in groups])
+    for g in groups:
+        g.pop('MatchedIpPermissions', None)
+    return time.time() - t, matched, rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '-c', '--count', type=int, default=30000, help="number of rules")
+    parser.add_argument(
+        '-g', '--group-size', type=int, default=200, help="rules per security group")
+    options = parser.parse_args()
+    groups = list(generate_groups(options.count, options.group_size))
+    print("rules: %d groups: %d" % (options.count, len(groups)))
+    shared = sgmatch.PermissionIndex()
+    total_cold = total_shared = 0
+    for fdata in BLOCKS:
+        cold, cmatched, crules = timed(fdata, groups, sgmatch.PermissionIndex())
+        warm, smatched, srules = timed(fdata, groups, shared)
+        assert (cmatched, crules) == (smatched, srules), "result mismatch %s" % fdata
+        total_cold += cold
+        total_shared += warm
+        print("%-60s cold:%0.3fs shared:%0.3fs groups:%d rules:%d" % (
+            ' '.join('%s=%s' % (k, v) for k, v in fdata.items() if k != 'type')[:60],
+            cold, warm, smatched, srules))
+    print("total cold:%0.3fs shared:%0.3fs speedup:%0.2fx" % (
+        total_cold, total_shared, total_cold / total_shared))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark custodian startup, import time and peak rss.
+
+Each scenario runs in a fresh interpreter to measure a cold start,
+the best of several runs is reported. With a baseline file, exits
+non zero if any scenario regresses beyond the threshold.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+
+SCENARIOS = {
+    'provider': (
+        "from c7n.resources import load_providers\n"
+        "load_providers(('aws',))\n"),
+    'policy': (
+        "from c7n.config import Config\n"
+        "from c7n.policy import PolicyCollection\n"
+        "from c7n.resources import load_resources\n"
+        "from c7n.resources.aws import get_service_region_map\n"
+        "load_resources(('aws.ec2',))\n"
+        "p = PolicyCollection.from_data({'policies': [{'name': 'ec2', 'resource': 'aws.ec2',"
+        " 'filters': [{'type': 'offhour'}]}]}, Config.empty())\n"
+        "get_service_region_map(['us-east-1'], p.resource_types)\n"),
+    'completion': (
+        "from c7n.commands import schema_completer\n"
+        "schema_completer('ec2.filters.')\n"),
+    'all-resources': (
+        "from c7n.resources import load_resources\n"
+        "load_resources(('aws.*',))\n"),
+}
+
+HARNESS = """\
+import json, resource, time
+t = time.time()
+%s
+print(json.dumps({
+    'duration': time.time() - t,
+    'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def run_scenario(code):
+    output = subprocess.check_output([sys.executable, '-c', HARNESS % code])
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-s', '--scenario', action='append', choices=list(SCENARIOS))
+    parser.add_argument('-o', '--output', help="write results as json")
+    parser.add_argument('-b', '--baseline', help="compare against json results")
+    parser.add_argument(
+        '-t', '--threshold', type=float, default=0.2,
+        help="allowed regression over baseline as a fraction")
+    options = parser.parse_args()
+
+    results = {}
+    for name in options.scenario or SCENARIOS:
+        runs = [run_scenario(SCENARIOS[name]) for i in range(options.repeat)]
+        results[name] = {
+            'duration': min(r['duration'] for r in runs),
+            'rss': min(r['rss'] for r in runs)}
+        print("%-15s duration:%0.3fs rss:%0.1fmb" % (
+            name, results[name]['duration'], results[name]['rss'] / 1024.0))
+
+    if options.output:
+        with open(options.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+
+    if not options.baseline:
+        return
+    with open(options.baseline) as fh:
+        baseline = json.load(fh)
+    regressions = []
+    for name, result in results.items():
+        for metric in ('duration', 'rss'):
+            if name not in baseline:
+                continue
+            limit = baseline[name][metric] * (1 + options.threshold)
+            if result[metric] > limit:
+                regressions.append("%s %s %0.3f > %0.3f" % (
+                    name, metric, result[metric], limit))
+    if regressions:
+        print("regressions:\n  %s" % "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark value filter matching on synthetic ec2 instances.
+
+Compares the compiled value filter against per resource interpretation
+of the filter (key lookup, value type conversion, operator lookup), and
+with numpy installed, against evaluating the filter over resource
+columns (c7n.filters.vector).
+"""
+import argparse
+import datetime
+import random
+import time
+
+from dateutil.tz import tzutc
+
+from c7n.filters import vector
+from c7n.filters.core import OPERATORS
+from c7n.resources.ec2 import filters
+
+
+FILTERS = [
+    {'type': 'value', 'key': 'State.Name', 'value': 'running'},
+    {'type': 'value', 'key': 'tag:Env', 'op': 'in',
+     'value': ['dev', 'test', 'stage', 'qa', 'perf']},
+    {'type': 'value', 'key': 'LaunchTime', 'value_type': 'age',
+     'op': 'gt', 'value': 30},
+    {'type': 'value', 'key': 'ImageId', 'op': 'regex', 'value': '^ami-0[0-9a-f]+$'},
+    {'type': 'value', 'key': 'PrivateIpAddress', 'value_type': 'cidr',
+     'op': 'in', 'value': '10.1.0.0/16'},
+    {'type': 'value', 'key': 'tag:Owner', 'value_regex': '^([^@]+)@.*',
+     'op': 'glob', 'value': 'team-*'},
+]
+
+
+def generate_instances(count):
+    rand = random.Random(42)
+    now = datetime.datetime.now(tz=tzutc())
+    states = ['running', 'stopped', 'terminated']
+    envs = ['dev', 'test', 'stage', 'qa', 'perf', 'prod', 'shared']
+    for idx in range(count):
+        yield {
+            'InstanceId': 'i-%017x' % idx,
+            'ImageId': 'ami-%017x' % rand.getrandbits(64),
+            'InstanceType': rand.choice(['t2.micro', 'm5.large', 'c5.xlarge']),
+            'LaunchTime': (now - datetime.timedelta(
+                days=rand.randint(0, 120))).isoformat(),
+            'PrivateIpAddress': '10.%d.%d.%d' % (
+                rand.randint(0, 3), rand.randint(0, 255), rand.randint(1, 254)),
+            'State': {'Name': rand.choice(states)},
+            'Tags': [
+                {'Key': 'Name', 'Value': 'instance-%d' % idx},
+                {'Key': 'Env', 'Value': rand.choice(envs)},
+                {'Key': 'Owner', 'Value': 'team-%d@example.com' % rand.randint(0, 20)}]}
+
+
+def interpret(f, i):
+    """Match a resource evaluating the filter definition per resource."""
+    if f.v is None and not hasattr(f, 'content_initialized'):
+        f._initialize_value()
+    r = f.get_resource_value(f.k, i)
+    if f.op in ('in', 'not-in') and r is None:
+        r = ()
+    if f.vtype is not None:
+        v, r = f.process_value_type(f.v, r, i)
+    else:
+        v = f.v
+    if r is None and v == 'absent':
+        return True
+    elif r is not None and v == 'present':
+        return True
+    elif v == 'not-null' and r:
+        return True
+    elif v == 'empty' and not r:
+        return True
+    elif f.op:
+        try:
+            return OPERATORS[f.op](r, v)
+        except TypeError:
+            return False
+    return r == f.v
+
+
+def timed(func, resources):
+    t = time.time()
+    matched = sum([1 for r in resources if func(r)])
+    return time.time() - t, matched
+
+
+def timed_vector(f, resources):
+    # matching only, as with the compiled filter
+    f.annotate = False
+    t = time.time()
+    matched = len(vector.VectorFilterSet([f]).process(resources))
+    return time.time() - t, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '-c', '--count', type=int, default=100000, help="number of instances")
+    count = parser.parse_args().count
+    resources = list(generate_instances(count))
+    print("instances: %d" % count)
+    total_interpreted = total_compiled = total_vector = 0
+    for fdata in FILTERS:
+        f = filters.factory(dict(fdata))
+        interpreted, imatched = timed(lambda r: interpret(f, r), resources)
+        f = filters.factory(dict(fdata))
+        compiled, cmatched = timed(f.match, resources)
+        assert imatched == cmatched, "compiled filter result mismatch %s" % fdata
+        total_interpreted += interpreted
+        total_compiled += compiled
+        print("%-60s interpreted:%0.3fs compiled:%0.3fs speedup:%0.2fx matched:%d" % (
+            ' '.join('%s=%s' % (k, v) for k, v in fdata.items() if k != 'type')[:60],
+            interpreted, compiled, interpreted / compiled, cmatched))
+        if not vector.HAVE_NUMPY:
+            continue
+        f = filters.factory(dict(fdata))
+        vectorized, vmatched = timed_vector(f, resources)
+        assert vmatched == cmatched, "vector filter result mismatch %s" % fdata
+        total_vector += vectorized
+        print("%-60s vector:%0.3fs speedup over compiled:%0.2fx" % (
+            '', vectorized, compiled / vectorized))
+    print("total interpreted:%0.3fs compiled:%0.3fs speedup:%0.2fx" % (
+        total_interpreted, total_compiled, total_interpreted / total_compiled))
+    if total_vector:
+        print("total vector:%0.3fs speedup over compiled:%0.2fx" % (
+            total_vector, total_compiled / total_vector))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Copyright 2020 Capital One Services, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Generate the aws resource index (c7n/resources/resource_index.py).
+
+The index records the service and filter/action vocabulary of each
+resource type, so region planning and schema completion don't need
+to import every resource module.
+"""
+import argparse
+import json
+import os
+import textwrap
+
+from c7n.resources import load_resources
+from c7n.resources.aws import AWS
+from c7n.schema import ElementSchema
+
+
+HEADER = """\
+# Generated by tools/dev/resourceindex.py, regenerate when adding resources
+# or filters/actions to resources.
+"""
+
+
+def get_names(registry):
+    return sorted(ElementSchema.name(cls) for cls in ElementSchema.elements(registry))
+
+
+def get_index():
+    load_resources(('aws.*',))
+    index = {}
+    for type_name in sorted(AWS.resource_map):
+        # resolve through the registry to pick up aliases
+        resource_class = AWS.resources.get(type_name.split('.', 1)[-1])
+        index[type_name] = {
+            'service': getattr(resource_class.resource_type, 'service', None),
+            'filters': get_names(resource_class.filter_registry),
+            'actions': get_names(resource_class.action_registry)}
+    return index
+
+
+def format_names(names, indent):
+    lines = textwrap.wrap(
+        ', '.join(json.dumps(n) for n in names),
+        width=98 - indent, break_on_hyphens=False, break_long_words=False)
+    return ('\n' + ' ' * indent).join(lines)
+
+
+def format_index(index):
+    entries = []
+    for type_name, entry in index.items():
+        entries.append(
+            '    %s: {\n'
+            '        "service": %s,\n'
+            '        "filters": [%s],\n'
+            '        "actions": [%s]}' % (
+                json.dumps(type_name),
+                json.dumps(entry['service']),
+                format_names(entry['filters'], 20),
+                format_names(entry['actions'], 20)))
+    return '%s\nResourceIndex = {\n%s\n}\n' % (HEADER, ',\n'.join(entries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '-o', '--output',
+        default=os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__)))),
+            'c7n', 'resources', 'resource_index.py'))
+    options = parser.parse_args()
+    with open(options.output, 'w') as fh:
+        fh.write(format_index(get_index()))
+
+
+if __name__ == '__main__':
+    main()